@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Consistencia dos numeros de APF entre os documentos.
+
+Le ``README.md``, ``docs/*.md`` e os scripts (``scripts/*.py``, onde o
+relatorio em PDF tem totais fixos) uma unica vez, monta o indice de numeros
+rotulados (``apfscan.figures``) e lista todas as inconsistencias:
+
+- ``divergente``: o mesmo numero citado com valores diferentes;
+- ``soma``: soma dos tipos (ALI+AIE+EE+CE+SE) diferente do total nao ajustado;
+- ``vaf``: PF nao ajustado x VAF diferente do PF ajustado;
+- ``tabela``: linha ``Total`` de uma tabela diferente da soma das linhas.
+
+Roda em fracoes de segundo, entao serve como hook de pre-commit; os
+arquivos passados na linha de comando sao aceitos e ignorados, porque os
+numeros so podem ser conferidos com todos os documentos juntos::
+
+  # .git/hooks/pre-commit
+  python3 scripts/apf_consistency.py || exit 1
+
+Usage:
+  python3 scripts/apf_consistency.py
+  python3 scripts/apf_consistency.py --list
+  python3 scripts/apf_consistency.py --output output/consistencia-apf.md
+  python3 scripts/apf_consistency.py --json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+from apfscan.figures import FigureIndex, Inconsistency, build_index, check
+
+ROOT = Path(__file__).resolve().parent.parent
+KIND_TITLES = {
+    "divergente": "Valores divergentes",
+    "soma": "Soma por tipo x total nao ajustado",
+    "vaf": "Nao ajustado x VAF x ajustado",
+    "tabela": "Totais de tabela",
+}
+
+
+def fmt_value(value: float) -> str:
+    if value == int(value):
+        return f"{int(value):,}".replace(",", ".")
+    return f"{value:.2f}".replace(".", ",")
+
+
+def build_markdown(index: FigureIndex, problems: list[Inconsistency], seconds: float, listing: bool) -> str:
+    lines = [
+        "# Consistencia dos Numeros de APF",
+        "",
+        f"- Arquivos lidos: **{index.files}** em {seconds:.2f} s",
+        f"- Numeros indexados: **{len(index.figures)}** ({len(index.by_key())} rotulos)",
+        f"- Inconsistencias: **{len(problems)}**",
+    ]
+    for kind, title in KIND_TITLES.items():
+        group = [p for p in problems if p.kind == kind]
+        if not group:
+            continue
+        lines.extend(["", f"## {title}", ""])
+        for p in group:
+            lines.append(f"- `{p.key}`: {p.message}")
+            for f in p.figures:
+                lines.append(f"  - {f.path}:{f.line} = {fmt_value(f.value)} (`{f.text.strip()}`)")
+    if listing:
+        lines.extend(["", "## Indice", "", "| Rotulo | Valor | Arquivo | Linha |", "|---|---:|---|---:|"])
+        for key, figures in sorted(index.by_key().items()):
+            for f in figures:
+                lines.append(f"| {key} | {fmt_value(f.value)} | {f.path} | {f.line} |")
+    lines.append("")
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Confere os numeros de APF citados nos documentos.")
+    parser.add_argument("arquivos", nargs="*", help="Ignorados (compatibilidade com hooks de pre-commit).")
+    parser.add_argument("--root", type=Path, default=ROOT, help="Raiz do repositorio.")
+    parser.add_argument("--list", action="store_true", help="Inclui o indice completo de numeros.")
+    parser.add_argument("--output", type=Path, help="Grava o relatorio Markdown neste arquivo.")
+    parser.add_argument("--json", action="store_true", help="Imprime o indice e as inconsistencias em JSON.")
+    args = parser.parse_args(argv)
+    root = args.root.resolve()
+
+    start = time.perf_counter()
+    index = build_index(root)
+    problems = check(index)
+    seconds = time.perf_counter() - start
+
+    if args.json:
+        payload = {
+            "files": index.files,
+            "figures": [asdict(f) for f in index.figures],
+            "inconsistencies": [asdict(p) for p in problems],
+        }
+        print(json.dumps(payload, ensure_ascii=False, indent=2))
+        return 1 if problems else 0
+
+    text = build_markdown(index, problems, seconds, args.list)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(text, encoding="utf-8")
+        print(f"Markdown gerado em: {args.output}")
+    else:
+        print(text)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""Contagem APF de melhoria (delta) entre duas revisoes git.
+
+Le apenas os arquivos alterados entre as revisoes (entidades, controllers e
+DTOs de ``apps/api``), classifica cada funcao como incluida, alterada ou
+excluida e precifica pelas regras IFPUG de projeto de melhoria
+(EFP = ADD + CHG + DEL). Os demais arquivos vem do indice C# da arvore de
+trabalho, que deve estar em ``head``.
+
+Usage:
+  python3 scripts/apf_delta.py 9e21bf1 HEAD
+  python3 scripts/apf_delta.py v1.4.0 v1.5.0 --output docs/contagem-apf-delta-sprint12.md
+  python3 scripts/apf_delta.py HEAD~20 HEAD --json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+from apfscan.csharp import DEFAULT_CACHE, CsIndex
+from apfscan.delta import OPERACOES, DeltaCount, count_delta
+from apfscan.efmodel import load_ef_model
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def fmt_int(value: int) -> str:
+    return f"{value:,}".replace(",", ".")
+
+
+def build_markdown(delta: DeltaCount, vaf: float, seconds: float) -> str:
+    lines = [
+        "# Contagem APF de Melhoria (Delta)",
+        "",
+        f"- Revisoes: **`{delta.base}`** -> **`{delta.head}`**",
+        f"- Arquivos relevantes alterados: **{fmt_int(len(delta.changed_files))}** "
+        f"(lidos do git: {fmt_int(delta.parsed_files)}; tempo {seconds:.2f} s)",
+        "- Regra: inclusao e alteracao pela complexidade depois da mudanca, exclusao pela complexidade anterior.",
+        "",
+        "## 1. Resumo",
+        "",
+        "| Operacao | Funcoes | PF |",
+        "|---|---:|---:|",
+    ]
+    for operacao in OPERACOES.values():
+        funcs = [f for f in delta.functions if f.operacao == operacao]
+        lines.append(f"| {operacao} | {fmt_int(len(funcs))} | {fmt_int(sum(f.pf for f in funcs))} |")
+    total = delta.total()
+    lines.extend(
+        [
+            f"| **TOTAL NAO AJUSTADO** | **{fmt_int(len(delta.functions))}** | **{fmt_int(total)} PF** |",
+            "",
+            f"- VAF: **{vaf:.2f}**",
+            f"- **TOTAL AJUSTADO: {fmt_int(round(total * vaf))} PF**",
+            "",
+            "## 2. Funcoes",
+            "",
+            "| Tipo | Funcao | Operacao | DET | RET/FTR | Complexidade | PF |",
+            "|---|---|---|---:|---:|---|---:|",
+        ]
+    )
+    for f in sorted(delta.functions, key=lambda f: (f.tipo, f.operacao, f.nome)):
+        lines.append(
+            f"| {f.tipo} | {f.nome} | {f.operacao} | {fmt_int(f.det)} | {fmt_int(f.ret_ftr)} | {f.complexidade} | {fmt_int(f.pf)} |"
+        )
+    lines.append("")
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Contagem APF de melhoria entre duas revisoes git.")
+    parser.add_argument("base", help="Revisao anterior (commit, tag, branch).")
+    parser.add_argument("head", nargs="?", default="HEAD", help="Revisao posterior (padrao: HEAD).")
+    parser.add_argument("--root", type=Path, default=ROOT, help="Raiz do repositorio.")
+    parser.add_argument("--vaf", type=float, default=1.16, help="Fator de ajuste (padrao: 1,16 do baseline).")
+    parser.add_argument("--output", type=Path, help="Grava o relatorio Markdown neste arquivo.")
+    parser.add_argument("--json", action="store_true", help="Imprime o resultado em JSON.")
+    args = parser.parse_args(argv)
+
+    root = args.root.resolve()
+    head_sha = subprocess.run(
+        ["git", "rev-parse", "--verify", f"{args.head}^{{commit}}"], cwd=root, capture_output=True, text=True
+    ).stdout.strip()
+    worktree_sha = subprocess.run(["git", "rev-parse", "HEAD"], cwd=root, capture_output=True, text=True).stdout.strip()
+    if head_sha and head_sha != worktree_sha:
+        print(
+            f"Aviso: a arvore de trabalho nao esta em {args.head}; arquivos nao alterados vem da arvore atual.",
+            file=sys.stderr,
+        )
+
+    start = time.perf_counter()
+    index = CsIndex.load(root, root / DEFAULT_CACHE)
+    index.save()
+    try:
+        entity_names = {e.short_name for e in load_ef_model(root).tables()}
+    except RuntimeError:
+        entity_names = set()
+    delta = count_delta(root, args.base, args.head, index=index, entity_names=entity_names)
+    seconds = time.perf_counter() - start
+
+    if args.json:
+        payload = {
+            "base": delta.base,
+            "head": delta.head,
+            "changed_files": [asdict(c) for c in delta.changed_files],
+            "functions": [asdict(f) for f in delta.functions],
+            "total_nao_ajustado": delta.total(),
+            "vaf": args.vaf,
+            "total_ajustado": round(delta.total() * args.vaf),
+        }
+        print(json.dumps(payload, ensure_ascii=False, indent=2))
+        return 0
+
+    report = build_markdown(delta, args.vaf, seconds)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(report, encoding="utf-8")
+        print(f"Markdown gerado em: {args.output}")
+    else:
+        print(report)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Acoes de controller e metodos de servico quase duplicados (MinHash + LSH).
+
+Cada cluster reune metodos publicos com corpo quase igual (similaridade de
+Jaccard sobre shingles de tokens normalizados) no codigo migrado (``.cs``)
+e no legado PHP. Sao candidatos a consolidacao em um unico processo
+elementar (secao 6.2 do relatorio de gap).
+
+Usage:
+  python3 scripts/apf_duplicates.py
+  python3 scripts/apf_duplicates.py --threshold 0.7 --lang cs --output docs/duplicados-apf.md
+  python3 scripts/apf_duplicates.py --estrutural --json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+from apfscan.similarity import SimilarityReport, lsh_params, near_duplicates
+
+ROOT = Path(__file__).resolve().parent.parent
+LANG_LABEL = {"cs": "C#", "php": "PHP"}
+
+
+def build_markdown(report: SimilarityReport, args: argparse.Namespace, seconds: float) -> str:
+    bands, rows = lsh_params(args.hashes, args.threshold)
+    lines = [
+        "# Candidatos a Consolidacao - Metodos Quase Duplicados",
+        "",
+        f"- Arquivos lidos: **{report.files}**; metodos comparados: **{report.units}** "
+        f"(minimo de {args.min_tokens} tokens)",
+        f"- Similaridade minima (Jaccard): **{args.threshold:.2f}**; shingles de {args.shingle} tokens; "
+        f"normalizacao {'estrutural' if args.estrutural else 'lexica'}",
+        f"- MinHash {args.hashes} bins, LSH {bands} bandas x {rows} linhas; "
+        f"pares candidatos verificados: {report.candidates}; tempo {seconds:.2f} s",
+        f"- Clusters: **{len(report.clusters)}** reunindo "
+        f"**{sum(len(c.members) for c in report.clusters)}** metodos",
+        "",
+    ]
+    for n, cluster in enumerate(report.clusters, 1):
+        langs = "/".join(LANG_LABEL[lang] for lang in sorted(cluster.langs))
+        lines.extend(
+            [
+                f"## {n}. {len(cluster.members)} metodos ({langs}, similaridade media {cluster.similarity:.2f})",
+                "",
+                "| Metodo | Arquivo | Tokens |",
+                "|---|---|---:|",
+            ]
+        )
+        for m in cluster.members:
+            lines.append(f"| `{m.label}` | `{m.path}:{m.line}` | {m.tokens} |")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Detecta metodos quase duplicados (candidatos a consolidacao).")
+    parser.add_argument("--root", type=Path, default=ROOT, help="Raiz do repositorio.")
+    parser.add_argument("--lang", choices=("all", "cs", "php"), default="all", help="Linguagens analisadas.")
+    parser.add_argument("--threshold", type=float, default=0.8, help="Jaccard minimo (padrao: 0,8).")
+    parser.add_argument("--shingle", type=int, default=5, help="Tokens por shingle (padrao: 5).")
+    parser.add_argument("--hashes", type=int, default=128, help="Bins da assinatura MinHash (padrao: 128).")
+    parser.add_argument("--min-tokens", type=int, default=30, help="Ignora metodos menores que isso.")
+    parser.add_argument(
+        "--estrutural", action="store_true", help="Troca identificadores por ID (clones com nomes diferentes)."
+    )
+    parser.add_argument("--output", type=Path, help="Grava o relatorio Markdown neste arquivo.")
+    parser.add_argument("--json", action="store_true", help="Imprime os clusters em JSON.")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    report = near_duplicates(
+        args.root.resolve(),
+        ("cs", "php") if args.lang == "all" else (args.lang,),
+        threshold=args.threshold,
+        k=args.shingle,
+        num_hashes=args.hashes,
+        structural=args.estrutural,
+        min_tokens=args.min_tokens,
+    )
+    seconds = time.perf_counter() - start
+
+    if args.json:
+        payload = {
+            "files": report.files,
+            "units": report.units,
+            "candidates": report.candidates,
+            "clusters": [
+                {"similarity": round(c.similarity, 4), "members": [asdict(m) for m in c.members]}
+                for c in report.clusters
+            ],
+        }
+        print(json.dumps(payload, ensure_ascii=False, indent=2))
+        return 0
+
+    text = build_markdown(report, args, seconds)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(text, encoding="utf-8")
+        print(f"Markdown gerado em: {args.output}")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""Explorador HTML estatico da contagem APF do codigo migrado.
+
+Gera ``index.html`` (autocontido, sem dependencias externas) e ``data/``
+com as tabelas do snapshot: modulos (ALI por modulo), controllers, rotas da
+API (uma linha por acao, com tipo/DET/FTR/PF), paginas do frontend,
+entidades do modelo EF e as funcoes do codigo no layout Deltapoint. Com
+``--deltapoint-xlsx``, a planilha de estimativa da Deltapoint (a lista
+paginada do PDF de gap, que chega a 10^5 linhas) vira mais uma tabela.
+Cada tabela e gravada em blocos de JSON carregados sob demanda, com os
+filtros e totais ja calculados no manifesto (``apfscan.explorer``); filtro
+e ordenacao rodam no navegador. Abre direto do disco, sem servidor.
+
+Usage:
+  python3 scripts/apf_explorer.py
+  python3 scripts/apf_explorer.py --output output/explorer --ftr grafo
+  python3 scripts/apf_explorer.py --deltapoint-xlsx docs/deltapoint.xlsx
+  python3 scripts/apf_explorer.py --root /caminho/do/checkout --chunk 2000
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+from apfscan.apicalls import scan_calls
+from apfscan.csharp import DEFAULT_CACHE
+from apfscan.deltapoint import DeltapointTable, load_deltapoint_xlsx
+from apfscan.dtos import DtoIndex, load_dto_index
+from apfscan.efmodel import ALI_WEIGHTS, EfModel, ali_complexity, load_ef_model
+from apfscan.explorer import CHUNK_ROWS, ExplorerTable, write_explorer
+from apfscan.inventory import function_rows, parse_aie_rows
+from apfscan.pages import route_pages
+from apfscan.snapshot import CodeSnapshot, build_snapshot, count_api
+
+ROOT = Path(__file__).resolve().parent.parent
+DOC_APF = Path("docs") / "contagem-apf.md"
+DEFAULT_OUTPUT = Path("output") / "explorer"
+
+
+def entity_rows(model: EfModel) -> Iterator[list[object]]:
+    for e in sorted(model.tables(), key=lambda e: (e.module, e.short_name)):
+        det, ret = model.det(e), model.ret(e)
+        level = ali_complexity(det, ret)
+        yield [e.short_name, e.module, e.table, det, ret, level, ALI_WEIGHTS[level]]
+
+
+def estimate_table(rows: DeltapointTable) -> ExplorerTable:
+    """The Deltapoint estimate workbook, one row per function line of the sheet."""
+    return ExplorerTable(
+        "estimativa",
+        "Estimativa Deltapoint (planilha)",
+        ("Linha", "Funcao", "Tipo", "CTL", "PFB", "PFL"),
+        ([r.row, r.funcao, r.tipo, r.ctl or "", r.pfb, r.pfl] for r in rows),
+        frozenset({"PFB", "PFL"}),
+    )
+
+
+def build_tables(
+    snapshot: CodeSnapshot, model: EfModel, dtos: DtoIndex, deltapoint: Iterator[tuple[object, ...]]
+) -> list[ExplorerTable]:
+    uso = {u.controller: u for u in snapshot.uso_by_controller}
+    return [
+        ExplorerTable(
+            "modulos",
+            "Modulos (ALI)",
+            ("Modulo", "Tabelas", "DET", "Baixa", "Media", "Alta", "PF"),
+            ([m.modulo, m.tabelas, m.det_total, m.baixa, m.media, m.alta, m.pf] for m in snapshot.ali_by_module),
+            frozenset({"Tabelas", "DET", "Baixa", "Media", "Alta", "PF"}),
+        ),
+        ExplorerTable(
+            "controllers",
+            "Controllers",
+            ("Controller", "Acoes", "EE", "CE", "SE", "DET", "Baixa", "Media", "Alta", "PF", "Usados", "Nao usados"),
+            (
+                [
+                    t.controller, t.acoes, t.ee, t.ce, t.se, t.det_total, t.baixa, t.media, t.alta, t.pf,
+                    uso[t.controller].usados if t.controller in uso else None,
+                    uso[t.controller].nao_usados if t.controller in uso else None,
+                ]
+                for t in snapshot.transacoes_by_controller
+            ),
+            frozenset({"Acoes", "EE", "CE", "SE", "DET", "Baixa", "Media", "Alta", "PF", "Usados", "Nao usados"}),
+        ),
+        ExplorerTable(
+            "rotas",
+            "Rotas da API",
+            ("Controller", "Verbo", "Rota", "Acao", "Tipo", "DET", "FTR", "Complexidade", "PF"),
+            (
+                [m.controller, m.verb, m.template or "", m.action, m.tipo, m.det, m.ftr, m.complexidade, m.pf]
+                for m in dtos.action_metrics()
+            ),
+            frozenset({"DET", "FTR", "PF"}),
+        ),
+        ExplorerTable(
+            "paginas",
+            "Paginas (frontend)",
+            ("App", "Caminho", "Componente", "Modulo", "Tipo", "Lazy"),
+            ([r.app, r.path, r.component, r.module, r.kind, r.lazy] for r in snapshot.rotas),
+        ),
+        ExplorerTable(
+            "entidades",
+            "Entidades",
+            ("Entidade", "Modulo", "Tabela", "DET", "RET", "Complexidade", "PF"),
+            entity_rows(model),
+            frozenset({"DET", "RET", "PF"}),
+        ),
+        ExplorerTable(
+            "deltapoint",
+            "Funcoes do codigo (layout Deltapoint)",
+            ("Funcao", "Tipo", "CTL", "PFB", "PFL"),
+            (list(row) for row in deltapoint),
+            frozenset({"PFB", "PFL"}),
+        ),
+    ]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Gera o explorador HTML estatico da contagem APF.")
+    parser.add_argument("--root", type=Path, default=ROOT, help="Raiz do repositorio.")
+    parser.add_argument("--output", type=Path, help=f"Diretorio gerado (padrao: {DEFAULT_OUTPUT}).")
+    parser.add_argument("--chunk", type=int, default=CHUNK_ROWS, help=f"Linhas por bloco (padrao: {CHUNK_ROWS}).")
+    parser.add_argument(
+        "--ftr", choices=("dto", "grafo"), default="dto", help="Origem do FTR das funcoes Deltapoint (padrao: dto)."
+    )
+    parser.add_argument(
+        "--deltapoint-xlsx", type=Path, help="Planilha de estimativa da Deltapoint: inclui suas funcoes como tabela."
+    )
+    args = parser.parse_args(argv)
+    if args.deltapoint_xlsx is not None and not args.deltapoint_xlsx.exists():
+        print(f"Arquivo XLSX nao encontrado: {args.deltapoint_xlsx}", file=sys.stderr)
+        return 2
+    root = args.root.resolve()
+    output = args.output or root / DEFAULT_OUTPUT
+
+    start = time.perf_counter()
+    model = load_ef_model(root)
+    dtos = load_dto_index(root, (e.short_name for e in model.tables()), root / DEFAULT_CACHE)
+    snapshot = build_snapshot(root, count_api(root), model, dtos, scan_calls(root), route_pages(root))
+    doc = root / DOC_APF
+    aies = parse_aie_rows(doc.read_text(encoding="utf-8")) if doc.exists() else []
+    deltapoint = function_rows(model, dtos, aies, ftr_from_graph=args.ftr == "grafo")
+
+    summary = [
+        ("Commit", snapshot.commit),
+        ("Gerado em", snapshot.generated_at),
+        ("Entidades", snapshot.entidades),
+        ("Controllers funcionais", snapshot.controllers_funcionais),
+        ("Endpoints", snapshot.endpoints),
+        ("Paginas (admin + publico)", snapshot.pages_admin + snapshot.pages_public),
+    ]
+    tables = build_tables(snapshot, model, dtos, deltapoint)
+    if args.deltapoint_xlsx is not None:
+        resumo, estimate = load_deltapoint_xlsx(args.deltapoint_xlsx)
+        summary.append((f"Estimativa Deltapoint ({args.deltapoint_xlsx.name})", f"{resumo.total_pf:g} PF"))
+        tables.append(estimate_table(estimate))
+    try:
+        manifest = write_explorer(
+            output,
+            tables,
+            title="Explorador APF - CAU Sistema Eleitoral (Migrado)",
+            summary=summary,
+            chunk_rows=args.chunk,
+        )
+    except FileExistsError as exc:
+        print(f"Erro: {exc}", file=sys.stderr)
+        return 2
+    dtos.store()
+    dtos.index.save()
+    seconds = time.perf_counter() - start
+
+    print(f"Explorador gerado em: {output / 'index.html'}")
+    print(", ".join(f"{t['name']} {t['rows']} ({t['chunks']} blocos)" for t in manifest["tables"]) + f"; {seconds:.2f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Exporta a contagem do sistema migrado no layout da planilha Deltapoint.
+
+Gera um ``.xlsx`` com as abas ``Resumo`` (D10 sistema, D12 contador, D13
+tipo de contagem, D15 total de PF) e ``Funções`` (A funcao, B tipo, J CTL,
+P PFB, Q PFL), o mesmo layout lido por ``generate_apf_gap_report.py``, para
+que as duas contagens possam ser comparadas planilha contra planilha.
+
+ALIs vem do modelo EF, AIEs da secao 4 de ``docs/contagem-apf.md`` e as
+transacoes de cada acao de controller (DET/FTR pelos DTOs, ou FTR pelo
+grafo de dependencias com ``--ftr grafo``). Os valores sao gravados ja
+calculados, sem formulas, em modo write-only do openpyxl.
+
+Usage:
+  python3 scripts/apf_export_deltapoint.py
+  python3 scripts/apf_export_deltapoint.py --ftr grafo --output output/xlsx/contagem-grafo.xlsx
+  python3 scripts/apf_export_deltapoint.py --contador "Equipe CAU" --tipo-contagem Detalhada
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from collections import Counter
+from collections.abc import Iterator
+from pathlib import Path
+
+from apfscan.csharp import DEFAULT_CACHE
+from apfscan.deltapoint import FunctionValues, write_deltapoint_xlsx
+from apfscan.dtos import load_dto_index
+from apfscan.efmodel import load_ef_model
+from apfscan.inventory import function_rows, parse_aie_rows
+
+ROOT = Path(__file__).resolve().parent.parent
+DOC_APF = Path("docs") / "contagem-apf.md"
+DEFAULT_OUTPUT = Path("output") / "xlsx" / "Contagem_APF_Sistema_Migrado.xlsx"
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Exporta a contagem APF no layout Deltapoint (Resumo/Funções).")
+    parser.add_argument("--root", type=Path, default=ROOT, help="Raiz do repositorio.")
+    parser.add_argument("--output", type=Path, help=f"Planilha gerada (padrao: {DEFAULT_OUTPUT}).")
+    parser.add_argument("--sistema", default="CAU Eleitoral (sistema migrado)", help="Resumo!D10.")
+    parser.add_argument("--contador", default="", help="Resumo!D12.")
+    parser.add_argument("--tipo-contagem", default="Detalhada", help="Resumo!D13 (padrao: Detalhada).")
+    parser.add_argument(
+        "--ftr", choices=("dto", "grafo"), default="dto", help="Origem do FTR das transacoes (padrao: dto)."
+    )
+    args = parser.parse_args(argv)
+    root = args.root.resolve()
+    output = args.output or root / DEFAULT_OUTPUT
+
+    start = time.perf_counter()
+    model = load_ef_model(root)
+    dtos = load_dto_index(root, (e.short_name for e in model.tables()), root / DEFAULT_CACHE)
+    doc = root / DOC_APF
+    aies = parse_aie_rows(doc.read_text(encoding="utf-8")) if doc.exists() else []
+
+    tipos: Counter[str] = Counter()
+
+    def counted() -> Iterator[FunctionValues]:
+        for row in function_rows(model, dtos, aies, ftr_from_graph=args.ftr == "grafo"):
+            tipos[row[1]] += 1
+            yield row
+
+    resumo, rows = write_deltapoint_xlsx(
+        output, counted(), sistema=args.sistema, contador=args.contador, tipo_contagem=args.tipo_contagem
+    )
+    dtos.store()
+    dtos.index.save()
+    seconds = time.perf_counter() - start
+
+    print(f"Planilha gerada em: {output}")
+    print(
+        f"{rows} funcoes ({', '.join(f'{t} {n}' for t, n in tipos.items())}), "
+        f"{resumo.total_pf:.0f} PF nao ajustados; {seconds:.2f} s"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""FTR por acao de controller a partir do grafo de dependencias.
+
+Monta o grafo controller -> servico -> repositorio -> entidade (injecao no
+construtor e referencias de tipo, ``DbSet`` resolvido para a entidade) e
+calcula, para cada acao, o conjunto de entidades alcancaveis. O FTR do
+grafo e comparado com a estimativa pelos DTOs usada na contagem
+(``apfscan.dtos``), com a complexidade e os PF recalculados pela matriz IFPUG.
+
+O alcance e por acao: a acao conta as entidades dos metodos de servico que
+chama (e, a partir deles, dos metodos e repositorios que esses chamam), nao
+de todo o servico. Chamadas a metodos desconhecidos (classe base,
+biblioteca) caem no tipo inteiro, entao o FTR do grafo e um limite superior.
+
+Usage:
+  python3 scripts/apf_ftr.py
+  python3 scripts/apf_ftr.py --controller ChapasController --entidades
+  python3 scripts/apf_ftr.py --output docs/ftr-por-acao.md
+  python3 scripts/apf_ftr.py --json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+from apfscan.csharp import DEFAULT_CACHE
+from apfscan.depgraph import ActionReach, action_reach
+from apfscan.dtos import TRANSACTION_WEIGHTS, ActionMetrics, load_dto_index, transaction_complexity
+from apfscan.efmodel import load_ef_model
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def graph_pf(metrics: ActionMetrics, reach: ActionReach) -> tuple[str, int]:
+    level = transaction_complexity(metrics.tipo, metrics.det, reach.ftr)
+    return level, TRANSACTION_WEIGHTS[metrics.tipo][level]
+
+
+def build_markdown(
+    rows: list[tuple[ActionMetrics, ActionReach]], seconds: float, show_entities: bool
+) -> str:
+    pf_dto = sum(m.pf for m, _ in rows)
+    pf_graph = sum(graph_pf(m, r)[1] for m, r in rows)
+    changed = sum(1 for m, r in rows if graph_pf(m, r)[0] != m.complexidade)
+    lines = [
+        "# FTR por Acao - Grafo de Dependencias x Estimativa por DTO",
+        "",
+        f"- Acoes: **{len(rows)}**; tempo {seconds:.2f} s",
+        f"- PF das transacoes: **{pf_dto}** (FTR por DTO) x **{pf_graph}** (FTR pelo grafo)",
+        f"- Acoes com complexidade diferente: **{changed}**",
+        "",
+    ]
+    controller = None
+    for m, r in rows:
+        if m.controller != controller:
+            controller = m.controller
+            lines.extend(
+                [
+                    "",
+                    f"## {controller}",
+                    "",
+                    "| Acao | Tipo | DET | FTR DTO | FTR grafo | Complexidade (grafo) | PF (grafo) |"
+                    + (" Entidades |" if show_entities else ""),
+                    "|---|---|---:|---:|---:|---|---:|" + ("---|" if show_entities else ""),
+                ]
+            )
+        level, pf = graph_pf(m, r)
+        row = f"| {m.verb} {m.action} | {m.tipo} | {m.det} | {m.ftr} | {r.ftr} | {level} | {pf} |"
+        if show_entities:
+            row += f" {', '.join(r.entities) or '-'} |"
+        lines.append(row)
+    lines.append("")
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="FTR por acao pelo grafo controller -> servico -> entidade.")
+    parser.add_argument("--root", type=Path, default=ROOT, help="Raiz do repositorio.")
+    parser.add_argument("--controller", help="Somente este controller.")
+    parser.add_argument("--entidades", action="store_true", help="Lista as entidades alcancadas por acao.")
+    parser.add_argument("--output", type=Path, help="Grava o relatorio Markdown neste arquivo.")
+    parser.add_argument("--json", action="store_true", help="Imprime o resultado em JSON.")
+    args = parser.parse_args(argv)
+    root = args.root.resolve()
+
+    start = time.perf_counter()
+    model = load_ef_model(root)
+    dtos = load_dto_index(root, (e.short_name for e in model.tables()), root / DEFAULT_CACHE)
+    reach = {(r.controller, r.action): r for r in action_reach(dtos.index, model)}
+    rows = [
+        (m, reach[(m.controller, m.action)])
+        for m in dtos.action_metrics()
+        if args.controller in (None, m.controller)
+    ]
+    dtos.store()
+    dtos.index.save()
+    seconds = time.perf_counter() - start
+
+    if args.json:
+        payload = [
+            {
+                **asdict(r),
+                "ftr": r.ftr,
+                "tipo": m.tipo,
+                "det": m.det,
+                "ftr_dto": m.ftr,
+                "complexidade": graph_pf(m, r)[0],
+                "pf": graph_pf(m, r)[1],
+            }
+            for m, r in rows
+        ]
+        print(json.dumps(payload, ensure_ascii=False, indent=2))
+        return 0
+
+    text = build_markdown(rows, seconds, args.entidades)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(text, encoding="utf-8")
+        print(f"Markdown gerado em: {args.output}")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""Consulta o historico de recontagens APF gravado em SQLite.
+
+``recount_apf_snapshot.py`` grava cada execucao em ``output/apf-history.sqlite``;
+``import-md`` carrega snapshots antigos (``docs/contagem-apf-snapshot-*.md``).
+
+Usage:
+  python3 scripts/apf_history.py list
+  python3 scripts/apf_history.py trend endpoints total_nao_ajustado --per-day
+  python3 scripts/apf_history.py controller ImpugnacaoController
+  python3 scripts/apf_history.py module Denuncias --json
+  python3 scripts/apf_history.py import-md docs/contagem-apf-snapshot-2026-02-19.md
+"""
+from __future__ import annotations
+
+import argparse
+import functools
+import json
+import re
+import sqlite3
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+from apfscan.store import TREND_METRICS, SnapshotStore
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_DB = ROOT / "output" / "apf-history.sqlite"
+
+_METRIC_LABELS = {
+    "Entidades de dominio": "entidades",
+    "Controllers (total)": "controllers_total",
+    "Controllers funcionais": "controllers_funcionais",
+    "Endpoints API": "endpoints",
+    "Endpoints GET": "http_get",
+    "Endpoints POST": "http_post",
+    "Endpoints PUT": "http_put",
+    "Endpoints DELETE": "http_delete",
+    "Endpoints PATCH": "http_patch",
+    "Services de aplicacao": "services_app",
+    "Paginas Admin": "pages_admin",
+    "Paginas Public": "pages_public",
+}
+
+
+def _int(value: str) -> int:
+    return int(value.replace("*", "").replace("PF", "").replace(".", "").strip())
+
+
+def _table(md: str, heading: str) -> list[list[str]]:
+    """Body rows of the first table after ``heading``, without the bold total row."""
+    start = md.find(heading)
+    if start == -1:
+        return []
+    rows: list[list[str]] = []
+    started = False
+    for line in md[start:].splitlines()[1:]:
+        if line.startswith("|"):
+            started = True
+            cells = [c.strip() for c in line.strip().strip("|").split("|")]
+            if set(cells[0]) <= set("-: ") or cells[0].startswith("**"):
+                continue
+            rows.append(cells)
+        elif started:
+            break
+    return rows[1:]  # header
+
+
+def parse_snapshot_md(md: str) -> tuple[SimpleNamespace, SimpleNamespace]:
+    """(totals, snapshot) from a ``contagem-apf-snapshot-*.md`` report."""
+    generated = re.search(r"Data/hora do snapshot: \*\*(.+?)\*\*", md)
+    commit = re.search(r"Commit analisado: \*\*`(.+?)`\*\*", md)
+    if not generated or not commit:
+        raise ValueError("Cabecalho do snapshot nao encontrado")
+
+    totals = SimpleNamespace()
+    for tipo, qty, pf in _table(md, "## 1."):
+        setattr(totals, f"{tipo.lower()}_qty", _int(qty))
+        setattr(totals, f"{tipo.lower()}_pf", _int(pf))
+    total = re.search(r"\| \*\*TOTAL NAO AJUSTADO\*\* \| \*\*([0-9.]+)\*\* \| \*\*([0-9.]+) PF\*\* \|", md)
+    if total:
+        totals.total_funcoes, totals.total_nao_ajustado = _int(total.group(1)), _int(total.group(2))
+    vaf = re.search(r"- VAF: \*\*([0-9.,]+)\*\*", md)
+    totals.vaf = float(vaf.group(1).replace(",", ".")) if vaf else None
+    ajustado = re.search(r"TOTAL AJUSTADO: ([0-9.]+) PF", md)
+    totals.total_ajustado = _int(ajustado.group(1)) if ajustado else None
+
+    snapshot = SimpleNamespace(commit=commit.group(1), generated_at=generated.group(1))
+    for label, value in _table(md, "## 2."):
+        for prefix, column in _METRIC_LABELS.items():
+            if label.startswith(prefix):
+                setattr(snapshot, column, _int(value))
+                break
+    snapshot.entity_by_module = [(m, _int(q)) for m, q in _table(md, "### 2.1")]
+    snapshot.endpoints_by_controller = [(c, _int(q)) for c, q in _table(md, "### 2.2")]
+    return totals, snapshot
+
+
+def _print_rows(rows: list[sqlite3.Row], as_json: bool) -> None:
+    if as_json:
+        print(json.dumps([dict(r) for r in rows], ensure_ascii=False, indent=2))
+        return
+    if not rows:
+        print("(sem registros)")
+        return
+    keys = rows[0].keys()
+    widths = [max(len(k), *(len(str(r[k])) for r in rows)) for k in keys]
+    print("  ".join(k.ljust(w) for k, w in zip(keys, widths)))
+    for r in rows:
+        print("  ".join(str(r[k]).ljust(w) for k, w in zip(keys, widths)))
+
+
+def main(argv: list[str] | None = None) -> int:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--db", type=Path, default=DEFAULT_DB, help="Banco SQLite do historico.")
+    common.add_argument("--json", action="store_true", help="Saida em JSON.")
+    parser = argparse.ArgumentParser(description="Historico de recontagens APF (SQLite).")
+    sub = parser.add_subparsers(dest="command", required=True)
+    add_parser = functools.partial(sub.add_parser, parents=[common])
+
+    p_list = add_parser("list", help="Snapshots gravados, do mais recente.")
+    p_list.add_argument("--limit", type=int, default=20)
+
+    p_trend = add_parser("trend", help="Serie temporal de metricas.")
+    p_trend.add_argument("metrics", nargs="+", choices=TREND_METRICS, metavar="METRICA")
+    p_trend.add_argument("--since", help="Data inicial (AAAA-MM-DD).")
+    p_trend.add_argument("--per-day", action="store_true", help="Apenas o ultimo snapshot de cada dia.")
+
+    p_ctl = add_parser("controller", help="Historico de um controller.")
+    p_ctl.add_argument("name", nargs="?", help="Nome do controller (omitido: lista os conhecidos).")
+
+    p_mod = add_parser("module", help="Historico de um modulo de entidades.")
+    p_mod.add_argument("name", nargs="?", help="Nome do modulo (omitido: lista os conhecidos).")
+
+    p_import = add_parser("import-md", help="Importa snapshots Markdown existentes (reimportar substitui).")
+    p_import.add_argument("files", nargs="+", type=Path)
+
+    args = parser.parse_args(argv)
+
+    with SnapshotStore(args.db) as store:
+        if args.command == "list":
+            _print_rows(store.snapshots(args.limit), args.json)
+        elif args.command == "trend":
+            _print_rows(store.trend(args.metrics, args.since, args.per_day), args.json)
+        elif args.command == "controller":
+            if not args.name:
+                print("\n".join(store.names("controller_endpoints", "controller")))
+            else:
+                _print_rows(store.controller_history(args.name), args.json)
+        elif args.command == "module":
+            if not args.name:
+                print("\n".join(store.names("entity_modules", "modulo")))
+            else:
+                _print_rows(store.module_history(args.name), args.json)
+        elif args.command == "import-md":
+            for path in args.files:
+                try:
+                    totals, snapshot = parse_snapshot_md(path.read_text(encoding="utf-8"))
+                except (OSError, ValueError) as exc:
+                    print(f"Ignorado {path}: {exc}", file=sys.stderr)
+                    continue
+                snapshot_id = store.save(totals, snapshot, source=f"markdown:{path.name}")
+                print(f"{path} -> snapshot {snapshot_id}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
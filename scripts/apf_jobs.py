@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""Execucao retomavel das varreduras longas (arquivos e commits) com checkpoint.
+
+``scan`` percorre ``apps/`` e ``docs/Sistema legado`` arquivo a arquivo
+(tamanho, linhas, tipos/acoes/regras C# da API, entidades e rotas do
+backend legado); ``delta`` calcula a contagem de melhoria de cada commit
+contra o seu pai (``apfscan.delta``). Cada resultado e gravado em
+``output/cache/jobs/<job>-<hash>.jsonl`` assim que fica pronto; uma nova
+execucao com os mesmos parametros retoma de onde parou. O progresso
+(itens/s e ETA) vai para stderr a cada ``--progresso`` segundos.
+
+``--tempo`` e ``--limite`` encerram a execucao depois de N segundos ou N
+itens novos; SIGTERM/SIGINT (preempcao do agente de CI) encerram depois do
+item corrente. Nesses casos o relatorio nao e gerado e o codigo de saida e
+3: basta repetir o comando. Arquivos alterados mudam de chave
+(``caminho:tamanho:mtime``) e sao recalculados; a chave antiga sai do
+checkpoint. Commits nao mudam: faixas diferentes (``delta A B`` e depois
+``delta C D``) compartilham o checkpoint e nenhuma apaga a outra.
+
+No ``delta``, os arquivos nao alterados em cada commit vem do indice C# da
+arvore de trabalho, como em ``apf_delta.py``, e as entidades do modelo EF
+da arvore de trabalho. Por isso o checkpoint do ``delta`` e separado por
+assinatura da arvore (tamanho e mtime desses arquivos): depois de editar
+a arvore de trabalho, os commits sao recalculados.
+
+Usage:
+  python3 scripts/apf_jobs.py scan --tempo 600
+  python3 scripts/apf_jobs.py scan --output docs/varredura-completa.md
+  python3 scripts/apf_jobs.py delta --limite 50 --json
+  python3 scripts/apf_jobs.py delta 9e21bf1 HEAD --reiniciar
+"""
+from __future__ import annotations
+
+import argparse
+import functools
+import hashlib
+import json
+import subprocess
+import sys
+from collections import defaultdict
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from apfscan.bytescan import decode_span
+from apfscan.csharp import API_ROOT, DEFAULT_CACHE, INDEX_EXCLUDES, CsFile, CsIndex, parse_cs
+from apfscan.delta import OPERACOES, count_delta
+from apfscan.efmodel import DBCONTEXT_PATH, SNAPSHOT_PATH, load_ef_model
+from apfscan.jobs import Budget, JobStatus, job_checkpoint, run_job
+from apfscan.legacy import ENTITIES_DIR, ROUTES_DIR, parse_entity, parse_routes
+from apfscan.walk import walk_files
+
+ROOT = Path(__file__).resolve().parent.parent
+SCAN_ROOTS = (Path("apps"), Path("docs") / "Sistema legado")
+EMPTY_TREE = "4b825dc642cb6eb9a060e54bf8d69288fbee4904"
+EXIT_INCOMPLETE = 3
+# Bumped when the per-item result changes, so old checkpoints are not resumed.
+SCAN_VERSION = 1
+DELTA_VERSION = 2
+
+
+def fmt_int(value: int) -> str:
+    return f"{value:,}".replace(",", ".")
+
+
+# --- scan ----------------------------------------------------------------
+
+
+def scan_keys(root: Path) -> list[str]:
+    keys = []
+    for base in SCAN_ROOTS:
+        for entry in walk_files(root / base):
+            st = entry.stat()
+            keys.append(f"{Path(entry.path).relative_to(root).as_posix()}:{st.st_size}:{st.st_mtime_ns}")
+    return keys
+
+
+def _area(rel: str) -> str:
+    parts = rel.split("/")
+    return "/".join(parts[:3] if parts[0] == "docs" else parts[:2])
+
+
+def _indexed(rel: str) -> bool:
+    """Same files as ``CsIndex.refresh``: ``.cs`` under ``apps/api`` outside Migrations."""
+    parts = rel.split("/")
+    return rel.endswith(".cs") and rel.startswith(API_ROOT.as_posix() + "/") and not INDEX_EXCLUDES & set(parts[:-1])
+
+
+def scan_path(key: str) -> str:
+    """The file a ``caminho:tamanho:mtime`` key versions."""
+    return key.rsplit(":", 2)[0]
+
+
+def scan_item(root: Path, key: str) -> dict[str, Any]:
+    rel, size, mtime_ns = key.rsplit(":", 2)
+    data = (root / rel).read_bytes()
+    result: dict[str, Any] = {"area": _area(rel), "bytes": len(data), "lines": data.count(b"\n")}
+    if _indexed(rel):
+        result["cs"] = parse_cs(decode_span(data), rel, int(size), int(mtime_ns)).to_dict()
+    elif rel.endswith(".php") and rel.startswith(ENTITIES_DIR.as_posix() + "/"):
+        entity = parse_entity(decode_span(data).splitlines(keepends=True), rel)
+        if entity is not None:
+            result["entidade"] = {"name": entity.name, "table": entity.table, "det": entity.det, "pf": entity.pf}
+    elif rel.endswith(".php") and rel.startswith(ROUTES_DIR.as_posix() + "/"):
+        result["rotas"] = len(parse_routes(decode_span(data).splitlines(keepends=True), rel))
+    return result
+
+
+@dataclass
+class AreaTotals:
+    arquivos: int = 0
+    bytes: int = 0
+    linhas: int = 0
+
+
+def scan_markdown(results: dict[str, dict[str, Any]], status: JobStatus) -> str:
+    areas: dict[str, AreaTotals] = defaultdict(AreaTotals)
+    types = actions = rules = routes = 0
+    entities = []
+    for item in results.values():
+        totals = areas[item["area"]]
+        totals.arquivos += 1
+        totals.bytes += item["bytes"]
+        totals.linhas += item["lines"]
+        if "cs" in item:
+            for cs_type in item["cs"]["types"]:
+                types += 1
+                actions += len(cs_type["actions"])
+                rules += len(cs_type["rules"])
+        if "entidade" in item:
+            entities.append(item["entidade"])
+        routes += item.get("rotas", 0)
+    lines = [
+        "# Varredura Completa (apps + Sistema legado)",
+        "",
+        f"- Arquivos: **{fmt_int(status.total)}** ({fmt_int(status.resumed)} do checkpoint, "
+        f"{fmt_int(status.processed)} nesta execucao; {status.seconds:.1f} s)",
+        f"- API migrada: **{fmt_int(types)}** tipos C#, {fmt_int(actions)} acoes, {fmt_int(rules)} regras de validacao",
+        f"- Backend legado: **{len(entities)}** entidades ({fmt_int(sum(e['pf'] for e in entities))} PF como ALI), "
+        f"{fmt_int(routes)} rotas",
+        "",
+        "## Por area",
+        "",
+        "| Area | Arquivos | Linhas | KB |",
+        "|---|---:|---:|---:|",
+    ]
+    for name, t in sorted(areas.items()):
+        lines.append(f"| {name} | {fmt_int(t.arquivos)} | {fmt_int(t.linhas)} | {fmt_int(round(t.bytes / 1024))} |")
+    lines.append("")
+    return "\n".join(lines)
+
+
+def seed_index(root: Path, results: dict[str, dict[str, Any]]) -> int:
+    """Replace the shared C# index with the files parsed by the scan."""
+    index = CsIndex.load(root, root / DEFAULT_CACHE, refresh=False)
+    index.files = {item["cs"]["path"]: CsFile.from_dict(item["cs"]) for item in results.values() if "cs" in item}
+    index.save()
+    return len(index.files)
+
+
+# --- delta ---------------------------------------------------------------
+
+
+def commit_keys(root: Path, base: str | None, head: str) -> tuple[list[str], dict[str, tuple[str, str, str]]]:
+    """First-parent commits of ``base..head``, oldest first, with (parent, date, subject)."""
+    rev_range = f"{base}..{head}" if base else head
+    out = subprocess.run(
+        ["git", "log", "--first-parent", "--reverse", "--format=%H%x00%P%x00%cs%x00%s", rev_range],
+        cwd=root, capture_output=True, text=True, check=True,
+    ).stdout
+    keys, meta = [], {}
+    for line in out.splitlines():
+        sha, parents, date, subject = line.split("\0", 3)
+        keys.append(sha)
+        meta[sha] = (parents.split()[0] if parents else EMPTY_TREE, date, subject)
+    return keys, meta
+
+
+def tree_signature(root: Path, index: CsIndex) -> str:
+    """Stamps of the working-tree files a delta result reads besides the commits."""
+    h = hashlib.sha1()
+    for rel, cs_file in sorted(index.files.items()):
+        h.update(f"{rel}:{cs_file.size}:{cs_file.mtime_ns}\n".encode())
+    for path in (SNAPSHOT_PATH, DBCONTEXT_PATH):
+        full = root / path
+        if full.exists():
+            st = full.stat()
+            h.update(f"{path.as_posix()}:{st.st_size}:{st.st_mtime_ns}\n".encode())
+    return h.hexdigest()
+
+
+def delta_worker(root: Path, meta: dict[str, tuple[str, str, str]], index: CsIndex) -> Callable[[str], dict[str, Any]]:
+    state: dict[str, Any] = {}
+
+    def work(sha: str) -> dict[str, Any]:
+        if not state:  # loaded on the first commit that is not in the checkpoint
+            try:
+                state["entities"] = {e.short_name for e in load_ef_model(root).tables()}
+            except RuntimeError:
+                state["entities"] = set()
+        parent, date, subject = meta[sha]
+        delta = count_delta(root, parent, sha, index=index, entity_names=state["entities"])
+        return {
+            "commit": sha[:10],
+            "data": date,
+            "assunto": subject,
+            "arquivos": len(delta.changed_files),
+            "funcoes": len(delta.functions),
+            **{op.lower(): delta.total(op) for op in OPERACOES.values()},
+            "total": delta.total(),
+        }
+
+    return work
+
+
+def delta_markdown(results: dict[str, dict[str, Any]], status: JobStatus) -> str:
+    rows = list(results.values())
+    lines = [
+        "# Contagem APF de Melhoria por Commit",
+        "",
+        f"- Commits: **{fmt_int(status.total)}** ({fmt_int(status.resumed)} do checkpoint, "
+        f"{fmt_int(status.processed)} nesta execucao; {status.seconds:.1f} s)",
+        f"- Total nao ajustado: **{fmt_int(sum(r['total'] for r in rows))} PF**",
+        "",
+        "| Commit | Data | Assunto | Arquivos | Funcoes | Inclusao | Alteracao | Exclusao | PF |",
+        "|---|---|---|---:|---:|---:|---:|---:|---:|",
+    ]
+    for r in rows:
+        subject = r["assunto"].replace("|", "\\|")
+        lines.append(
+            f"| `{r['commit']}` | {r['data']} | {subject} | {r['arquivos']} | {r['funcoes']} | "
+            f"{fmt_int(r['inclusao'])} | {fmt_int(r['alteracao'])} | {fmt_int(r['exclusao'])} | {fmt_int(r['total'])} |"
+        )
+    lines.append("")
+    return "\n".join(lines)
+
+
+# --- main ----------------------------------------------------------------
+
+
+def main(argv: list[str] | None = None) -> int:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--root", type=Path, default=ROOT, help="Raiz do repositorio.")
+    common.add_argument("--tempo", type=float, help="Encerra depois de N segundos (retomavel).")
+    common.add_argument("--limite", type=int, help="Encerra depois de N itens novos (retomavel).")
+    common.add_argument("--reiniciar", action="store_true", help="Descarta o checkpoint e comeca do zero.")
+    common.add_argument("--progresso", type=float, default=2.0, help="Intervalo do progresso em segundos (padrao: 2).")
+    common.add_argument("--output", type=Path, help="Grava o relatorio Markdown neste arquivo.")
+    common.add_argument("--json", action="store_true", help="Imprime os resultados em JSON.")
+    parser = argparse.ArgumentParser(description="Varreduras longas retomaveis, com checkpoint por item.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    add_parser = functools.partial(sub.add_parser, parents=[common])
+
+    p_scan = add_parser("scan", help="Varredura arquivo a arquivo de apps/ e docs/Sistema legado.")
+    p_scan.add_argument("--sem-indice", action="store_true", help="Nao atualiza o indice C# compartilhado.")
+
+    p_delta = add_parser("delta", help="Contagem de melhoria de cada commit contra o pai.")
+    p_delta.add_argument("base", nargs="?", help="Revisao inicial, exclusiva (omitida: desde o primeiro commit).")
+    p_delta.add_argument("head", nargs="?", default="HEAD", help="Revisao final (padrao: HEAD).")
+
+    args = parser.parse_args(argv)
+    root = args.root.resolve()
+    budget = Budget(seconds=args.tempo, items=args.limite)
+
+    if args.command == "scan":
+        keys = scan_keys(root)
+        checkpoint = job_checkpoint(root, "scan", {"version": SCAN_VERSION, "index": CsIndex.VERSION})
+        work: Callable[[str], Any] = functools.partial(scan_item, root)
+        label = "arquivos"
+        identity: Callable[[str], str] | None = scan_path
+    else:
+        try:
+            keys, meta = commit_keys(root, args.base, args.head)
+        except subprocess.CalledProcessError as exc:
+            print(f"Erro ao listar commits: {exc.stderr.strip()}", file=sys.stderr)
+            return 2
+        index = CsIndex.load(root, root / DEFAULT_CACHE)
+        checkpoint = job_checkpoint(
+            root, "delta", {"version": DELTA_VERSION, "index": CsIndex.VERSION, "tree": tree_signature(root, index)}
+        )
+        work = delta_worker(root, meta, index)
+        label = "commits"
+        identity = None  # a commit is never superseded
+
+    if args.reiniciar:
+        checkpoint.reset()
+    results, status = run_job(
+        checkpoint, keys, work, budget=budget, label=label, progress_interval=args.progresso, identity=identity
+    )
+
+    if not status.complete:
+        motivo = {"tempo": "limite de tempo", "itens": "limite de itens", "sinal": "sinal recebido"}[status.stopped or "sinal"]
+        print(
+            f"Interrompido ({motivo}): {fmt_int(status.done)}/{fmt_int(status.total)} {label}; "
+            f"checkpoint em {checkpoint.path}. Repita o comando para continuar.",
+            file=sys.stderr,
+        )
+        return EXIT_INCOMPLETE
+
+    if args.command == "scan":
+        if not args.sem_indice:
+            seed_index(root, results)
+        if args.json:
+            print(json.dumps({scan_path(key): {k: v for k, v in r.items() if k != "cs"} for key, r in results.items()},
+                             ensure_ascii=False, indent=2))
+            return 0
+        text = scan_markdown(results, status)
+    else:
+        if args.json:
+            print(json.dumps(list(results.values()), ensure_ascii=False, indent=2))
+            return 0
+        text = delta_markdown(results, status)
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(text, encoding="utf-8")
+        print(f"Markdown gerado em: {args.output}")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
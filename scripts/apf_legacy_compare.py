@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""Comparativo de ALIs: entidades Doctrine do legado x modelo EF migrado.
+
+Le as anotacoes ``@ORM\\*`` de ``docs/Sistema legado/Eleitoral-Backend/app/Entities``
+e as rotas de ``routes/*.php`` (uma passada por arquivo), casa cada entidade
+legada com a entidade migrada pelo nome normalizado e gera o comparativo por
+modulo usado na justificativa do gap (``docs/justificativa-gap-apf.md``).
+
+Com ``--update-doc`` o bloco entre ``<!-- apf-legado:inicio -->`` e
+``<!-- apf-legado:fim -->`` do documento e substituido pela tabela gerada.
+
+Usage:
+  python3 scripts/apf_legacy_compare.py
+  python3 scripts/apf_legacy_compare.py --output docs/comparativo-ali-legado.md
+  python3 scripts/apf_legacy_compare.py --update-doc docs/justificativa-gap-apf.md
+  python3 scripts/apf_legacy_compare.py --json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from collections import Counter
+from dataclasses import asdict
+from pathlib import Path
+
+from apfscan.efmodel import load_ef_model
+from apfscan.legacy import AliComparison, LegacyScan, compare_ali, scan_legacy
+from apfscan.snapshot import count_entities_by_module
+
+ROOT = Path(__file__).resolve().parent.parent
+DOC_BEGIN = "<!-- apf-legado:inicio -->"
+DOC_END = "<!-- apf-legado:fim -->"
+RET_RULE = (
+    "RET = 1 + subgrupos dependentes: no migrado, tipos owned e tabelas filhas 1:N com exclusao em cascata; "
+    "no legado, colecoes `OneToMany` com `cascade` remove/all ou `orphanRemoval`."
+)
+
+
+def fmt_int(value: int) -> str:
+    return f"{value:,}".replace(",", ".")
+
+
+def build_table(scan: LegacyScan, cmp: AliComparison) -> str:
+    """Bloco Markdown com o comparativo por modulo (reaproveitado por ``--update-doc``)."""
+    lines = [
+        "| Modulo (migrado) | Entidades migradas | Modelo EF | Legado correspondente "
+        "| PF ALI legado (sem agrupar) | PF ALI migrado (sem agrupar) |",
+        "|---|---:|---:|---:|---:|---:|",
+    ]
+    for m in cmp.modules:
+        lines.append(
+            f"| {m.modulo} | {m.migradas} | {m.modelo_ef} | {m.legado} | "
+            f"{fmt_int(m.pf_legado)} | {fmt_int(m.pf_migrado)} |"
+        )
+    lines.append(
+        f"| **Total** | **{sum(m.migradas for m in cmp.modules)}** | **{sum(m.modelo_ef for m in cmp.modules)}** | "
+        f"**{sum(m.legado for m in cmp.modules)}** | **{fmt_int(sum(m.pf_legado for m in cmp.modules))}** | "
+        f"**{fmt_int(sum(m.pf_migrado for m in cmp.modules))}** |"
+    )
+    lines.extend(
+        [
+            "",
+            f"Entidades legadas: **{len(scan.entities)}**; com correspondente migrado: **{len(cmp.matched)}**; "
+            f"somente no legado: **{len(cmp.legacy_only)}**; somente no migrado: **{len(cmp.migrated_only)}**.",
+            "",
+            "Contagem sem agrupamento: cada entidade (tabela) conta como um ALI proprio, pela matriz IFPUG. "
+            f"{RET_RULE} Os ALIs agrupados por processo de negocio juntam varias entidades num unico ALI, "
+            "por isso somam bem menos PF que as colunas acima; este bloco serve para comparar legado e "
+            "migrado entidade a entidade, nao substitui o agrupamento.",
+        ]
+    )
+    return "\n".join(lines)
+
+
+def build_markdown(scan: LegacyScan, cmp: AliComparison, seconds: float) -> str:
+    columns = sum(len(e.columns) for e in scan.entities)
+    associations = Counter(a.kind for e in scan.entities for a in e.associations)
+    methods = Counter(r.method for r in scan.routes)
+    lines = [
+        "# Comparativo de ALIs - Legado (Doctrine) x Migrado (EF Core)",
+        "",
+        f"- Arquivos lidos: **{scan.files}** em {seconds:.2f} s",
+        f"- Entidades Doctrine: **{len(scan.entities)}** ({fmt_int(columns)} colunas; associacoes: "
+        + ", ".join(f"{kind} {n}" for kind, n in sorted(associations.items()))
+        + ")",
+        f"- Rotas legadas: **{len(scan.routes)}** ("
+        + ", ".join(f"{method} {n}" for method, n in methods.most_common())
+        + ")",
+        "- Casamento por nome normalizado (palavras sem acento, no singular, em qualquer ordem); "
+        "PF ALI pela matriz IFPUG, uma entidade por ALI (legado: DET = colunas nao-chave + JoinColumn). "
+        + RET_RULE,
+        "",
+        "## Por modulo",
+        "",
+        build_table(scan, cmp),
+        "",
+        "## Entidades correspondentes",
+        "",
+        "| Legado | Tabela legada | DET legado | Migrado | Modulo | DET migrado |",
+        "|---|---|---:|---|---|---:|",
+    ]
+    for m in cmp.matched:
+        lines.append(
+            f"| {m.legacy.name} | {m.legacy.table or '-'} | {m.legacy.det} | {m.migrated} | {m.modulo} | {m.migrated_det} |"
+        )
+    lines.extend(["", "## Somente no migrado", "", "| Entidade | Modulo | DET | PF |", "|---|---|---:|---:|"])
+    for m in cmp.migrated_only:
+        lines.append(f"| {m.migrated} | {m.modulo} | {m.migrated_det} | {m.migrated_pf} |")
+    lines.extend(["", "## Somente no legado", "", "| Entidade | Tabela | DET | PF |", "|---|---|---:|---:|"])
+    for m in cmp.legacy_only:
+        lines.append(f"| {m.legacy.name} | {m.legacy.table or '-'} | {m.legacy.det} | {m.legacy.pf} |")
+    routes_by_ctl = Counter(r.controller or "(closure)" for r in scan.routes)
+    lines.extend(["", "## Rotas legadas por controller", "", "| Controller | Rotas |", "|---|---:|"])
+    for ctl, n in sorted(routes_by_ctl.items(), key=lambda kv: (-kv[1], kv[0])):
+        lines.append(f"| {ctl} | {n} |")
+    lines.append("")
+    return "\n".join(lines)
+
+
+def update_doc(path: Path, block: str) -> None:
+    text = path.read_text(encoding="utf-8")
+    start = text.find(DOC_BEGIN)
+    end = text.find(DOC_END)
+    if start < 0 or end < start:
+        raise SystemExit(f"Marcadores {DOC_BEGIN} / {DOC_END} nao encontrados em {path}")
+    path.write_text(text[: start + len(DOC_BEGIN)] + "\n" + block + "\n" + text[end:], encoding="utf-8")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Compara as entidades do legado com o modelo EF migrado.")
+    parser.add_argument("--root", type=Path, default=ROOT, help="Raiz do repositorio.")
+    parser.add_argument("--output", type=Path, help="Grava o relatorio Markdown neste arquivo.")
+    parser.add_argument("--update-doc", type=Path, help="Atualiza o bloco marcado deste documento.")
+    parser.add_argument("--json", action="store_true", help="Imprime o comparativo em JSON.")
+    args = parser.parse_args(argv)
+    root = args.root.resolve()
+
+    start = time.perf_counter()
+    scan = scan_legacy(root)
+    cmp = compare_ali(scan.entities, load_ef_model(root), count_entities_by_module(root))
+    seconds = time.perf_counter() - start
+
+    if args.json:
+        payload = {
+            "files": scan.files,
+            "modules": [asdict(m) for m in cmp.modules],
+            "matched": [{"legado": m.legacy.name, "migrado": m.migrated, "modulo": m.modulo} for m in cmp.matched],
+            "legacy_only": [m.legacy.name for m in cmp.legacy_only],
+            "migrated_only": [{"entidade": m.migrated, "modulo": m.modulo} for m in cmp.migrated_only],
+            "routes": [asdict(r) for r in scan.routes],
+        }
+        print(json.dumps(payload, ensure_ascii=False, indent=2))
+        return 0
+
+    if args.update_doc:
+        update_doc(args.update_doc, build_table(scan, cmp))
+        print(f"Bloco atualizado em: {args.update_doc}")
+    text = build_markdown(scan, cmp, seconds)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(text, encoding="utf-8")
+        print(f"Markdown gerado em: {args.output}")
+    elif not args.update_doc:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Inventario das regras FluentValidation como evidencia de DET das EEs.
+
+Para cada validator de ``apps/api/CAU.Eleitoral.Application/Validators``
+(``AbstractValidator<Dto>``) lista o DTO validado, os campos validados
+(incluindo os dos validators aninhados via ``SetValidator``) e as regras
+entre campos, e cruza com as acoes de controller que recebem o DTO. As
+regras vem do indice C# compartilhado (``output/cache/csharp-index.json``),
+o mesmo usado pela contagem; nenhum arquivo e relido.
+
+Usage:
+  python3 scripts/apf_validators.py
+  python3 scripts/apf_validators.py --output docs/validadores-apf.md
+  python3 scripts/apf_validators.py --json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+from apfscan.csharp import DEFAULT_CACHE
+from apfscan.dtos import load_dto_index
+from apfscan.efmodel import load_ef_model
+from apfscan.validators import EndpointValidation, ValidatorInfo, actions_by_type, join_endpoints, scan_validators
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def build_markdown(validators: dict[str, list[ValidatorInfo]], rows: list[EndpointValidation], seconds: float) -> str:
+    joined = {r.dto for r in rows}
+    every = [v for infos in validators.values() for v in infos]
+    lines = [
+        "# Regras de Validacao (FluentValidation) x Endpoints",
+        "",
+        f"- Validators: **{len(every)}** ({sum(v.rules for v in every)} regras, "
+        f"{sum(v.checks for v in every)} verificacoes, "
+        f"{sum(v.cross_field for v in every)} entre campos); tempo {seconds:.2f} s",
+        f"- Endpoints com DTO validado: **{len(rows)}** ({len(joined)} DTOs)",
+        "- DET validado = campos com regra (aninhados contam como `Pai.Campo`); limite inferior do DET de entrada. "
+        "Com mais de um validator para o mesmo DTO, conta a uniao dos campos",
+        "",
+        "## Por endpoint",
+        "",
+        "| Controller | Acao | Tipo | DTO | DET validado | DET do DTO | DET da acao | Regras entre campos |",
+        "|---|---|---|---|---:|---:|---:|---:|",
+    ]
+    for r in rows:
+        lines.append(
+            f"| {r.controller} | {r.verb} {r.action} | {r.tipo} | {r.dto} | {r.det_validado} | "
+            f"{r.det_dto} | {r.det_acao} | {r.regras_cruzadas} |"
+        )
+    lines.extend(
+        [
+            "",
+            "## Validators",
+            "",
+            "| Validator | DTO | Campos | Regras | Entre campos | Aninhados | Endpoint |",
+            "|---|---|---:|---:|---:|---|---|",
+        ]
+    )
+    for v in every:
+        lines.append(
+            f"| {v.name} | {v.dto} | {v.det} | {v.rules} | {v.cross_field} | "
+            f"{', '.join(v.children) or '-'} | {'sim' if v.dto in joined else 'nao'} |"
+        )
+    lines.append("")
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Inventario das regras FluentValidation por endpoint.")
+    parser.add_argument("--root", type=Path, default=ROOT, help="Raiz do repositorio.")
+    parser.add_argument("--output", type=Path, help="Grava o relatorio Markdown neste arquivo.")
+    parser.add_argument("--json", action="store_true", help="Imprime validators e endpoints em JSON.")
+    args = parser.parse_args(argv)
+    root = args.root.resolve()
+
+    start = time.perf_counter()
+    model = load_ef_model(root)
+    dtos = load_dto_index(root, (e.short_name for e in model.tables()), root / DEFAULT_CACHE)
+    validators = scan_validators(dtos.index)
+    rows = join_endpoints(validators, actions_by_type(dtos.action_metrics()), dtos)
+    dtos.store()
+    dtos.index.save()
+    seconds = time.perf_counter() - start
+
+    if args.json:
+        payload = {
+            "validators": [{**asdict(v), "det": v.det} for infos in validators.values() for v in infos],
+            "endpoints": [asdict(r) for r in rows],
+        }
+        print(json.dumps(payload, ensure_ascii=False, indent=2))
+        return 0
+
+    text = build_markdown(validators, rows, seconds)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(text, encoding="utf-8")
+        print(f"Markdown gerado em: {args.output}")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
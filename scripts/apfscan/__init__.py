@@ -0,0 +1,7 @@
+"""Shared scanning helpers for the scripts in ``scripts/``."""
+from __future__ import annotations
+
+from . import bytescan
+from .walk import DEFAULT_EXCLUDES, GitIgnore, walk_files, walk_paths
+
+__all__ = ["DEFAULT_EXCLUDES", "bytescan", "GitIgnore", "walk_files", "walk_paths"]
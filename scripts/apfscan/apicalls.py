@@ -0,0 +1,334 @@
+"""Frontend HTTP calls joined against the backend route table.
+
+The service modules in ``apps/admin/src/services`` and
+``apps/public/src/services`` call the API through an axios instance
+(``api.get<T>(`/chapa/${id}`)``). :func:`extract_calls` pulls out each
+call's method and path template; :func:`route_table` builds the
+controller routes from the shared C# index. Both sides are reduced to the
+same normalized key (method + lower-case path with every parameter
+collapsed to ``{}``), so :func:`join_calls` is one pass over the calls
+against a hash index of the routes. Only calls that miss the hash (a
+literal segment where the route has a parameter) go through a per-method
+segment trie.
+"""
+from __future__ import annotations
+
+import re
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from . import bytescan
+from .csharp import CsIndex, CsType
+from .walk import walk_files
+
+SERVICE_DIRS = (Path("apps/admin/src/services"), Path("apps/public/src/services"))
+
+_CALL = re.compile(r"\b(\w+)\.(get|post|put|delete|patch)\s*(?=[<(])")
+_CONST = re.compile(r"\b(?:const|let|var)\s+(\w+)\s*(?::\s*[\w<>\[\]| ]+)?=\s*")
+_TEMPLATE_EXPR = re.compile(r"\$\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}")
+_ROUTE_PARAM = re.compile(r"\{[^}]*\}")
+_ROUTE_ATTR = re.compile(r'^Route\s*\(\s*"([^"]*)"')
+
+
+@dataclass(frozen=True)
+class HttpCall:
+    app: str
+    module: str
+    method: str
+    path: str
+    line: int
+
+    @property
+    def key(self) -> tuple[str, str]:
+        return self.method, normalize_path(self.path)
+
+
+@dataclass(frozen=True)
+class ApiRoute:
+    controller: str
+    action: str
+    method: str
+    path: str
+
+    @property
+    def key(self) -> tuple[str, str]:
+        return self.method, normalize_path(self.path)
+
+
+@dataclass
+class EndpointUsage:
+    routes: list[ApiRoute]
+    calls: list[HttpCall]
+    used: dict[ApiRoute, list[HttpCall]] = field(default_factory=dict)
+    unused: list[ApiRoute] = field(default_factory=list)
+    orphaned: list[HttpCall] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class ControllerUsage:
+    controller: str
+    endpoints: int
+    usados: int
+    nao_usados: int
+    chamadas: int
+
+
+@dataclass(frozen=True)
+class ServiceUsage:
+    app: str
+    modulo: str
+    chamadas: int
+    casadas: int
+    orfas: int
+
+
+def normalize_path(path: str) -> str:
+    """``/api/Chapa/{id:guid}/membros/`` and ``/chapa/${id}/membros`` -> ``chapa/{}/membros``."""
+    path = path.split("?", 1)[0].split("#", 1)[0]
+    path = _TEMPLATE_EXPR.sub("{}", path)
+    path = _ROUTE_PARAM.sub("{}", path)
+    path = path.strip().strip("/").lower()
+    if path == "api" or path.startswith("api/"):
+        path = path[4:]
+    return path
+
+
+def _read_literal(text: str, start: int) -> tuple[str, int] | None:
+    """String/template literal at ``text[start]``: (contents, end index)."""
+    quote = text[start] if start < len(text) else ""
+    if quote not in "'\"`" or not quote:
+        return None
+    i = start + 1
+    depth = 0
+    while i < len(text):
+        ch = text[i]
+        if ch == "\\":
+            i += 2
+            continue
+        if quote == "`" and text.startswith("${", i):
+            depth += 1
+            i += 2
+            continue
+        if depth and ch == "}":
+            depth -= 1
+        elif not depth and ch == quote:
+            return text[start + 1 : i], i + 1
+        i += 1
+    return None
+
+
+def _skip_generic(text: str, i: int) -> int:
+    if i < len(text) and text[i] == "<":
+        depth = 0
+        while i < len(text):
+            if text[i] in "<{(":
+                depth += 1
+            elif text[i] in ">})":
+                depth -= 1
+                if depth == 0:
+                    return i + 1
+            i += 1
+    return i
+
+
+def _literal_values(text: str, start: int) -> list[str]:
+    """Literal, or both branches of ``cond ? 'a' : 'b'``, starting at ``start``."""
+    i = start
+    while i < len(text) and text[i].isspace():
+        i += 1
+    found = _read_literal(text, i)
+    if found is not None:
+        return [found[0]]
+    # Ternary: take every literal up to the end of the statement.
+    end = text.find("\n\n", i)
+    segment = text[i : end if end != -1 else len(text)]
+    segment = segment.split(";", 1)[0]
+    if "?" not in segment:
+        return []
+    values = []
+    j = 0
+    while j < len(segment):
+        lit = _read_literal(segment, j) if segment[j] in "'\"`" else None
+        if lit is not None:
+            values.append(lit[0])
+            j = lit[1]
+        else:
+            j += 1
+    return values
+
+
+def extract_calls(text: str, app: str, module: str) -> list[HttpCall]:
+    consts: list[tuple[int, str, list[str]]] = []
+    for m in _CONST.finditer(text):
+        values = _literal_values(text, m.end())
+        if values:
+            consts.append((m.start(), m.group(1), values))
+
+    def resolve(name: str, before: int) -> list[str]:
+        candidates = [values for pos, const, values in consts if const == name and pos < before]
+        return candidates[-1] if candidates else []
+
+    def expand(path: str, before: int) -> str:
+        def sub(m: re.Match[str]) -> str:
+            inner = m.group(0)[2:-1].strip()
+            if re.fullmatch(r"\w+", inner):
+                values = resolve(inner, before)
+                if len(values) == 1 and values[0].startswith("/"):
+                    return values[0]
+            return m.group(0)
+
+        return _TEMPLATE_EXPR.sub(sub, path)
+
+    calls: list[HttpCall] = []
+    for m in _CALL.finditer(text):
+        receiver = m.group(1)
+        if receiver != "axios" and not receiver.lower().endswith(("api", "client", "http")):
+            continue
+        i = _skip_generic(text, m.end())
+        while i < len(text) and text[i].isspace():
+            i += 1
+        if i >= len(text) or text[i] != "(":
+            continue
+        i += 1
+        while i < len(text) and text[i].isspace():
+            i += 1
+        literal = _read_literal(text, i)
+        if literal is not None:
+            paths = [literal[0]]
+        else:
+            ident = re.match(r"\w+", text[i:])
+            paths = resolve(ident.group(0), m.start()) if ident else []
+        line = text.count("\n", 0, m.start()) + 1
+        for path in paths:
+            path = expand(path, m.start())
+            if not path.startswith(("/", "$")):
+                continue
+            calls.append(HttpCall(app=app, module=module, method=m.group(2).upper(), path=path, line=line))
+    return calls
+
+
+def scan_calls(root: Path, service_dirs: Iterable[Path] = SERVICE_DIRS) -> list[HttpCall]:
+    calls: list[HttpCall] = []
+    for rel_dir in service_dirs:
+        app = rel_dir.parts[1] if len(rel_dir.parts) > 1 else rel_dir.name
+        for entry in walk_files(root / rel_dir, (".ts", ".tsx")):
+            module = entry.name.rsplit(".", 1)[0]
+            calls.extend(extract_calls(bytescan.read_text(entry.path), app, module))
+    return calls
+
+
+def _controller_prefix(controller: CsType, by_name: dict[str, list[CsType]]) -> str:
+    seen: set[str] = set()
+    current: CsType | None = controller
+    while current is not None and current.name not in seen:
+        seen.add(current.name)
+        for attr in current.attributes:
+            m = _ROUTE_ATTR.match(attr)
+            if m:
+                return m.group(1)
+        current = next(
+            (by_name[b][0] for b in current.bases if b in by_name and by_name[b][0].kind == "class"),
+            None,
+        )
+    return ""
+
+
+def route_table(index: CsIndex) -> list[ApiRoute]:
+    by_name = index.by_name()
+    routes: list[ApiRoute] = []
+    for _, controller in index.controllers():
+        token = controller.name.removesuffix("Controller")
+        prefix = _controller_prefix(controller, by_name).replace("[controller]", token)
+        for action in controller.actions:
+            template = (action.template or "").replace("[action]", action.name)
+            if template.startswith(("~/", "/")):
+                path = template.lstrip("~")
+            else:
+                path = "/".join(p for p in (prefix.strip("/"), template.strip("/")) if p)
+            routes.append(ApiRoute(controller=controller.name, action=action.name, method=action.verb, path="/" + path.lstrip("/")))
+    return routes
+
+
+class _RouteTrie:
+    """Per-method segment trie, for calls whose literal segment hits a route parameter
+    (``/configuracao/eleicao`` against ``{chave}``)."""
+
+    def __init__(self) -> None:
+        self.children: dict[str, _RouteTrie] = {}
+        self.routes: list[ApiRoute] = []
+
+    def add(self, segments: list[str], route: ApiRoute) -> None:
+        node = self
+        for seg in segments:
+            node = node.children.setdefault(seg, _RouteTrie())
+        node.routes.append(route)
+
+    def match(self, segments: list[str]) -> list[ApiRoute]:
+        if not segments:
+            return self.routes
+        head, rest = segments[0], segments[1:]
+        # Literal first, as ASP.NET routing prefers it.
+        for key in (head, "{}"):
+            child = self.children.get(key)
+            if child is not None:
+                found = child.match(rest)
+                if found:
+                    return found
+        return []
+
+
+def join_calls(routes: list[ApiRoute], calls: list[HttpCall]) -> EndpointUsage:
+    """Hash join on the normalized (method, path) key, with a trie fallback."""
+    by_key: dict[tuple[str, str], list[ApiRoute]] = defaultdict(list)
+    tries: dict[str, _RouteTrie] = defaultdict(_RouteTrie)
+    for route in routes:
+        by_key[route.key].append(route)
+        tries[route.method].add(route.key[1].split("/"), route)
+
+    usage = EndpointUsage(routes=routes, calls=calls)
+    for call in calls:
+        matches = by_key.get(call.key)
+        if not matches and call.method in tries:
+            matches = tries[call.method].match(call.key[1].split("/"))
+        if not matches:
+            usage.orphaned.append(call)
+            continue
+        for route in matches:
+            usage.used.setdefault(route, []).append(call)
+    usage.unused = [r for r in routes if r not in usage.used]
+    return usage
+
+
+def usage_by_controller(usage: EndpointUsage) -> list[ControllerUsage]:
+    grouped: dict[str, list[ApiRoute]] = defaultdict(list)
+    for route in usage.routes:
+        grouped[route.controller].append(route)
+    rows = []
+    for controller in sorted(grouped):
+        used = [r for r in grouped[controller] if r in usage.used]
+        rows.append(
+            ControllerUsage(
+                controller=controller,
+                endpoints=len(grouped[controller]),
+                usados=len(used),
+                nao_usados=len(grouped[controller]) - len(used),
+                # A call matching several routes of the controller is still one call site.
+                chamadas=len({call for r in used for call in usage.used[r]}),
+            )
+        )
+    return rows
+
+
+def usage_by_service(usage: EndpointUsage) -> list[ServiceUsage]:
+    grouped: dict[tuple[str, str], list[HttpCall]] = defaultdict(list)
+    for call in usage.calls:
+        grouped[(call.app, call.module)].append(call)
+    orphaned = set(usage.orphaned)
+    rows = []
+    for (app, module) in sorted(grouped):
+        calls = grouped[(app, module)]
+        orfas = sum(1 for c in calls if c in orphaned)
+        rows.append(ServiceUsage(app=app, modulo=module, chamadas=len(calls), casadas=len(calls) - orfas, orfas=orfas))
+    return rows
@@ -0,0 +1,116 @@
+"""Content-addressed cache for rendered reports (PDF, Markdown).
+
+A report is a pure function of its inputs and of the code that renders it,
+so its bytes are stored under a key that hashes both: the inputs
+normalized to canonical JSON (dataclasses as dicts, keys sorted, ``\\r\\n``
+as ``\\n``, files by the hash of their bytes) and a renderer version built
+from the renderer's source files and the versions of the packages it lays
+out with. A run whose key is already stored copies the artifact instead of
+rendering it; one hash per run replaces a full ReportLab layout.
+
+Everything the artifact prints goes into the key, stamps (source file
+name, commit) included: a cache hit must never show the stamps of the run
+that rendered it. Cached reports therefore print dates derived from their
+inputs (a commit date) rather than the wall clock, which would make every
+key unique; cheap renders such as Markdown are not cached at all.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+from collections.abc import Callable, Iterable
+from dataclasses import asdict, is_dataclass
+from importlib import metadata
+from pathlib import Path
+from typing import Any
+
+VERSION = 1
+DEFAULT_BUILD_CACHE = Path("output/cache/build")
+
+
+def file_digest(path: Path) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with path.open("rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def normalize(value: Any) -> Any:
+    """JSON-ready canonical form of ``value``."""
+    if is_dataclass(value) and not isinstance(value, type):
+        value = asdict(value)
+    if isinstance(value, dict):
+        return {str(k): normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [normalize(v) for v in value]
+    if isinstance(value, Path):
+        return {"file": value.name, "blake2b": file_digest(value)}
+    if isinstance(value, str):
+        return value.replace("\r\n", "\n")
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def renderer_version(sources: Iterable[Path], packages: Iterable[str] = ()) -> str:
+    """Hash of the renderer's source files plus the installed versions of ``packages``."""
+    h = hashlib.blake2b(digest_size=16)
+    for path in sources:
+        h.update(path.name.encode())
+        h.update(path.read_bytes())
+    for name in packages:
+        try:
+            h.update(f"{name}=={metadata.version(name)}".encode())
+        except metadata.PackageNotFoundError:
+            h.update(f"{name}==".encode())
+    return h.hexdigest()
+
+
+def build_key(renderer: str, inputs: Any) -> str:
+    payload = json.dumps(
+        {"version": VERSION, "renderer": renderer, "inputs": normalize(inputs)},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.blake2b(payload.encode(), digest_size=20).hexdigest()
+
+
+class BuildCache:
+    """Artifacts stored as ``<dir>/<key[:2]>/<key><suffix>``."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+
+    def path(self, key: str, suffix: str) -> Path:
+        return self.directory / key[:2] / f"{key}{suffix}"
+
+    def fetch(self, key: str, dest: Path) -> bool:
+        cached = self.path(key, dest.suffix)
+        if not cached.exists():
+            return False
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(cached, dest)
+        return True
+
+    def store(self, key: str, src: Path) -> None:
+        cached = self.path(key, src.suffix)
+        cached.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cached.with_suffix(cached.suffix + ".tmp")
+        shutil.copyfile(src, tmp)
+        os.replace(tmp, cached)
+
+    def render(self, key: str, dest: Path, build: Callable[[Path], None], *, force: bool = False) -> bool:
+        """Copy the artifact for ``key`` to ``dest``, or ``build(dest)`` and store it.
+
+        Returns True on a cache hit; ``force`` always builds (and refreshes the entry).
+        """
+        if not force and self.fetch(key, dest):
+            return True
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        build(dest)
+        self.store(key, dest)
+        return False
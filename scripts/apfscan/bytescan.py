@@ -0,0 +1,79 @@
+"""Memory-mapped, bytes-level scanning.
+
+The patterns the scripts look for (``[HttpGet``, ``: BaseEntity``, JSX
+``>...<``) are ASCII, so they can run as compiled ``bytes`` regexes directly
+on an ``mmap`` of the file. Only the matched spans are decoded; nothing
+else is copied or turned into ``str``.
+"""
+from __future__ import annotations
+
+import mmap
+import os
+import re
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+BytesPattern = re.Pattern[bytes]
+
+
+@contextmanager
+def mapped(path: str | os.PathLike[str]) -> Iterator[mmap.mmap | bytes]:
+    """Read-only view of the file; empty files (which cannot be mmapped) yield ``b""``."""
+    with open(path, "rb") as f:
+        buffer: mmap.mmap | None = None
+        try:
+            if os.fstat(f.fileno()).st_size > 0:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # Pseudo-files and some network filesystems cannot be mapped.
+            pass
+        if buffer is None:
+            # The yields stay outside the try: an exception raised by the
+            # caller's ``with`` body must not be taken for a mapping failure.
+            yield f.read()
+            return
+        try:
+            yield buffer
+        finally:
+            buffer.close()
+
+
+def decode_span(data: bytes) -> str:
+    """UTF-8 first; legacy (PHP/Angular) sources saved as cp1252/latin-1 fall back safely."""
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        try:
+            return data.decode("cp1252")
+        except UnicodeDecodeError:
+            return data.decode("latin-1")
+
+
+def contains(path: str | os.PathLike[str], pattern: BytesPattern) -> bool:
+    with mapped(path) as buf:
+        return pattern.search(buf) is not None
+
+
+def count(path: str | os.PathLike[str], pattern: BytesPattern) -> int:
+    with mapped(path) as buf:
+        return sum(1 for _ in pattern.finditer(buf))
+
+
+def find_groups(path: str | os.PathLike[str], pattern: BytesPattern, group: int | str = 0) -> list[str]:
+    """Decoded text of ``group`` for every match, in file order."""
+    with mapped(path) as buf:
+        return [decode_span(m.group(group)) for m in pattern.finditer(buf)]
+
+
+def iter_spans(
+    buf: mmap.mmap | bytes, pattern: BytesPattern, group: int | str = 0
+) -> Iterator[tuple[int, str]]:
+    """``(offset, decoded group)`` pairs over an already mapped buffer."""
+    for m in pattern.finditer(buf):
+        yield m.start(group), decode_span(m.group(group))
+
+
+def read_text(path: str | os.PathLike[str]) -> str:
+    """Whole-file decode with the same fallback as :func:`decode_span`."""
+    with open(path, "rb") as f:
+        return decode_span(f.read())
@@ -0,0 +1,89 @@
+"""Columnar building blocks for large function lists.
+
+Categorical values (function type, CTL code) are interned once in a
+:class:`Categories` table and stored as small integer codes in an
+``array.array``; numeric columns are ``array("d")``. Group-bys run over the
+code column: ``numpy.bincount`` when NumPy is installed (the arrays are
+viewed with ``numpy.frombuffer``, no copy), otherwise ``collections.Counter``
+over the codes and a single pass for weighted sums. NumPy is optional and
+imported on first aggregation only.
+"""
+from __future__ import annotations
+
+import math
+from array import array
+from collections import Counter
+from typing import Any
+
+CODE_TYPECODE = "H"  # up to 65535 distinct labels per column
+VALUE_TYPECODE = "d"
+
+_numpy: Any = None
+
+
+def numpy() -> Any | None:
+    """The ``numpy`` module, or ``None`` when it is not installed."""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy as np
+        except ImportError:
+            np = False
+        _numpy = np
+    return _numpy or None
+
+
+class Categories:
+    """Label <-> code table; code 0 is reserved for "no value"."""
+
+    def __init__(self) -> None:
+        self.labels: list[str | None] = [None]
+        self._codes: dict[str, int] = {}
+
+    def code(self, label: str | None) -> int:
+        if label is None:
+            return 0
+        found = self._codes.get(label)
+        if found is None:
+            found = self._codes[label] = len(self.labels)
+            self.labels.append(label)
+        return found
+
+    def label(self, code: int) -> str | None:
+        return self.labels[code]
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+
+def group_count(codes: array, categories: Categories) -> dict[str, int]:
+    np = numpy()
+    if np is not None and len(codes):
+        counts = np.bincount(np.frombuffer(codes, dtype=np.uint16), minlength=len(categories)).tolist()
+    else:
+        by_code = Counter(codes)
+        counts = [by_code.get(code, 0) for code in range(len(categories))]
+    return {label: n for label, n in zip(categories.labels, counts) if label is not None and n}
+
+
+def group_sum(codes: array, values: array, categories: Categories) -> dict[str, float]:
+    """Sum of ``values`` per label present in ``codes`` (a label whose rows sum to 0 is kept)."""
+    np = numpy()
+    if np is not None and len(codes):
+        view = np.frombuffer(codes, dtype=np.uint16)
+        sums = np.bincount(view, weights=np.frombuffer(values, dtype=np.float64), minlength=len(categories)).tolist()
+        counts = np.bincount(view, minlength=len(categories)).tolist()
+    else:
+        sums = [0.0] * len(categories)
+        counts = [0] * len(categories)
+        for code, value in zip(codes, values):
+            sums[code] += value
+            counts[code] += 1
+    return {label: total for label, total, n in zip(categories.labels, sums, counts) if label is not None and n}
+
+
+def column_sum(values: array) -> float:
+    np = numpy()
+    if np is not None and len(values):
+        return float(np.frombuffer(values, dtype=np.float64).sum())
+    return math.fsum(values)
@@ -0,0 +1,617 @@
+"""Lightweight C# symbol extraction with a persistent, incremental index.
+
+Not a compiler: a line-based scanner with a brace-depth stack that knows
+enough of the shapes used in ``apps/api`` (records/classes with
+properties, positional records, constructor injection, controller actions
+and their attributes, FluentValidation ``RuleFor`` chains) to feed the APF
+estimators. Every C# scan shares one
+:class:`CsIndex`, persisted as JSON, so a file is parsed again only when
+its size or mtime changes.
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+from collections.abc import Iterable, Iterator
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from . import bytescan
+from .walk import DEFAULT_EXCLUDES, walk_files
+
+API_ROOT = Path("apps/api")
+DEFAULT_CACHE = Path("output/cache/csharp-index.json")
+# Migrations are generated code and an order of magnitude larger than the
+# rest of the API; the model snapshot has its own parser (efmodel).
+INDEX_EXCLUDES = DEFAULT_EXCLUDES | {"Migrations"}
+
+_TYPE_DECL = re.compile(
+    r"^(?:(?:public|internal|private|protected|sealed|abstract|static|partial|readonly|file)\s+)*"
+    r"(class|record|interface|struct|enum)\s+(?:class\s+|struct\s+)?(\w+)\s*(<[^>]*>)?\s*"
+)
+_NAMESPACE = re.compile(r"^namespace\s+([\w.]+)")
+_PROPERTY = re.compile(
+    r"^(?:public|internal)\s+(?:(?:virtual|override|required|new|sealed|abstract)\s+)*"
+    r"([\w<>\[\],.?() ]+?)\s+(\w+)\s*\{\s*(?:get|init|set)\b"
+)
+_FIELD = re.compile(
+    r"^(?:private|protected|internal|public)\s+(?:(?:readonly|static|volatile)\s+)*"
+    r"([\w<>\[\],.?]+)\s+(_?\w+)\s*(?:;|=(?!>))"
+)
+_METHOD = re.compile(
+    r"^(?:(?:public|protected|private|internal|static|virtual|override|async|new|sealed|abstract)\s+)+"
+    r"([\w<>\[\],.?() ]+?)\s+(\w+)\s*(?:<[^>]*>)?\s*\("
+)
+_ATTRIBUTE_LINE = re.compile(r"^\[(.*)\]$")
+_HTTP_ATTR = re.compile(r'^Http(Get|Post|Put|Delete|Patch)\s*(?:\(\s*"([^"]*)")?')
+_ROUTE_ATTR = re.compile(r'^Route\s*\(\s*"([^"]*)"')
+_PRODUCES = re.compile(r"ProducesResponseType\s*\(\s*typeof\s*\(\s*([^)]+?)\s*\)\s*(?:,\s*StatusCodes\.Status(\d+))?")
+_PARAM_SOURCE = re.compile(r"\[(From\w+)[^\]]*\]")
+_IDENT = re.compile(r"\b[A-Z]\w*\b")
+# Inside action bodies: type names, fields (``_service``) and member-access receivers (``service.X``).
+_ACTION_REF = re.compile(r"\b(?:[A-Z]\w*|_\w+)\b|\b[a-z]\w*(?=\s*\??\.)")
+_STRING = re.compile(r'@?\$?"(?:[^"\\]|\\.)*"')
+# ``receiver.Method(`` / ``receiver?.Method<T>(`` inside bodies; chained calls match on their last receiver.
+_CALL = re.compile(r"\b(_?\w+)\s*\??\.\s*(\w+)\s*(?:<[^>(]*>)?\s*\(")
+_RULE_START = re.compile(r"^RuleFor(Each)?\s*\(\s*(\w+)\s*=>\s*\2\s*(?:\.\s*(\w+)\s*)?\)")
+_RULE_CALL = re.compile(r"\s*\.\s*(\w+)\s*(?:<[^>(]*>)?\s*\(")
+_LAMBDA = re.compile(r"\b(\w+)\s*=>")
+_CHILD_VALIDATOR = re.compile(r"SetValidator\s*\(\s*new\s+(\w+)")
+# Chain calls that configure a rule rather than add a check to it.
+RULE_MODIFIERS = frozenset(
+    {
+        "WithMessage", "WithName", "WithErrorCode", "WithSeverity", "WithState", "OverridePropertyName",
+        "When", "Unless", "WhenAsync", "UnlessAsync", "Cascade", "DependentRules", "SetValidator",
+    }
+)
+
+
+@dataclass
+class CsMember:
+    name: str
+    type: str
+
+
+@dataclass
+class CsParam:
+    name: str
+    type: str
+    source: str | None = None  # FromBody, FromQuery, FromRoute, FromForm, ...
+
+
+@dataclass
+class CsAction:
+    name: str
+    verb: str
+    template: str | None
+    return_type: str
+    params: list[CsParam] = field(default_factory=list)
+    produces: list[str] = field(default_factory=list)
+    line: int = 0
+    references: list[str] = field(default_factory=list)  # identifiers used in the body
+    calls: list[str] = field(default_factory=list)  # ``receiver.Method`` invocations in the body
+
+
+@dataclass
+class CsMethod:
+    """A non-action method with its body references, for method-level reach."""
+
+    name: str
+    line: int = 0
+    references: list[str] = field(default_factory=list)
+    calls: list[str] = field(default_factory=list)
+
+
+@dataclass
+class CsRule:
+    """One FluentValidation ``RuleFor``/``RuleForEach`` statement."""
+
+    property: str  # "" for ``RuleFor(x => x)``
+    checks: list[str] = field(default_factory=list)  # NotEmpty, MaximumLength, Must, ...
+    other_fields: list[str] = field(default_factory=list)  # other properties in conditions/comparisons
+    each: bool = False
+    child: str | None = None  # ``SetValidator(new ChildValidator())``
+    line: int = 0
+
+    @property
+    def cross_field(self) -> bool:
+        return bool(self.other_fields)
+
+
+@dataclass
+class CsType:
+    name: str
+    kind: str
+    namespace: str = ""
+    generics: list[str] = field(default_factory=list)
+    bases: list[str] = field(default_factory=list)
+    attributes: list[str] = field(default_factory=list)
+    properties: list[CsMember] = field(default_factory=list)
+    fields: list[CsMember] = field(default_factory=list)
+    ctor_params: list[CsParam] = field(default_factory=list)
+    actions: list[CsAction] = field(default_factory=list)
+    methods: list[CsMethod] = field(default_factory=list)
+    references: list[str] = field(default_factory=list)
+    rules: list[CsRule] = field(default_factory=list)
+    line: int = 0
+
+    @property
+    def full_name(self) -> str:
+        return f"{self.namespace}.{self.name}" if self.namespace else self.name
+
+
+@dataclass
+class CsFile:
+    path: str
+    size: int
+    mtime_ns: int
+    namespace: str = ""
+    types: list[CsType] = field(default_factory=list)
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> CsFile:
+        types = []
+        for t in data.get("types", []):
+            t = dict(t)
+            t["properties"] = [CsMember(**m) for m in t.get("properties", [])]
+            t["fields"] = [CsMember(**m) for m in t.get("fields", [])]
+            t["ctor_params"] = [CsParam(**p) for p in t.get("ctor_params", [])]
+            actions = []
+            for a in t.get("actions", []):
+                a = dict(a)
+                a["params"] = [CsParam(**p) for p in a.get("params", [])]
+                actions.append(CsAction(**a))
+            t["actions"] = actions
+            t["methods"] = [CsMethod(**m) for m in t.get("methods", [])]
+            t["rules"] = [CsRule(**r) for r in t.get("rules", [])]
+            types.append(CsType(**t))
+        return cls(
+            path=data["path"],
+            size=data["size"],
+            mtime_ns=data["mtime_ns"],
+            namespace=data.get("namespace", ""),
+            types=types,
+        )
+
+
+def split_top_level(text: str, sep: str = ",") -> list[str]:
+    """Split on ``sep`` outside ``<>``, ``()``, ``[]`` and ``{}``."""
+    parts: list[str] = []
+    depth = 0
+    current: list[str] = []
+    for ch in text:
+        if ch in "<([{":
+            depth += 1
+        elif ch in ">)]}":
+            depth -= 1
+        if ch == sep and depth == 0:
+            parts.append("".join(current).strip())
+            current = []
+        else:
+            current.append(ch)
+    tail = "".join(current).strip()
+    if tail:
+        parts.append(tail)
+    return parts
+
+
+def _parse_params(text: str) -> list[CsParam]:
+    params: list[CsParam] = []
+    for chunk in split_top_level(text):
+        source = None
+        m = _PARAM_SOURCE.search(chunk)
+        if m:
+            source = m.group(1)
+        chunk = re.sub(r"\[[^\]]*\]", "", chunk).strip()
+        chunk = chunk.split("=", 1)[0].strip()
+        chunk = re.sub(r"^(?:this|params|ref|out|in)\s+", "", chunk)
+        pieces = chunk.rsplit(None, 1)
+        if len(pieces) != 2:
+            continue
+        params.append(CsParam(name=pieces[1], type=pieces[0].strip(), source=source))
+    return params
+
+
+def _strip_comment(line: str, in_block: bool) -> tuple[str, bool]:
+    """Drop ``//`` and ``/* */`` comments outside string literals."""
+    out: list[str] = []
+    i = 0
+    in_string = False
+    while i < len(line):
+        if in_block:
+            end = line.find("*/", i)
+            if end == -1:
+                return "".join(out), True
+            i = end + 2
+            in_block = False
+            continue
+        ch = line[i]
+        if in_string:
+            out.append(ch)
+            if ch == "\\" and i + 1 < len(line):
+                out.append(line[i + 1])
+                i += 2
+                continue
+            if ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+            out.append(ch)
+        elif line.startswith("//", i):
+            break
+        elif line.startswith("/*", i):
+            in_block = True
+            i += 2
+            continue
+        else:
+            out.append(ch)
+        i += 1
+    return "".join(out), in_block
+
+
+def _balance(text: str) -> int:
+    return text.count("(") - text.count(")")
+
+
+def _split_attributes(body: str) -> list[str]:
+    return [a.strip() for a in split_top_level(body) if a.strip()]
+
+
+def is_validator(cs_type: CsType) -> bool:
+    return any(b.rsplit(".", 1)[-1].startswith("AbstractValidator<") for b in cs_type.bases)
+
+
+def _parse_rule(statement: str, line: int) -> CsRule | None:
+    """``RuleFor(x => x.Prop).Check()...When(x => ...);`` with string literals already blanked."""
+    m = _RULE_START.match(statement)
+    if m is None:
+        return None
+    rule = CsRule(property=m.group(3) or "", each=bool(m.group(1)), line=line)
+    others: set[str] = set()
+    chain = statement[m.end() :]
+    pos = 0
+    while call := _RULE_CALL.match(chain, pos):  # top-level ``.Call(...)`` links only
+        name = call.group(1)
+        open_idx = call.end() - 1
+        close_idx = open_idx + _matching_paren(chain[open_idx:])
+        args = chain[open_idx + 1 : close_idx]
+        pos = close_idx + 1
+        if name not in RULE_MODIFIERS:
+            rule.checks.append(name)
+        for var in set(_LAMBDA.findall(args)):
+            others.update(re.findall(rf"\b{re.escape(var)}\s*\.\s*([A-Z]\w*)", args))
+    child = _CHILD_VALIDATOR.search(chain)
+    rule.child = child.group(1) if child else None
+    others.discard(rule.property)
+    rule.other_fields = sorted(others)
+    return rule
+
+
+def parse_cs(text: str, path: str = "", size: int = 0, mtime_ns: int = 0) -> CsFile:
+    result = CsFile(path=path, size=size, mtime_ns=mtime_ns)
+    namespace = ""
+    depth = 0
+    in_block = False
+    stack: list[tuple[CsType, int]] = []
+    attrs: list[str] = []
+    header: list[str] = []
+    header_line = 0
+    refs: dict[int, set[str]] = {}
+    # (action or method, member depth, body opened, identifiers, calls) while inside its body
+    open_body: tuple[CsAction | CsMethod, int, bool, set[str], set[str]] | None = None
+    # (validator, statement so far, first line) while reading a RuleFor chain
+    open_rule: tuple[CsType, list[str], int] | None = None
+
+    for lineno, raw in enumerate(text.splitlines(), start=1):
+        code, in_block = _strip_comment(raw, in_block)
+        code = code.strip()
+        if not code:
+            continue
+
+        if header:
+            header.append(code)
+            joined = " ".join(header)
+            if _balance(joined) > 0:
+                continue
+            code = joined
+            header = []
+        else:
+            header_line = lineno
+            if code.startswith("#"):
+                continue
+            m = _ATTRIBUTE_LINE.match(code)
+            if m and _balance(code) == 0:
+                attrs.extend(_split_attributes(m.group(1)))
+                continue
+
+        no_strings = _STRING.sub('""', code)
+        current = stack[-1][0] if stack else None
+        member_level = current is not None and depth == stack[-1][1]
+        consumed = False
+
+        m = _NAMESPACE.match(code)
+        if m:
+            namespace = result.namespace = m.group(1)
+            consumed = True
+
+        if not consumed:
+            m = _TYPE_DECL.match(code)
+            if m and (current is None or member_level):
+                if _balance(code) > 0:
+                    header = [code]
+                    continue
+                rest = code[m.end():]
+                primary: list[CsParam] = []
+                if rest.startswith("("):
+                    close = _matching_paren(rest)
+                    primary = _parse_params(rest[1:close])
+                    rest = rest[close + 1 :].strip()
+                bases: list[str] = []
+                if rest.startswith(":"):
+                    base_text = re.split(r"\bwhere\b|[{;]", rest[1:], maxsplit=1)[0]
+                    bases = [re.sub(r"\(.*\)$", "", b).strip() for b in split_top_level(base_text)]
+                generics = [g.strip() for g in (m.group(3) or "").strip("<>").split(",") if g.strip()]
+                cs_type = CsType(
+                    name=m.group(2),
+                    kind=m.group(1),
+                    namespace=namespace,
+                    generics=generics,
+                    bases=[b for b in bases if b],
+                    attributes=attrs,
+                    line=header_line,
+                )
+                if m.group(1) == "record":
+                    cs_type.properties.extend(CsMember(name=p.name, type=p.type) for p in primary)
+                else:
+                    cs_type.ctor_params.extend(primary)
+                result.types.append(cs_type)
+                attrs = []
+                if not no_strings.rstrip().endswith(";"):
+                    stack.append((cs_type, depth + 1))
+                    refs[id(cs_type)] = set()
+                consumed = True
+
+        if not consumed and member_level and current is not None:
+            m = _PROPERTY.match(code)
+            if m and "static " not in code.split("{", 1)[0]:
+                current.properties.append(CsMember(name=m.group(2), type=m.group(1).strip()))
+                attrs = []
+                consumed = True
+            elif (m := _FIELD.match(code)) and "(" not in code.split("=", 1)[0]:
+                current.fields.append(CsMember(name=m.group(2), type=m.group(1)))
+                attrs = []
+                consumed = True
+            elif (m := _METHOD.match(code)) or code.startswith(f"public {current.name}("):
+                if _balance(code) > 0:
+                    header = [code]
+                    continue
+                target = _member(current, code, m, attrs, header_line)
+                if target is not None:
+                    open_body = (target, depth, False, set(), set())
+                attrs = []
+                consumed = True
+
+        if not consumed and attrs and not code.startswith("["):
+            attrs = []
+
+        if open_rule is None and current is not None and not member_level and no_strings.startswith("RuleFor"):
+            if is_validator(current):
+                open_rule = (current, [], lineno)
+        if open_rule is not None:
+            open_rule[1].append(no_strings)
+            statement = " ".join(open_rule[1])
+            if statement.rstrip().endswith(";") and _balance(statement) == 0:
+                rule = _parse_rule(statement, open_rule[2])
+                if rule is not None:
+                    open_rule[0].rules.append(rule)
+                open_rule = None
+
+        for cs_type, _ in stack:
+            bucket = refs.get(id(cs_type))
+            if bucket is not None:
+                bucket.update(_IDENT.findall(no_strings))
+
+        if open_body is not None:
+            open_body[3].update(_ACTION_REF.findall(no_strings))
+            open_body[4].update(f"{r}.{n}" for r, n in _CALL.findall(no_strings))
+
+        for ch in no_strings:
+            if ch == "{":
+                depth += 1
+                if open_body is not None and depth == open_body[1] + 1:
+                    open_body = (open_body[0], open_body[1], True, open_body[3], open_body[4])
+            elif ch == "}":
+                depth -= 1
+                if open_body is not None and open_body[2] and depth == open_body[1]:
+                    _close_body(open_body)
+                    open_body = None
+                while stack and depth < stack[-1][1]:
+                    done, _ = stack.pop()
+                    done.references = sorted(refs.pop(id(done), set()) - {done.name})
+        if open_body is not None and not open_body[2] and no_strings.rstrip().endswith(";"):
+            # Expression-bodied (``=> ...;``) or bodiless declaration.
+            _close_body(open_body)
+            open_body = None
+
+    while stack:
+        done, _ = stack.pop()
+        done.references = sorted(refs.pop(id(done), set()) - {done.name})
+    return result
+
+
+def _matching_paren(text: str) -> int:
+    depth = 0
+    for i, ch in enumerate(text):
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+            if depth == 0:
+                return i
+    return len(text) - 1
+
+
+def _close_body(open_body: tuple[CsAction | CsMethod, int, bool, set[str], set[str]]) -> None:
+    target, _, _, references, calls = open_body
+    target.references = sorted(references)
+    target.calls = sorted(calls)
+
+
+def _member(
+    current: CsType, code: str, m: re.Match[str] | None, attrs: list[str], line: int
+) -> CsAction | CsMethod | None:
+    """Record a constructor, action or method; return the member whose body follows."""
+    open_idx = code.index("(")
+    close_idx = _matching_paren(code[open_idx:]) + open_idx
+    params = _parse_params(code[open_idx + 1 : close_idx])
+    if m is None or m.group(2) == current.name:
+        # Constructor: the injected dependencies.
+        current.ctor_params.extend(params)
+        return None
+    verb = template = None
+    produces: list[str] = []
+    for attr in attrs:
+        http = _HTTP_ATTR.match(attr)
+        if http:
+            verb = http.group(1).upper()
+            template = http.group(2)
+        produced = _PRODUCES.match(attr)
+        if produced and (produced.group(2) is None or produced.group(2).startswith("2")):
+            produces.append(produced.group(1))
+        route = _ROUTE_ATTR.match(attr)
+        if route and template is None:
+            template = route.group(1)
+    if verb is None:
+        if current.kind == "interface":
+            return None
+        current.methods.append(CsMethod(name=m.group(2), line=line))
+        return current.methods[-1]
+    current.actions.append(
+        CsAction(
+            name=m.group(2),
+            verb=verb,
+            template=template,
+            return_type=m.group(1).strip(),
+            params=params,
+            produces=produces,
+            line=line,
+        )
+    )
+    return current.actions[-1]
+
+
+def parse_file(path: str | os.PathLike[str], rel: str | None = None) -> CsFile:
+    st = os.stat(path)
+    return parse_cs(bytescan.read_text(path), rel or os.fspath(path), st.st_size, st.st_mtime_ns)
+
+
+class CsIndex:
+    """Parsed C# files under ``apps/api``, persisted and refreshed incrementally."""
+
+    VERSION = 4
+
+    def __init__(self, root: Path, cache_path: Path | None = None) -> None:
+        self.root = root
+        self.cache_path = cache_path
+        self.files: dict[str, CsFile] = {}
+        self.extra: dict[str, Any] = {}
+        self._by_name: dict[str, list[CsType]] | None = None
+
+    @classmethod
+    def load(cls, root: Path, cache_path: Path | None = None, *, refresh: bool = True) -> CsIndex:
+        index = cls(root, cache_path)
+        if cache_path is not None and cache_path.exists():
+            try:
+                data = json.loads(cache_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                data = {}
+            if data.get("version") == cls.VERSION:
+                index.files = {k: CsFile.from_dict(v) for k, v in data.get("files", {}).items()}
+                index.extra = data.get("extra", {})
+        if refresh:
+            index.refresh()
+        return index
+
+    def refresh(self, paths: Iterable[str] | None = None) -> set[str]:
+        """Re-parse new/modified files and drop deleted ones; return the changed paths.
+
+        With ``paths`` only those (repo-relative) files are checked, which is
+        what the delta and watch modes use.
+        """
+        changed: set[str] = set()
+        if paths is None:
+            seen: set[str] = set()
+            for entry in walk_files(self.root / API_ROOT, (".cs",), exclude=INDEX_EXCLUDES):
+                rel = Path(entry.path).relative_to(self.root).as_posix()
+                seen.add(rel)
+                st = entry.stat()
+                known = self.files.get(rel)
+                if known is None or known.size != st.st_size or known.mtime_ns != st.st_mtime_ns:
+                    self.files[rel] = parse_file(entry.path, rel)
+                    changed.add(rel)
+            for rel in set(self.files) - seen:
+                del self.files[rel]
+                changed.add(rel)
+        else:
+            for rel in paths:
+                full = self.root / rel
+                if not rel.endswith(".cs"):
+                    continue
+                if full.exists():
+                    st = full.stat()
+                    known = self.files.get(rel)
+                    if known is None or known.size != st.st_size or known.mtime_ns != st.st_mtime_ns:
+                        self.files[rel] = parse_file(full, rel)
+                        changed.add(rel)
+                elif rel in self.files:
+                    del self.files[rel]
+                    changed.add(rel)
+        if changed:
+            self._by_name = None
+        return changed
+
+    def save(self) -> None:
+        if self.cache_path is None:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "version": self.VERSION,
+            "files": {k: v.to_dict() for k, v in sorted(self.files.items())},
+            "extra": self.extra,
+        }
+        tmp = self.cache_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.cache_path)
+
+    def iter_types(self, prefix: str | None = None) -> Iterator[tuple[str, CsType]]:
+        for rel in sorted(self.files):
+            if prefix is None or rel.startswith(prefix):
+                for cs_type in self.files[rel].types:
+                    yield rel, cs_type
+
+    def by_name(self) -> dict[str, list[CsType]]:
+        if self._by_name is None:
+            table: dict[str, list[CsType]] = {}
+            for _, cs_type in self.iter_types():
+                table.setdefault(cs_type.name, []).append(cs_type)
+            self._by_name = table
+        return self._by_name
+
+    def controllers(self) -> list[tuple[str, CsType]]:
+        prefix = (API_ROOT / "CAU.Eleitoral.Api" / "Controllers").as_posix() + "/"
+        return [
+            (rel, t)
+            for rel, t in self.iter_types(prefix)
+            if t.kind == "class" and t.name.endswith("Controller")
+        ]
+
+
+def type_names(type_text: str) -> list[str]:
+    """Identifiers in a type expression, outermost first:
+    ``Task<ActionResult<PagedResult<XDto>>>`` -> Task, ActionResult, PagedResult, XDto."""
+    return re.findall(r"[A-Za-z_]\w*", type_text.replace("?", ""))
@@ -0,0 +1,383 @@
+"""Enhancement (delta) APF count between two git revisions.
+
+One ``git diff --name-status`` stream lists the changed files; only the
+domain entities, controllers and DTOs among them are read (both sides
+through a single ``git cat-file --batch`` process) and parsed. Every other
+C# file comes from the shared :class:`~apfscan.csharp.CsIndex` of the
+working tree, which is therefore assumed to be at ``head``.
+
+Functions are classified as added, changed or deleted and priced with the
+IFPUG enhancement rules: added and changed functions at their complexity
+after the change, deleted ones at their complexity before it. ALIs are
+rated from the EF Core model snapshot of each revision, like the baseline
+count. Actions are matched on controller, name and verb, so a new route
+for the same action is a change; the route only pairs overloads.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+import subprocess
+from collections import defaultdict
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO
+
+from .csharp import API_ROOT, CsAction, CsFile, CsIndex, CsType, parse_cs
+from .dtos import DTO_DIRS, ActionMetrics, DtoIndex, TypeRef
+from .efmodel import (
+    ALI_WEIGHTS,
+    DBCONTEXT_PATH,
+    SNAPSHOT_PATH,
+    TECHNICAL_COLUMNS,
+    EfEntity,
+    EfModel,
+    ali_complexity,
+    parse_db_context,
+    parse_model_snapshot,
+)
+
+ENTITIES_DIR = (API_ROOT / "CAU.Eleitoral.Domain" / "Entities").as_posix() + "/"
+CONTROLLERS_DIR = (API_ROOT / "CAU.Eleitoral.Api" / "Controllers").as_posix() + "/"
+
+_STRING = re.compile(r'"(?:[^"\\]|\\.)*"')
+
+OPERACOES = {"A": "Inclusao", "C": "Alteracao", "D": "Exclusao"}
+
+
+@dataclass(frozen=True)
+class ChangedFile:
+    status: str  # A, M, D (renames/copies are split into D + A)
+    path: str
+
+
+@dataclass(frozen=True)
+class DeltaFunction:
+    tipo: str
+    nome: str
+    operacao: str
+    det: int
+    ret_ftr: int
+    complexidade: str
+    pf: int
+    arquivo: str
+
+
+@dataclass
+class DeltaCount:
+    base: str
+    head: str
+    changed_files: list[ChangedFile] = field(default_factory=list)
+    parsed_files: int = 0
+    functions: list[DeltaFunction] = field(default_factory=list)
+
+    def total(self, operacao: str | None = None) -> int:
+        return sum(f.pf for f in self.functions if operacao is None or f.operacao == operacao)
+
+
+def _nul_fields(stream: IO[bytes]) -> Iterator[str]:
+    pending = b""
+    for chunk in iter(lambda: stream.read(65536), b""):
+        pending += chunk
+        *fields, pending = pending.split(b"\0")
+        for raw in fields:
+            yield raw.decode("utf-8", errors="surrogateescape")
+    if pending:
+        yield pending.decode("utf-8", errors="surrogateescape")
+
+
+def diff_name_status(root: Path, base: str, head: str) -> Iterator[ChangedFile]:
+    """Stream ``git diff --name-status -z`` without buffering the whole listing."""
+    proc = subprocess.Popen(
+        ["git", "diff", "--name-status", "-z", "-M", "--no-color", base, head, "--", API_ROOT.as_posix()],
+        cwd=root,
+        stdout=subprocess.PIPE,
+    )
+    assert proc.stdout is not None
+    try:
+        fields = _nul_fields(proc.stdout)
+        for status in fields:
+            if not status:
+                continue
+            kind = status[0]
+            if kind in "RC":
+                old, new = next(fields), next(fields)
+                if kind == "R":
+                    yield ChangedFile("D", old)
+                yield ChangedFile("A", new)
+            elif kind in "AMDT":
+                yield ChangedFile("M" if kind == "T" else kind, next(fields))
+            else:
+                next(fields, None)
+        # Only a fully read listing says anything about git's exit status.
+        if proc.wait() != 0:
+            raise RuntimeError(f"git diff falhou para {base}..{head}")
+    finally:
+        proc.stdout.close()
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+
+
+class BlobReader:
+    """``git cat-file --batch`` kept open for the whole run."""
+
+    def __init__(self, root: Path) -> None:
+        self.proc = subprocess.Popen(
+            ["git", "cat-file", "--batch"],
+            cwd=root,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+
+    def read(self, rev: str, path: str) -> str | None:
+        assert self.proc.stdin is not None and self.proc.stdout is not None
+        self.proc.stdin.write(f"{rev}:{path}\n".encode())
+        self.proc.stdin.flush()
+        header = self.proc.stdout.readline().split()
+        if len(header) < 3 or header[-1] == b"missing":
+            return None
+        size = int(header[2])
+        data = self.proc.stdout.read(size)
+        self.proc.stdout.read(1)  # trailing newline
+        for encoding in ("utf-8-sig", "cp1252"):
+            try:
+                return data.decode(encoding)
+            except UnicodeDecodeError:
+                continue
+        return data.decode("latin-1")
+
+    def close(self) -> None:
+        if self.proc.stdin is not None:
+            self.proc.stdin.close()
+        self.proc.wait()
+
+
+def _relevant(path: str) -> bool:
+    return path.endswith(".cs") and path.startswith((ENTITIES_DIR, CONTROLLERS_DIR) + DTO_DIRS)
+
+
+def _overlay(base_index: CsIndex, parsed: dict[str, CsFile | None]) -> CsIndex:
+    overlay = CsIndex(base_index.root)
+    overlay.files = dict(base_index.files)
+    for rel, cs_file in parsed.items():
+        if cs_file is None:
+            overlay.files.pop(rel, None)
+        else:
+            overlay.files[rel] = cs_file
+    return overlay
+
+
+def _entities(index: CsIndex) -> dict[str, tuple[str, CsType]]:
+    found: dict[str, tuple[str, CsType]] = {}
+    for rel, cs_type in index.iter_types(ENTITIES_DIR):
+        if cs_type.kind == "class" and "BaseEntity" in cs_type.bases:
+            found[cs_type.name] = (rel, cs_type)
+    return found
+
+
+def _ali_det(entity: CsType, entity_names: set[str]) -> int:
+    """Properties that are not technical columns nor navigations to other entities."""
+    det = 0
+    for prop in entity.properties:
+        if prop.name in TECHNICAL_COLUMNS:
+            continue
+        if TypeRef.parse(prop.type).unwrap().name not in entity_names:
+            det += 1
+    return max(det, 1)
+
+
+def _action_spans(text: str, cs_type: CsType) -> dict[str, str]:
+    """Hash of each action's source, from its signature to the end of its body."""
+    lines = text.splitlines()
+    spans: dict[str, str] = {}
+    for action in cs_type.actions:
+        body: list[str] = []
+        depth = 0
+        opened = False
+        for line in lines[action.line - 1 :]:
+            body.append(line)
+            code = _STRING.sub('""', line)
+            depth += code.count("{") - code.count("}")
+            opened = opened or "{" in code
+            if (opened and depth <= 0) or (not opened and code.rstrip().endswith(";")):
+                break
+        normalized = re.sub(r"\s+", " ", "\n".join(body)).strip()
+        spans[_action_key(cs_type, action)] = hashlib.sha1(normalized.encode()).hexdigest()
+    return spans
+
+
+def _action_key(controller: CsType, action: CsAction) -> str:
+    """Identity of an action inside one revision (the template tells overloads apart)."""
+    return f"{_action_name(controller, action)} {action.template or ''}"
+
+
+def _action_name(controller: CsType, action: CsAction) -> str:
+    """Identity of an action across revisions: a new route is a change, not a new function."""
+    return f"{controller.name}.{action.name} {action.verb}"
+
+
+_ActionEntry = tuple[str, CsType, CsAction]
+
+
+def _match_actions(
+    before: list[_ActionEntry], after: list[_ActionEntry]
+) -> Iterator[tuple[_ActionEntry | None, _ActionEntry | None]]:
+    """Pair the overloads of one controller action: same template first, then in source order."""
+    old_left = list(before)
+    new_left = []
+    for new in after:
+        same = next((old for old in old_left if old[2].template == new[2].template), None)
+        if same is None:
+            new_left.append(new)
+        else:
+            old_left.remove(same)
+            yield same, new
+    for i in range(max(len(old_left), len(new_left))):
+        yield (old_left[i] if i < len(old_left) else None), (new_left[i] if i < len(new_left) else None)
+
+
+def _read_model(reader: BlobReader, rev: str) -> EfModel | None:
+    """EF Core model (snapshot + DbContext) as of ``rev``; ``None`` without a snapshot."""
+    snapshot = reader.read(rev, SNAPSHOT_PATH.as_posix())
+    if snapshot is None:
+        return None
+    model = parse_model_snapshot(snapshot.splitlines())
+    context = reader.read(rev, DBCONTEXT_PATH.as_posix())
+    if context is not None:
+        parse_db_context(context.splitlines(), model)
+    return model
+
+
+def _ali_rating(
+    cs_type: CsType, model: EfModel | None, tables: dict[str, EfEntity], names: set[str]
+) -> tuple[int, int]:
+    """DET/RET as the baseline count rates the table (EF model).
+
+    The class properties with RET 1 are only a fallback, for revisions
+    without a model snapshot and classes not mapped to a table yet.
+    """
+    entity = tables.get(cs_type.name)
+    if model is not None and entity is not None:
+        return model.det(entity), model.ret(entity)
+    return _ali_det(cs_type, names), 1
+
+
+def count_delta(
+    root: Path,
+    base: str,
+    head: str = "HEAD",
+    *,
+    index: CsIndex | None = None,
+    entity_names: set[str] | None = None,
+) -> DeltaCount:
+    result = DeltaCount(base=base, head=head)
+    index = index if index is not None else CsIndex.load(root)
+    result.changed_files = [c for c in diff_name_status(root, base, head) if _relevant(c.path)]
+    touched = {c.path for c in result.changed_files if c.path.startswith(ENTITIES_DIR)}
+
+    reader = BlobReader(root)
+    texts: dict[str, dict[str, str]] = {"base": {}, "head": {}}
+    parsed: dict[str, dict[str, CsFile | None]] = {"base": {}, "head": {}}
+    models: dict[str, EfModel | None] = {"base": None, "head": None}
+    try:
+        for change in result.changed_files:
+            for side, rev in (("base", base), ("head", head)):
+                if (side == "base" and change.status == "A") or (side == "head" and change.status == "D"):
+                    parsed[side].setdefault(change.path, None)
+                    continue
+                text = reader.read(rev, change.path)
+                if text is None:
+                    parsed[side].setdefault(change.path, None)
+                    continue
+                texts[side][change.path] = text
+                parsed[side][change.path] = parse_cs(text, change.path)
+                result.parsed_files += 1
+        if touched:
+            models = {"base": _read_model(reader, base), "head": _read_model(reader, head)}
+    finally:
+        reader.close()
+
+    before = _overlay(index, parsed["base"])
+    after = _overlay(index, parsed["head"])
+
+    # --- ALI: entity classes in changed entity files -------------------
+    ents_before = _entities(before)
+    ents_after = _entities(after)
+    names = set(entity_names or ()) | set(ents_before) | set(ents_after)
+    tables = {side: {e.short_name: e for e in model.tables()} if model else {} for side, model in models.items()}
+    for name in sorted(set(ents_before) | set(ents_after)):
+        old = ents_before.get(name)
+        new = ents_after.get(name)
+        if (old is None or old[0] not in touched) and (new is None or new[0] not in touched):
+            continue
+        if old is not None and new is not None:
+            rating = _ali_rating(new[1], models["head"], tables["head"], names)
+            if [(p.name, p.type) for p in old[1].properties] == [(p.name, p.type) for p in new[1].properties] and (
+                rating == _ali_rating(old[1], models["base"], tables["base"], names)
+            ):
+                continue
+            op, (rel, cs_type) = "C", new
+        elif new is not None:
+            op, (rel, cs_type) = "A", new
+            rating = _ali_rating(cs_type, models["head"], tables["head"], names)
+        else:
+            assert old is not None
+            op, (rel, cs_type) = "D", old
+            rating = _ali_rating(cs_type, models["base"], tables["base"], names)
+        det, ret = rating
+        level = ali_complexity(det, ret)
+        result.functions.append(
+            DeltaFunction("ALI", name, OPERACOES[op], det, ret, level, ALI_WEIGHTS[level], rel)
+        )
+
+    # --- EE/CE/SE: controller actions ----------------------------------
+    dtos_before = DtoIndex(before, names)
+    dtos_after = DtoIndex(after, names)
+    actions_before: dict[str, list[_ActionEntry]] = defaultdict(list)
+    actions_after: dict[str, list[_ActionEntry]] = defaultdict(list)
+    for target, idx in ((actions_before, before), (actions_after, after)):
+        for rel, controller in idx.controllers():
+            for action in controller.actions:
+                target[_action_name(controller, action)].append((rel, controller, action))
+
+    spans: dict[str, dict[str, str]] = {"base": {}, "head": {}}
+    for side, idx in (("base", before), ("head", after)):
+        for rel, text in texts[side].items():
+            if rel.startswith(CONTROLLERS_DIR):
+                for cs_type in idx.files[rel].types:
+                    spans[side].update(_action_spans(text, cs_type))
+
+    def add(op: str, rel: str, m: ActionMetrics) -> None:
+        result.functions.append(
+            DeltaFunction(m.tipo, f"{m.controller}.{m.action}", OPERACOES[op], m.det, m.ftr, m.complexidade, m.pf, rel)
+        )
+
+    for name in sorted(set(actions_before) | set(actions_after)):
+        for old, new in _match_actions(actions_before.get(name, []), actions_after.get(name, [])):
+            if new is None:
+                assert old is not None
+                add("D", old[0], dtos_before.metrics_for(old[1], old[2]))
+                continue
+            metrics_after = dtos_after.metrics_for(new[1], new[2])
+            if old is None:
+                add("A", new[0], metrics_after)
+                continue
+            metrics_before = dtos_before.metrics_for(old[1], old[2])
+            key_before, key_after = _action_key(old[1], old[2]), _action_key(new[1], new[2])
+            source_changed = (
+                key_before in spans["base"]
+                and key_after in spans["head"]
+                and spans["base"][key_before] != spans["head"][key_after]
+            )
+            fields_changed = (old[2].template, metrics_before.det, metrics_before.ftr, metrics_before.tipo) != (
+                new[2].template,
+                metrics_after.det,
+                metrics_after.ftr,
+                metrics_after.tipo,
+            )
+            if source_changed or fields_changed:
+                add("C", new[0], metrics_after)
+
+    return result
@@ -0,0 +1,230 @@
+"""Deltapoint estimate workbook (``Resumo``/``Funções`` sheets) and the
+endpoint count it is compared against.
+
+``openpyxl`` is imported only when a workbook is actually read or written.
+Function rows are kept in a :class:`DeltapointTable` (columnar) so workbooks
+with 10^5 rows aggregate without one Python object per row;
+:func:`write_deltapoint_xlsx` streams rows out in write-only mode, so an
+export never holds the sheet in memory either.
+"""
+from __future__ import annotations
+
+import re
+from array import array
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from . import bytescan
+from .columns import CODE_TYPECODE, VALUE_TYPECODE, Categories, column_sum, group_count, group_sum
+from .walk import walk_files
+
+
+@dataclass(frozen=True)
+class DeltapointFunctionRow:
+    row: int
+    funcao: str
+    tipo: str
+    ctl: str | None
+    pfb: float
+    pfl: float
+
+
+# (funcao, tipo, ctl, pfb, pfl): a Funções row without its sheet position.
+FunctionValues = tuple[str, str, "str | None", float, float]
+
+FUNCOES_FIRST_ROW = 3
+FUNCOES_COLUMNS = 17  # A..Q
+# Column index (0-based) of each value in the Funções sheet.
+COL_FUNCAO, COL_TIPO, COL_CTL, COL_PFB, COL_PFL = 0, 1, 9, 15, 16
+# CTL = tipo + complexity letter (Low/Average/High): ALIL, EEA, SEH, ...
+CTL_SUFFIX = {"Baixa": "L", "Media": "A", "Alta": "H"}
+
+
+def ctl_code(tipo: str, complexidade: str) -> str:
+    return tipo + CTL_SUFFIX[complexidade]
+
+
+@dataclass(frozen=True)
+class DeltapointResumo:
+    sistema: str
+    contador: str
+    tipo_contagem: str
+    total_pf: float
+
+
+def _cell_str(value: Any) -> str:
+    if value is None:
+        return ""
+    return str(value).strip()
+
+
+class DeltapointTable:
+    """Function rows stored by column (see :mod:`apfscan.columns`).
+
+    Iterating yields :class:`DeltapointFunctionRow` objects on demand;
+    counts and PF totals per type/CTL run over the columns.
+    """
+
+    def __init__(self) -> None:
+        self.row = array("l")
+        self.funcao: list[str] = []
+        self.tipos = Categories()
+        self.ctls = Categories()
+        self.tipo = array(CODE_TYPECODE)
+        self.ctl = array(CODE_TYPECODE)
+        self.pfb = array(VALUE_TYPECODE)
+        self.pfl = array(VALUE_TYPECODE)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[DeltapointFunctionRow]) -> DeltapointTable:
+        table = cls()
+        for r in rows:
+            table.append(r.row, r.funcao, r.tipo, r.ctl, r.pfb, r.pfl)
+        return table
+
+    def append(self, row: int, funcao: str, tipo: str, ctl: str | None, pfb: float, pfl: float) -> None:
+        self.row.append(row)
+        self.funcao.append(funcao)
+        self.tipo.append(self.tipos.code(tipo))
+        self.ctl.append(self.ctls.code(ctl))
+        self.pfb.append(pfb)
+        self.pfl.append(pfl)
+
+    def __len__(self) -> int:
+        return len(self.row)
+
+    def __getitem__(self, i: int) -> DeltapointFunctionRow:
+        return DeltapointFunctionRow(
+            row=self.row[i],
+            funcao=self.funcao[i],
+            tipo=self.tipos.labels[self.tipo[i]] or "",
+            ctl=self.ctls.labels[self.ctl[i]],
+            pfb=self.pfb[i],
+            pfl=self.pfl[i],
+        )
+
+    def __iter__(self) -> Iterator[DeltapointFunctionRow]:
+        return (self[i] for i in range(len(self)))
+
+    def count_by_tipo(self) -> dict[str, int]:
+        return group_count(self.tipo, self.tipos)
+
+    def count_by_ctl(self) -> dict[str, int]:
+        return group_count(self.ctl, self.ctls)
+
+    def pf_by_tipo(self, column: str = "pfb") -> dict[str, float]:
+        return group_sum(self.tipo, getattr(self, column), self.tipos)
+
+    def pf_by_ctl(self, column: str = "pfb") -> dict[str, float]:
+        return group_sum(self.ctl, getattr(self, column), self.ctls)
+
+    def total(self, column: str = "pfb") -> float:
+        return column_sum(getattr(self, column))
+
+
+def load_deltapoint_xlsx(xlsx_path: Path) -> tuple[DeltapointResumo, DeltapointTable]:
+    import openpyxl
+
+    # read_only streams the rows instead of building every cell object.
+    wb = openpyxl.load_workbook(xlsx_path, data_only=True, read_only=True)
+    try:
+        if "Resumo" not in wb.sheetnames or "Funções" not in wb.sheetnames:
+            raise ValueError("Planilha inesperada: abas 'Resumo' e 'Funções' nao encontradas.")
+
+        ws_resumo = wb["Resumo"]
+        ws_funcoes = wb["Funções"]
+
+        sistema = _cell_str(ws_resumo["D10"].value) or "Portal Candidato"
+        contador = _cell_str(ws_resumo["D12"].value) or ""
+        tipo_contagem = _cell_str(ws_resumo["D13"].value) or ""
+        total_pf = float(ws_resumo["D15"].value or 0)
+
+        table = DeltapointTable()
+        rows = ws_funcoes.iter_rows(min_row=FUNCOES_FIRST_ROW, max_col=FUNCOES_COLUMNS, values_only=True)
+        for r, values in enumerate(rows, start=FUNCOES_FIRST_ROW):
+            values = tuple(values) + (None,) * (FUNCOES_COLUMNS - len(values))
+            funcao = _cell_str(values[COL_FUNCAO])
+            tipo = _cell_str(values[COL_TIPO])
+            if not funcao or not tipo:
+                continue
+
+            ctl = _cell_str(values[COL_CTL]) or None  # J: ctl (ex: SEA, EEA, ALIL)
+            pfb = float(values[COL_PFB] or 0)  # P: PFB
+            pfl = float(values[COL_PFL] or 0)  # Q: PFL
+            table.append(r, funcao, tipo, ctl, pfb, pfl)
+    finally:
+        wb.close()
+
+    resumo = DeltapointResumo(
+        sistema=sistema,
+        contador=contador,
+        tipo_contagem=tipo_contagem,
+        total_pf=total_pf,
+    )
+    return resumo, table
+
+
+def write_deltapoint_xlsx(
+    path: Path,
+    rows: Iterable[FunctionValues],
+    *,
+    sistema: str,
+    contador: str = "",
+    tipo_contagem: str = "",
+) -> tuple[DeltapointResumo, int]:
+    """Write ``rows`` in the layout read by :func:`load_deltapoint_xlsx`.
+
+    Write-only workbook: each row is serialized as it is appended, values
+    are plain numbers (no formulas), and the ``Resumo`` total is summed on
+    the way. Returns the resumo written and the number of function rows.
+    """
+    import openpyxl
+
+    wb = openpyxl.Workbook(write_only=True)
+    resumo_ws = wb.create_sheet("Resumo")
+    funcoes = wb.create_sheet("Funções")
+    header = [None] * FUNCOES_COLUMNS
+    header[COL_FUNCAO], header[COL_TIPO], header[COL_CTL], header[COL_PFB], header[COL_PFL] = (
+        "Função", "Tipo", "CTL", "PFB", "PFL"
+    )
+    funcoes.append(["Funções"])
+    funcoes.append(header)
+
+    total = 0.0
+    count = 0
+    line = [None] * FUNCOES_COLUMNS
+    for funcao, tipo, ctl, pfb, pfl in rows:
+        line[COL_FUNCAO], line[COL_TIPO], line[COL_CTL], line[COL_PFB], line[COL_PFL] = funcao, tipo, ctl, pfb, pfl
+        funcoes.append(line)
+        total += pfb
+        count += 1
+
+    # Resumo values sit in column D, rows 10/12/13/15; the sheets are
+    # independent streams, so it can be written after the total is known.
+    for _ in range(9):
+        resumo_ws.append([])
+    resumo_ws.append([None, None, "Sistema", sistema])
+    resumo_ws.append([])
+    resumo_ws.append([None, None, "Contador", contador])
+    resumo_ws.append([None, None, "Tipo de contagem", tipo_contagem])
+    resumo_ws.append([])
+    resumo_ws.append([None, None, "Total PF", total])
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    wb.save(path)
+    return DeltapointResumo(sistema=sistema, contador=contador, tipo_contagem=tipo_contagem, total_pf=total), count
+
+
+def count_api_endpoints(controllers_dir: Path) -> list[tuple[str, int]]:
+    pattern = re.compile(rb"\[Http(Get|Post|Put|Delete|Patch)\b")
+    items: list[tuple[str, int]] = []
+    for entry in walk_files(controllers_dir, ("Controller.cs",), recursive=False):
+        if entry.name == "BaseController.cs":
+            continue
+        cnt = bytescan.count(entry.path, pattern)
+        items.append((entry.name, cnt))
+    # Desc by endpoints
+    items.sort(key=lambda x: x[1], reverse=True)
+    return items
@@ -0,0 +1,272 @@
+"""Controller -> service -> repository -> entity reachability, for FTR per action.
+
+Nodes are the type names of the :class:`~apfscan.csharp.CsIndex` (controllers,
+application/API services, repositories, DTOs, domain entities). A type points
+to the types of its constructor parameters and fields, its base types, the
+known types among its body references, and an interface to the classes that
+implement it. ``DbSet`` property names (``_context.Eleicoes``) resolve to
+their entity, so the ``DbContext`` itself is left out of the graph: through
+its ``DbSet<T>`` declarations it would reach every table. Entities are sinks;
+navigation properties are not followed.
+
+Methods are nodes too (``EleicaoService.ObterAsync``). A method points to
+the methods it calls on injected members (``_service.ObterAsync(`` resolves
+through the member type and, for an interface, its implementations), to
+the class's own methods it names, and to the types and ``DbSet`` names in
+its body. So an action reaches the entities of the service methods it
+calls, not of every method of the service. A call that resolves to no
+known method, such as a base-class or library method, falls back to the
+member's whole type.
+
+Every entity gets a bit. Strongly connected components are found once
+(Tarjan, iterative), and components come out successors-first, so each
+component's reach is its own entity bits OR-ed with its successors' already
+computed masks: one pass over the edges for the whole graph, no search per
+action. An action starts from its body the same way as a method, plus its
+parameter types. The type-level fallbacks and the reach of parameter/DTO
+types keep the FTR an upper bound, but a per-action one.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+
+from .csharp import CsAction, CsIndex, CsType, type_names
+from .efmodel import EfModel
+
+HUB_BASES = frozenset({"DbContext", "IdentityDbContext"})
+
+
+@dataclass(frozen=True)
+class ActionReach:
+    controller: str
+    action: str
+    verb: str
+    template: str | None
+    entities: tuple[str, ...]
+
+    @property
+    def ftr(self) -> int:
+        return len(self.entities)
+
+
+@dataclass
+class DependencyGraph:
+    entities: list[str]  # bit i <-> entities[i]
+    edges: dict[str, set[str]] = field(default_factory=dict)
+    aliases: dict[str, str] = field(default_factory=dict)  # DbSet name -> entity
+    implementations: dict[str, set[str]] = field(default_factory=dict)  # interface -> classes
+    methods: dict[str, set[str]] = field(default_factory=dict)  # type -> method names
+    _masks: dict[str, int] | None = None
+
+    def resolve(self, name: str) -> str | None:
+        if name in self.edges:
+            return name
+        return self.aliases.get(name)
+
+    def masks(self) -> dict[str, int]:
+        """Reachable-entity bitmask per node (computed once, memoized)."""
+        if self._masks is None:
+            self._masks = _closure(self.edges, {name: i for i, name in enumerate(self.entities)})
+        return self._masks
+
+    def reach(self, nodes: Iterable[str]) -> int:
+        masks = self.masks()
+        mask = 0
+        for node in nodes:
+            mask |= masks.get(node, 0)
+        return mask
+
+    def decode(self, mask: int) -> tuple[str, ...]:
+        return tuple(sorted(self.entities[i] for i in _bits(mask)))
+
+    def body_targets(self, owner: CsType, references: Iterable[str], calls: Iterable[str]) -> set[str]:
+        """Nodes a method or action body of ``owner`` points to."""
+        members = {m.name: m.type for m in owner.fields}
+        members.update({p.name: p.type for p in owner.ctor_params})
+        called: dict[str, set[str]] = defaultdict(set)
+        for call in calls:
+            receiver, _, method = call.partition(".")
+            called[receiver].add(method)
+        own = self.methods.get(owner.name, set())
+        targets: set[str] = set()
+        for ref in references:
+            member_type = members.get(ref)
+            if member_type is None:
+                node = method_node(owner.name, ref) if ref in own else self.resolve(ref)
+                if node is not None:
+                    targets.add(node)
+                continue
+            outer, *arguments = type_names(member_type) or [""]
+            targets.update(n for n in map(self.resolve, arguments) if n is not None)
+            found = self._method_targets(outer, called.get(ref, set()))
+            if found is None:
+                node = self.resolve(outer)
+                if node is not None:
+                    targets.add(node)
+            else:
+                targets.update(found)
+        # ``ILogger<ThisController>`` and the like: the owner's type node would reach every member's entities.
+        targets.discard(owner.name)
+        return targets
+
+    def _method_targets(self, type_name: str, names: set[str]) -> set[str] | None:
+        """Method nodes of ``type_name`` (or its implementations) for ``names``; ``None`` if any is unknown."""
+        if not names:
+            return None
+        classes = self.implementations.get(type_name) or {type_name}
+        found: set[str] = set()
+        for name in names:
+            hits = {method_node(c, name) for c in classes if name in self.methods.get(c, ())}
+            if not hits:
+                return None
+            found |= hits
+        return found
+
+
+def method_node(type_name: str, method: str) -> str:
+    return f"{type_name}.{method}"
+
+
+def _bits(mask: int) -> Iterator[int]:
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def _closure(edges: dict[str, set[str]], entity_bit: dict[str, int]) -> dict[str, int]:
+    """Tarjan SCC over ``edges``; components are finished successors-first."""
+    index: dict[str, int] = {}
+    low: dict[str, int] = {}
+    on_stack: set[str] = set()
+    stack: list[str] = []
+    masks: dict[str, int] = {}
+    counter = 0
+    for start in edges:
+        if start in index:
+            continue
+        work: list[tuple[str, Iterator[str]]] = [(start, iter(edges[start]))]
+        index[start] = low[start] = counter
+        counter += 1
+        stack.append(start)
+        on_stack.add(start)
+        while work:
+            node, successors = work[-1]
+            advanced = False
+            for succ in successors:
+                if succ not in index:
+                    index[succ] = low[succ] = counter
+                    counter += 1
+                    stack.append(succ)
+                    on_stack.add(succ)
+                    work.append((succ, iter(edges.get(succ, ()))))
+                    advanced = True
+                    break
+                if succ in on_stack:
+                    low[node] = min(low[node], index[succ])
+            if advanced:
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+            if low[node] == index[node]:
+                component: list[str] = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                members = set(component)
+                mask = 0
+                for member in component:
+                    bit = entity_bit.get(member)
+                    if bit is not None:
+                        mask |= 1 << bit
+                    for succ in edges.get(member, ()):
+                        if succ not in members:
+                            mask |= masks[succ]
+                for member in component:
+                    masks[member] = mask
+    return masks
+
+
+def _base_name(text: str) -> str:
+    """``Controllers.IFooService`` / ``IRepository<T>`` -> ``IFooService`` / ``IRepository``."""
+    return text.split("<", 1)[0].strip().rsplit(".", 1)[-1]
+
+
+def _is_hub(cs_type: CsType) -> bool:
+    return any(_base_name(base) in HUB_BASES for base in cs_type.bases)
+
+
+def build_graph(index: CsIndex, model: EfModel) -> DependencyGraph:
+    tables = model.tables()
+    entity_names = sorted({e.short_name for e in tables})
+    graph = DependencyGraph(entities=entity_names)
+    graph.aliases = {e.db_set: e.short_name for e in tables if e.db_set}
+    by_name = index.by_name()
+    hubs = {name for name, types in by_name.items() if any(_is_hub(t) for t in types)}
+    nodes = (set(by_name) | set(entity_names)) - hubs
+    graph.edges = {name: set() for name in nodes}
+    entities = set(entity_names)
+
+    interfaces = {name for name, types in by_name.items() if any(t.kind == "interface" for t in types)}
+    implementations: dict[str, set[str]] = defaultdict(set)
+    for name, types in by_name.items():
+        if name in entities:
+            continue  # ``BaseEntity``/``IAuditable`` must not fan out to every table
+        for cs_type in types:
+            for base in map(_base_name, cs_type.bases):
+                if base in interfaces and base != name:
+                    implementations[base].add(name)
+
+    for name in nodes - entities:
+        targets = graph.edges[name]
+        for cs_type in by_name.get(name, ()):
+            if cs_type.kind == "enum":
+                continue  # members such as ``TipoDocumento.Chapa`` are not type references
+            typed = [*cs_type.ctor_params, *cs_type.fields]
+            for text in [*(m.type for m in typed), *cs_type.bases]:
+                targets.update(type_names(text))
+            targets.update(cs_type.references)
+        targets.update(implementations.get(name, ()))
+        resolved = {graph.resolve(t) for t in targets}
+        resolved.discard(None)
+        resolved.discard(name)
+        graph.edges[name] = resolved  # type: ignore[assignment]
+
+    graph.implementations = dict(implementations)
+    method_types = [(name, t) for name in nodes - entities for t in by_name.get(name, ()) if t.kind != "enum"]
+    for name, cs_type in method_types:
+        for method in cs_type.methods:
+            graph.methods.setdefault(name, set()).add(method.name)
+            graph.edges.setdefault(method_node(name, method.name), set())
+    for name, cs_type in method_types:
+        for method in cs_type.methods:
+            node = method_node(name, method.name)
+            graph.edges[node] |= graph.body_targets(cs_type, method.references, method.calls) - {node}
+    return graph
+
+
+def action_seeds(graph: DependencyGraph, controller: CsType, action: CsAction) -> set[str]:
+    """Nodes an action starts from: the methods it calls, the members and types it uses, its parameters."""
+    seeds = graph.body_targets(controller, action.references, action.calls)
+    for param in action.params:
+        seeds.update(n for n in map(graph.resolve, type_names(param.type)) if n is not None)
+    return seeds
+
+
+def action_reach(index: CsIndex, model: EfModel) -> list[ActionReach]:
+    graph = build_graph(index, model)
+    rows = []
+    for _, controller in index.controllers():
+        for action in controller.actions:
+            mask = graph.reach(action_seeds(graph, controller, action))
+            rows.append(
+                ActionReach(controller.name, action.name, action.verb, action.template, graph.decode(mask))
+            )
+    return rows
@@ -0,0 +1,381 @@
+"""DTO symbol table and DET/FTR estimation for controller actions.
+
+DTOs are the records/classes declared under ``Application/DTOs`` and
+``Application/Services`` (plus the small request records some controllers
+declare inline). Their DET is the number of leaf fields once nested DTOs
+are flattened and base records folded in; FTR is the set of domain
+entities (EF model short names) a DTO or its nested DTOs stand for.
+
+Both are memoized graph walks. Results are stored in the shared
+:class:`~apfscan.csharp.CsIndex` cache together with each DTO's
+dependencies, so after a refresh only the DTOs declared in changed files,
+and the DTOs that (transitively) embed them, are recomputed.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+
+from .csharp import API_ROOT, CsAction, CsIndex, CsType, split_top_level
+
+APPLICATION = API_ROOT / "CAU.Eleitoral.Application"
+DTO_DIRS = (
+    (APPLICATION / "DTOs").as_posix() + "/",
+    (APPLICATION / "Services").as_posix() + "/",
+    (API_ROOT / "CAU.Eleitoral.Api" / "Controllers").as_posix() + "/",
+)
+
+SCALARS = frozenset(
+    {
+        "string", "char", "bool", "byte", "sbyte", "short", "ushort", "int", "uint", "long", "ulong",
+        "float", "double", "decimal", "object", "dynamic", "Guid", "DateTime", "DateTimeOffset",
+        "DateOnly", "TimeOnly", "TimeSpan", "Uri", "IFormFile", "IFormFileCollection", "Stream",
+        "JsonElement", "JsonDocument",
+    }
+)
+# Wrappers that carry no fields of their own: the DET is that of the argument.
+TRANSPARENT = frozenset(
+    {
+        "Task", "ValueTask", "ActionResult", "Nullable", "IEnumerable", "IAsyncEnumerable", "List",
+        "IList", "ICollection", "IReadOnlyList", "IReadOnlyCollection", "HashSet", "ISet", "Array",
+    }
+)
+# Not part of the logical transaction.
+IGNORED_PARAMS = frozenset({"CancellationToken"})
+RESULT_ONLY = frozenset({"IActionResult", "FileResult", "FileContentResult", "FileStreamResult"})
+
+# IFPUG transactional matrices: (FTR band, DET band) -> complexity, and weights.
+TRANSACTION_WEIGHTS = {
+    "EE": {"Baixa": 3, "Media": 4, "Alta": 6},
+    "CE": {"Baixa": 3, "Media": 4, "Alta": 6},
+    "SE": {"Baixa": 4, "Media": 5, "Alta": 7},
+}
+_MATRIX = (
+    ("Baixa", "Baixa", "Media"),
+    ("Baixa", "Media", "Alta"),
+    ("Media", "Alta", "Alta"),
+)
+# GET actions that derive data (reports, exports, statistics) are SE, not CE.
+_SE_HINT = re.compile(r"relatorio|export|pdf|csv|xlsx|estatistic|dashboard|download|grafico|totaliz", re.I)
+
+
+def transaction_complexity(tipo: str, det: int, ftr: int) -> str:
+    if tipo == "EE":
+        ftr_band = 0 if ftr < 2 else 1 if ftr == 2 else 2
+        det_band = 0 if det <= 4 else 1 if det <= 15 else 2
+    else:
+        ftr_band = 0 if ftr < 2 else 1 if ftr <= 3 else 2
+        det_band = 0 if det <= 5 else 1 if det <= 19 else 2
+    return _MATRIX[ftr_band][det_band]
+
+
+@dataclass(frozen=True)
+class TypeRef:
+    name: str
+    args: tuple[TypeRef, ...] = ()
+    array: bool = False
+
+    @classmethod
+    def parse(cls, text: str) -> TypeRef:
+        text = text.strip().rstrip("?").strip()
+        array = False
+        while text.endswith("[]"):
+            array = True
+            text = text[:-2].rstrip("?").strip()
+        if text.startswith("(") and text.endswith(")"):
+            # Tuple: treat as an anonymous DTO of its elements.
+            parts = [p.strip().rsplit(None, 1)[0] if " " in p.strip() else p for p in split_top_level(text[1:-1])]
+            return cls("(tuple)", tuple(cls.parse(p) for p in parts), array)
+        if "<" in text and text.endswith(">"):
+            head, inner = text.split("<", 1)
+            args = tuple(cls.parse(a) for a in split_top_level(inner[:-1]))
+            return cls(head.strip().rsplit(".", 1)[-1], args, array)
+        return cls(text.rsplit(".", 1)[-1], (), array)
+
+    def unwrap(self) -> TypeRef:
+        ref = self
+        while ref.name in TRANSPARENT and len(ref.args) == 1:
+            ref = ref.args[0]
+        return ref
+
+    def names(self) -> set[str]:
+        """Every type name in the reference, generic arguments included."""
+        found = {self.name}
+        for arg in self.args:
+            found |= arg.names()
+        return found
+
+
+@dataclass(frozen=True)
+class DtoInfo:
+    name: str
+    file: str
+    det: int
+    entities: tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class ActionMetrics:
+    controller: str
+    action: str
+    verb: str
+    template: str | None
+    tipo: str
+    request: tuple[str, ...]
+    response: str | None
+    det: int
+    ftr: int
+    complexidade: str
+    pf: int
+
+
+@dataclass(frozen=True)
+class TransacaoControllerComplexity:
+    controller: str
+    acoes: int
+    ee: int
+    ce: int
+    se: int
+    det_total: int
+    baixa: int
+    media: int
+    alta: int
+    pf: int
+
+
+class DtoIndex:
+    """Symbol table of DTO types with memoized, persisted DET/FTR."""
+
+    CACHE_KEY = "dtos"
+    # Bumped when the cached entries change meaning (2: deps include unresolved names).
+    CACHE_VERSION = 2
+
+    def __init__(self, index: CsIndex, entity_names: Iterable[str], changed: Iterable[str] | None = None) -> None:
+        self.index = index
+        self.entity_names = frozenset(entity_names)
+        # Longest first, so "DefesaDenuncia" wins over "Denuncia".
+        self._entity_order = sorted(self.entity_names, key=lambda n: (-len(n), n))
+        self.symbols: dict[str, CsType] = {}
+        self.files: dict[str, str] = {}
+        for rel, cs_type in index.iter_types():
+            if not rel.startswith(DTO_DIRS) or cs_type.kind not in ("record", "class", "struct", "enum"):
+                continue
+            if cs_type.kind != "enum" and not cs_type.properties and not cs_type.bases:
+                continue
+            if cs_type.name.endswith(("Service", "Controller", "Validator")):
+                continue
+            # First declaration wins; duplicates across modules are rare and equivalent.
+            self.symbols.setdefault(cs_type.name, cs_type)
+            self.files.setdefault(cs_type.name, rel)
+        self.enums = {n for n, t in self.symbols.items() if t.kind == "enum"}
+        self.recomputed = 0
+        self._cache = self._load_cache(changed)
+
+    # -- persistence -------------------------------------------------
+
+    def _signature(self) -> str:
+        text = "\n".join([f"v{self.CACHE_VERSION}", *sorted(self.entity_names)])
+        return hashlib.sha1(text.encode()).hexdigest()
+
+    def _load_cache(self, changed: Iterable[str] | None) -> dict[str, dict]:
+        stored = self.index.extra.get(self.CACHE_KEY) or {}
+        if stored.get("entities") != self._signature() or changed is None:
+            return {}
+        entries: dict[str, dict] = stored.get("types", {})
+        changed = set(changed)
+        dirty = {name for name, e in entries.items() if e.get("file") in changed}
+        dirty |= {name for name, rel in self.files.items() if rel in changed}
+        # A type declared since the last run changes every entry that named it while it
+        # was still unresolved (counted as one field); those entries list it among their deps.
+        dirty |= {name for name in self.symbols if name not in entries and name not in self.enums}
+        dependents: dict[str, set[str]] = defaultdict(set)
+        for name, entry in entries.items():
+            for dep in entry.get("deps", ()):
+                dependents[dep].add(name)
+        pending = list(dirty)
+        while pending:
+            for parent in dependents.get(pending.pop(), ()):
+                if parent not in dirty:
+                    dirty.add(parent)
+                    pending.append(parent)
+        return {name: e for name, e in entries.items() if name not in dirty and name in self.symbols}
+
+    def store(self) -> None:
+        """Write the memoized DTO metrics into the index cache (``CsIndex.save`` persists it)."""
+        for name in self.symbols:
+            self.info(name)
+        self.index.extra[self.CACHE_KEY] = {"entities": self._signature(), "types": self._cache}
+
+    # -- graph walks -------------------------------------------------
+
+    def info(self, name: str) -> DtoInfo:
+        det, entities = self._walk(TypeRef(name), ())
+        return DtoInfo(name=name, file=self.files.get(name, ""), det=det, entities=tuple(sorted(entities)))
+
+    def _entities_in_name(self, name: str) -> set[str]:
+        for entity in self._entity_order:
+            if entity in name:
+                return {entity}
+        return set()
+
+    def _walk(self, ref: TypeRef, stack: tuple[str, ...]) -> tuple[int, frozenset[str]]:
+        ref = ref.unwrap()
+        if ref.name in SCALARS or ref.name in self.enums or ref.name in stack:
+            return 1, frozenset()
+        if ref.name in self.entity_names and ref.name not in self.symbols:
+            # An entity exposed directly: one DET per business field is unknown here, count as a group.
+            return 1, frozenset({ref.name})
+        if ref.name == "(tuple)":
+            det, ents = 0, set()
+            for arg in ref.args:
+                d, e = self._walk(arg, stack)
+                det += d
+                ents |= e
+            return max(det, 1), frozenset(ents)
+        symbol = self.symbols.get(ref.name)
+        if symbol is None:
+            if ref.args:
+                # Unknown generic (Dictionary<,>, KeyValuePair<,>, ...): fields of the value type.
+                return self._walk(ref.args[-1], stack)
+            return 1, frozenset()
+
+        if not ref.args:
+            cached = self._cache.get(ref.name)
+            if cached is not None:
+                return cached["det"], frozenset(cached["entities"])
+
+        bindings = dict(zip(symbol.generics, ref.args))
+        inner = stack + (ref.name,)
+        det = 0
+        entities: set[str] = self._entities_in_name(ref.name)
+        # Unresolved names count too: declaring one later must invalidate this entry.
+        deps: set[str] = set()
+        for base in symbol.bases:
+            base_ref = TypeRef.parse(base)
+            deps.add(base_ref.name)
+            if base_ref.name in self.symbols:
+                d, e = self._walk(self._bind(base_ref, bindings), inner)
+                det += d
+                entities |= e
+        for prop in symbol.properties:
+            prop_ref = self._bind(TypeRef.parse(prop.type), bindings)
+            deps |= prop_ref.names() - SCALARS - TRANSPARENT
+            d, e = self._walk(prop_ref, inner)
+            det += d
+            entities |= e
+            if prop.name.endswith("Id") and prop.name[:-2] in self.entity_names:
+                entities.add(prop.name[:-2])
+        result = (max(det, 1), frozenset(entities))
+        if not ref.args:
+            self.recomputed += 1
+            self._cache[ref.name] = {
+                "file": self.files.get(ref.name, ""),
+                "det": result[0],
+                "entities": sorted(result[1]),
+                "deps": sorted(deps),
+            }
+        return result
+
+    @staticmethod
+    def _bind(ref: TypeRef, bindings: dict[str, TypeRef]) -> TypeRef:
+        if not bindings:
+            return ref
+        if not ref.args and ref.name in bindings:
+            bound = bindings[ref.name]
+            return TypeRef(bound.name, bound.args, ref.array or bound.array)
+        return TypeRef(ref.name, tuple(DtoIndex._bind(a, bindings) for a in ref.args), ref.array)
+
+    # -- controller actions ------------------------------------------
+
+    def action_metrics(self) -> list[ActionMetrics]:
+        return [
+            self.metrics_for(controller, action)
+            for _, controller in self.index.controllers()
+            for action in controller.actions
+        ]
+
+    def metrics_for(self, controller: CsType, action: CsAction) -> ActionMetrics:
+        det = 1  # mensagem/acao
+        entities: set[str] = set()
+        request: list[str] = []
+        for param in action.params:
+            ref = TypeRef.parse(param.type)
+            if ref.name in IGNORED_PARAMS:
+                continue
+            request.append(param.type)
+            d, e = self._walk(ref, ())
+            det += d
+            entities |= e
+
+        response_type = action.produces[0] if action.produces else action.return_type
+        response_ref = TypeRef.parse(response_type).unwrap()
+        response: str | None = None
+        if response_ref.name not in RESULT_ONLY and response_ref.name not in ("void", "Task"):
+            response = response_type
+            d, e = self._walk(response_ref, ())
+            det += d
+            entities |= e
+
+        if action.verb == "GET":
+            tipo = "SE" if _SE_HINT.search(f"{action.name} {action.template or ''}") else "CE"
+        else:
+            tipo = "EE"
+        fallback = self._entities_in_name(controller.name.removesuffix("Controller"))
+        ftr = len(entities or fallback)
+        level = transaction_complexity(tipo, det, ftr)
+        return ActionMetrics(
+            controller=controller.name,
+            action=action.name,
+            verb=action.verb,
+            template=action.template,
+            tipo=tipo,
+            request=tuple(request),
+            response=response,
+            det=det,
+            ftr=ftr,
+            complexidade=level,
+            pf=TRANSACTION_WEIGHTS[tipo][level],
+        )
+
+
+def transacoes_by_controller(actions: Iterable[ActionMetrics]) -> list[TransacaoControllerComplexity]:
+    grouped: dict[str, list[ActionMetrics]] = defaultdict(list)
+    for row in actions:
+        grouped[row.controller].append(row)
+    result: list[TransacaoControllerComplexity] = []
+    for controller in sorted(grouped):
+        rows = grouped[controller]
+        levels = {"Baixa": 0, "Media": 0, "Alta": 0}
+        for row in rows:
+            levels[row.complexidade] += 1
+        result.append(
+            TransacaoControllerComplexity(
+                controller=controller,
+                acoes=len(rows),
+                ee=sum(1 for r in rows if r.tipo == "EE"),
+                ce=sum(1 for r in rows if r.tipo == "CE"),
+                se=sum(1 for r in rows if r.tipo == "SE"),
+                det_total=sum(r.det for r in rows),
+                baixa=levels["Baixa"],
+                media=levels["Media"],
+                alta=levels["Alta"],
+                pf=sum(r.pf for r in rows),
+            )
+        )
+    return result
+
+
+def load_dto_index(root: Path, entity_names: Iterable[str], cache_path: Path | None = None) -> DtoIndex:
+    """Refresh the shared C# index, rebuild what changed and persist both."""
+    index = CsIndex.load(root, cache_path, refresh=False)
+    had_cache = bool(index.files)
+    changed = index.refresh()
+    dtos = DtoIndex(index, entity_names, changed if had_cache else None)
+    dtos.store()
+    if changed or dtos.recomputed:
+        index.save()
+    return dtos
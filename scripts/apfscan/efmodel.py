@@ -0,0 +1,339 @@
+"""DET/RET extraction from the EF Core model snapshot.
+
+``AppDbContextModelSnapshot.cs`` is the complete, migration-maintained
+description of the database model. It is read once, line by line, with a
+brace stack tracking which ``modelBuilder.Entity(...)``/``OwnsOne(...)``
+block each statement belongs to, so the cost stays linear as migrations
+add to the file. ``Data/AppDbContext.cs`` contributes the ``DbSet``
+names and any owned types configured in code.
+
+Per table the parser yields columns (DET), owned types and dependent
+children (extra RETs: 1:N relationships whose rows are deleted with the
+parent) and the foreign-key graph; :func:`ali_by_module` turns that into
+IFPUG ALI complexity for the recount.
+"""
+from __future__ import annotations
+
+import re
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+SNAPSHOT_PATH = Path("apps/api/CAU.Eleitoral.Infrastructure/Migrations/AppDbContextModelSnapshot.cs")
+DBCONTEXT_PATH = Path("apps/api/CAU.Eleitoral.Infrastructure/Data/AppDbContext.cs")
+
+# BaseEntity plumbing: not user-recognizable, so not a DET.
+TECHNICAL_COLUMNS = frozenset({"Id", "CreatedAt", "CreatedBy", "UpdatedAt", "UpdatedBy", "IsDeleted"})
+
+# IFPUG ALI matrix: RET range x DET range -> complexity, and its weight.
+ALI_WEIGHTS = {"Baixa": 7, "Media": 10, "Alta": 15}
+
+_ENTITY = re.compile(r'modelBuilder\.Entity\("([^"]+)",\s*(\w+)\s*=>')
+_OWNS = re.compile(r'\b(\w+)\.Owns(One|Many)\("([^"]+)",\s*"([^"]+)",\s*(\w+)\s*=>')
+_PROPERTY = re.compile(r'\b(\w+)\.Property<.+?>\("([^"]+)"\)')
+_TO_TABLE = re.compile(r'\b(\w+)\.ToTable\("([^"]+)"')
+_HAS_KEY = re.compile(r'\b(\w+)\.HasKey\(([^)]*)\)')
+_HAS_ONE = re.compile(r'\b(\w+)\.HasOne\("([^"]+)"(?:,\s*(?:"([^"]+)"|null))?\)')
+_HAS_BASE = re.compile(r'\b(\w+)\.HasBaseType\("([^"]+)"\)')
+_NAVIGATION = re.compile(r'\b(\w+)\.Navigation\("([^"]+)"\)')
+_WITH = re.compile(r'\.With(Many|One)\(')
+_FOREIGN_KEY = re.compile(r'\.HasForeignKey\(([^)]*)\)')
+_ON_DELETE = re.compile(r'\.OnDelete\(DeleteBehavior\.(\w+)\)')
+_STRING = re.compile(r'"(?:[^"\\]|\\.)*"')
+_QUOTED = re.compile(r'"([^"]+)"')
+
+_DBSET = re.compile(r'\bDbSet<(\w+)>\s+(\w+)')
+_FLUENT_OWNS = re.compile(r'\.Owns(One|Many)\(\s*\w+\s*=>\s*\w+\.(\w+)')
+
+
+@dataclass(frozen=True)
+class ForeignKey:
+    source: str
+    target: str
+    columns: tuple[str, ...]
+    navigation: str | None
+    cardinality: str  # "many" (N:1) or "one" (1:1)
+    required: bool
+    on_delete: str | None
+
+
+@dataclass
+class EfEntity:
+    name: str
+    table: str | None = None
+    columns: list[str] = field(default_factory=list)
+    keys: tuple[str, ...] = ()
+    owner: str | None = None
+    owned: list[str] = field(default_factory=list)
+    base_type: str | None = None
+    navigations: list[str] = field(default_factory=list)
+    db_set: str | None = None
+
+    @property
+    def short_name(self) -> str:
+        return self.name.rsplit(".", 1)[-1]
+
+    @property
+    def module(self) -> str:
+        parts = self.name.split(".")
+        if "Entities" in parts:
+            idx = parts.index("Entities")
+            if idx + 2 < len(parts):
+                return parts[idx + 1]
+        return parts[-2] if len(parts) > 1 else ""
+
+    def business_columns(self) -> list[str]:
+        return [c for c in self.columns if c not in TECHNICAL_COLUMNS]
+
+
+@dataclass
+class EfModel:
+    entities: dict[str, EfEntity] = field(default_factory=dict)
+    foreign_keys: list[ForeignKey] = field(default_factory=list)
+    configured_owned: set[str] = field(default_factory=set)
+
+    def entity(self, name: str) -> EfEntity:
+        found = self.entities.get(name)
+        if found is None:
+            found = self.entities[name] = EfEntity(name=name)
+        return found
+
+    def tables(self) -> list[EfEntity]:
+        """Entities stored in their own table (owned types fold into their owner)."""
+        return [e for e in self.entities.values() if e.owner is None and e.table]
+
+    def fk_graph(self) -> dict[str, set[str]]:
+        graph: dict[str, set[str]] = defaultdict(set)
+        for fk in self.foreign_keys:
+            graph[fk.source].add(fk.target)
+        return graph
+
+    def det(self, entity: EfEntity) -> int:
+        total = len(entity.business_columns())
+        for owned_name in entity.owned:
+            owned = self.entities.get(owned_name)
+            if owned is not None:
+                # The owned type's shadow key back to the owner is not a DET.
+                total += sum(1 for c in owned.business_columns() if c not in owned.keys)
+        return total
+
+    def dependents(self, entity: EfEntity) -> set[str]:
+        """Tables on the many side of a cascade-delete relationship to ``entity``."""
+        return {
+            fk.source
+            for fk in self.foreign_keys
+            if fk.target == entity.name
+            and fk.source != entity.name
+            and fk.cardinality == "many"
+            and fk.on_delete == "Cascade"
+            and fk.source not in entity.owned
+        }
+
+    def ret(self, entity: EfEntity) -> int:
+        owned = len(entity.owned) + sum(
+            1 for nav in entity.navigations if nav in self.configured_owned and nav not in entity.owned
+        )
+        return 1 + owned + len(self.dependents(entity))
+
+
+@dataclass(frozen=True)
+class AliModuleComplexity:
+    modulo: str
+    tabelas: int
+    det_total: int
+    baixa: int
+    media: int
+    alta: int
+    pf: int
+
+
+def ali_complexity(det: int, ret: int) -> str:
+    det_band = 0 if det < 20 else 1 if det <= 50 else 2
+    ret_band = 0 if ret < 2 else 1 if ret <= 5 else 2
+    matrix = (
+        ("Baixa", "Baixa", "Media"),
+        ("Baixa", "Media", "Alta"),
+        ("Media", "Alta", "Alta"),
+    )
+    return matrix[ret_band][det_band]
+
+
+def _strip_strings(line: str) -> str:
+    return _STRING.sub('""', line)
+
+
+def _quoted(args: str) -> list[str]:
+    return _QUOTED.findall(args)
+
+
+@dataclass
+class _Frame:
+    var: str | None
+    entity: EfEntity | None
+
+
+class _Chain:
+    """A ``b.HasOne(...)...;`` statement being assembled across lines."""
+
+    def __init__(self, source: str, target: str, navigation: str | None) -> None:
+        self.source = source
+        self.target = target
+        self.navigation = navigation
+        self.cardinality = "many"
+        self.columns: tuple[str, ...] = ()
+        self.required = False
+        self.on_delete: str | None = None
+
+    def feed(self, line: str) -> None:
+        with_match = _WITH.search(line)
+        if with_match:
+            self.cardinality = with_match.group(1).lower()
+        fk = _FOREIGN_KEY.search(line)
+        if fk:
+            names = _quoted(fk.group(1))
+            if len(names) > 1 and "." in names[0]:
+                # 1:1 form: HasForeignKey("Dependent.Type", "Column")
+                self.source = names[0]
+                names = names[1:]
+            self.columns = tuple(names)
+        delete = _ON_DELETE.search(line)
+        if delete:
+            self.on_delete = delete.group(1)
+        if ".IsRequired()" in line:
+            self.required = True
+
+    def build(self) -> ForeignKey:
+        return ForeignKey(
+            source=self.source,
+            target=self.target,
+            columns=self.columns,
+            navigation=self.navigation,
+            cardinality=self.cardinality,
+            required=self.required,
+            on_delete=self.on_delete,
+        )
+
+
+def parse_model_snapshot(lines: Iterable[str], model: EfModel | None = None) -> EfModel:
+    """Single streaming pass over the snapshot source."""
+    model = model or EfModel()
+    stack: list[_Frame] = []
+    pending: _Frame | None = None
+    chain: _Chain | None = None
+
+    for raw in lines:
+        line = raw.strip()
+        if not line or line.startswith("//"):
+            continue
+
+        frame = stack[-1] if stack else None
+        entity = frame.entity if frame else None
+
+        if chain is not None and not line.startswith("."):
+            model.foreign_keys.append(chain.build())
+            chain = None
+
+        m = _ENTITY.search(line)
+        if m:
+            pending = _Frame(var=m.group(2), entity=model.entity(m.group(1)))
+        elif entity is not None:
+            m = _OWNS.search(line)
+            if m and m.group(1) == frame.var:
+                owned = model.entity(m.group(3))
+                owned.owner = entity.name
+                if owned.name not in entity.owned:
+                    entity.owned.append(owned.name)
+                pending = _Frame(var=m.group(5), entity=owned)
+            elif chain is not None:
+                chain.feed(line)
+            else:
+                m = _PROPERTY.search(line)
+                if m and m.group(1) == frame.var:
+                    if m.group(2) not in entity.columns:
+                        entity.columns.append(m.group(2))
+                else:
+                    m = _HAS_ONE.search(line)
+                    if m and m.group(1) == frame.var:
+                        chain = _Chain(entity.name, m.group(2), m.group(3))
+                        chain.feed(line[m.end():])
+                    elif (m := _TO_TABLE.search(line)) and m.group(1) == frame.var:
+                        entity.table = m.group(2)
+                    elif (m := _HAS_KEY.search(line)) and m.group(1) == frame.var:
+                        entity.keys = tuple(_quoted(m.group(2)))
+                    elif (m := _HAS_BASE.search(line)) and m.group(1) == frame.var:
+                        entity.base_type = m.group(2)
+                    elif (m := _NAVIGATION.search(line)) and m.group(1) == frame.var:
+                        if m.group(2) not in entity.navigations:
+                            entity.navigations.append(m.group(2))
+
+        if chain is not None and line.endswith(";"):
+            model.foreign_keys.append(chain.build())
+            chain = None
+
+        code = _strip_strings(line)
+        for ch in code:
+            if ch == "{":
+                stack.append(pending or _Frame(var=frame.var if frame else None, entity=entity))
+                pending = None
+            elif ch == "}" and stack:
+                stack.pop()
+
+    if chain is not None:
+        model.foreign_keys.append(chain.build())
+    return model
+
+
+def parse_db_context(lines: Iterable[str], model: EfModel) -> EfModel:
+    """``DbSet<T> Name`` declarations and fluent ``OwnsOne/OwnsMany`` calls."""
+    by_short: dict[str, EfEntity] = {e.short_name: e for e in model.entities.values()}
+    for raw in lines:
+        m = _DBSET.search(raw)
+        if m:
+            entity = by_short.get(m.group(1))
+            if entity is not None:
+                entity.db_set = m.group(2)
+            continue
+        for owns in _FLUENT_OWNS.finditer(raw):
+            model.configured_owned.add(owns.group(2))
+    return model
+
+
+def load_ef_model(root: Path) -> EfModel:
+    snapshot = root / SNAPSHOT_PATH
+    if not snapshot.exists():
+        raise RuntimeError(f"Snapshot EF Core nao encontrado: {snapshot}")
+    with snapshot.open(encoding="utf-8-sig") as f:
+        model = parse_model_snapshot(f)
+    context = root / DBCONTEXT_PATH
+    if context.exists():
+        with context.open(encoding="utf-8-sig") as f:
+            parse_db_context(f, model)
+    return model
+
+
+def ali_by_module(model: EfModel) -> list[AliModuleComplexity]:
+    grouped: dict[str, list[EfEntity]] = defaultdict(list)
+    for entity in model.tables():
+        grouped[entity.module].append(entity)
+
+    rows: list[AliModuleComplexity] = []
+    for modulo in sorted(grouped):
+        levels = {"Baixa": 0, "Media": 0, "Alta": 0}
+        det_total = 0
+        for entity in grouped[modulo]:
+            det = model.det(entity)
+            det_total += det
+            levels[ali_complexity(det, model.ret(entity))] += 1
+        rows.append(
+            AliModuleComplexity(
+                modulo=modulo,
+                tabelas=len(grouped[modulo]),
+                det_total=det_total,
+                baixa=levels["Baixa"],
+                media=levels["Media"],
+                alta=levels["Alta"],
+                pf=sum(ALI_WEIGHTS[level] * qty for level, qty in levels.items()),
+            )
+        )
+    return rows
@@ -0,0 +1,402 @@
+"""Static, self-contained HTML explorer for an APF snapshot.
+
+The generator writes ``index.html`` (CSS and JavaScript inline, no external
+assets) and a ``data/`` directory with one manifest plus the rows of each
+table split in fixed-size chunks. The manifest carries everything the page
+needs to open: per table the columns, row and chunk counts, and the indexes
+computed here once instead of in the browser (distinct values and counts of
+the low-cardinality columns, used as filters; sum/min/max of the numeric
+columns). Rows are loaded only when their table is opened, first chunk
+first, the rest in the background.
+
+Data files are JSON payloads wrapped in a call (``APF.chunk("rotas", 3,
+[...])``) and loaded with ``<script>`` tags rather than ``fetch``, so the
+explorer also works opened straight from disk (``file://``), where browsers
+block ``fetch``. The table is virtualized (only the visible rows are in the
+DOM); filtering and sorting work on an index array, so 10^5 rows stay
+responsive.
+"""
+from __future__ import annotations
+
+import html
+import json
+import shutil
+from collections import Counter
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+CHUNK_ROWS = 5000
+FACET_LIMIT = 40  # columns with at most this many distinct values become filters
+
+
+@dataclass
+class ExplorerTable:
+    name: str  # file-safe identifier
+    title: str
+    columns: Sequence[str]
+    rows: Iterable[Sequence[Any]]
+    numeric: frozenset[str] = field(default_factory=frozenset)
+
+
+@dataclass
+class _ColumnStats:
+    values: Counter[Any] = field(default_factory=Counter)
+    overflow: bool = False
+    total: float = 0.0
+    low: float | None = None
+    high: float | None = None
+
+    def add(self, value: Any) -> None:
+        if not self.overflow:
+            self.values[value] += 1
+            if len(self.values) > FACET_LIMIT:
+                self.overflow = True
+                self.values.clear()
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            self.total += value
+            self.low = value if self.low is None else min(self.low, value)
+            self.high = value if self.high is None else max(self.high, value)
+
+
+def _chunk_script(name: str, number: int, rows: list[Sequence[Any]]) -> str:
+    payload = json.dumps(rows, ensure_ascii=False, separators=(",", ":"))
+    return f"APF.chunk({json.dumps(name)},{number},{payload});\n"
+
+
+def write_table(data_dir: Path, table: ExplorerTable, chunk_rows: int = CHUNK_ROWS) -> dict[str, Any]:
+    """Stream ``table.rows`` into chunk files; return the table's manifest entry."""
+    stats = [_ColumnStats() for _ in table.columns]
+    chunk: list[Sequence[Any]] = []
+    chunks = rows = 0
+    for row in table.rows:
+        row = list(row)
+        for column, value in zip(stats, row):
+            column.add(value)
+        chunk.append(row)
+        rows += 1
+        if len(chunk) == chunk_rows:
+            (data_dir / f"{table.name}-{chunks}.js").write_text(_chunk_script(table.name, chunks, chunk), encoding="utf-8")
+            chunks += 1
+            chunk = []
+    if chunk:
+        (data_dir / f"{table.name}-{chunks}.js").write_text(_chunk_script(table.name, chunks, chunk), encoding="utf-8")
+        chunks += 1
+
+    columns = []
+    for name, column in zip(table.columns, stats):
+        entry: dict[str, Any] = {"name": name, "numeric": name in table.numeric}
+        if name in table.numeric and column.low is not None:
+            total = round(column.total, 2)
+            entry.update(sum=int(total) if total.is_integer() else total, min=column.low, max=column.high)
+        elif not column.overflow and 1 < len(column.values) and rows > len(column.values):
+            entry["facets"] = sorted(([v, n] for v, n in column.values.items()), key=lambda vn: str(vn[0]))
+        columns.append(entry)
+    return {"name": table.name, "title": table.title, "rows": rows, "chunks": chunks, "columns": columns}
+
+
+def write_explorer(
+    out_dir: Path,
+    tables: Iterable[ExplorerTable],
+    *,
+    title: str,
+    summary: Sequence[tuple[str, Any]] = (),
+    chunk_rows: int = CHUNK_ROWS,
+) -> dict[str, Any]:
+    """Write ``out_dir/index.html`` and ``out_dir/data``; return the manifest.
+
+    A previous run's ``data`` (recognized by its ``manifest.js``) is replaced,
+    so no stale chunks of a larger run remain; any other existing ``data``
+    directory raises :class:`FileExistsError` instead of being deleted.
+    """
+    data_dir = out_dir / "data"
+    if (data_dir / "manifest.js").is_file():
+        shutil.rmtree(data_dir)
+    elif data_dir.exists():
+        raise FileExistsError(f"{data_dir} existe e nao foi gerado pelo explorador (sem manifest.js)")
+    data_dir.mkdir(parents=True)
+    manifest = {
+        "title": title,
+        "summary": [[label, value] for label, value in summary],
+        "tables": [write_table(data_dir, t, chunk_rows) for t in tables],
+    }
+    (data_dir / "manifest.js").write_text(
+        f"APF.manifest({json.dumps(manifest, ensure_ascii=False, separators=(',', ':'))});\n", encoding="utf-8"
+    )
+    (out_dir / "index.html").write_text(_PAGE.replace("__TITLE__", html.escape(title)), encoding="utf-8")
+    return manifest
+
+
+_PAGE = """<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>__TITLE__</title>
+<style>
+  * { box-sizing: border-box; }
+  body { margin: 0; font: 14px/1.4 system-ui, sans-serif; color: #1b1f24; background: #f4f6f9; }
+  header { background: #1f4e79; color: #fff; padding: 12px 20px; }
+  header h1 { margin: 0; font-size: 18px; }
+  nav { display: flex; flex-wrap: wrap; gap: 4px; padding: 8px 20px; background: #fff; border-bottom: 1px solid #d0d7de; }
+  nav button { border: 1px solid #d0d7de; background: #f6f8fa; padding: 6px 12px; border-radius: 4px; cursor: pointer; }
+  nav button.active { background: #2f5597; border-color: #2f5597; color: #fff; }
+  main { padding: 12px 20px; }
+  .cards { display: flex; flex-wrap: wrap; gap: 8px; }
+  .card { background: #fff; border: 1px solid #d0d7de; border-radius: 6px; padding: 10px 14px; min-width: 160px; }
+  .card b { display: block; font-size: 20px; }
+  .tools { display: flex; flex-wrap: wrap; gap: 8px; align-items: center; margin-bottom: 8px; }
+  .tools input, .tools select { padding: 5px 8px; border: 1px solid #d0d7de; border-radius: 4px; }
+  .status { color: #57606a; font-size: 12px; }
+  .grid { background: #fff; border: 1px solid #d0d7de; border-radius: 6px; overflow: hidden; }
+  .head, .row { display: grid; }
+  .head div { font-weight: 600; background: #e8eef7; padding: 6px 8px; cursor: pointer; user-select: none; white-space: nowrap; overflow: hidden; }
+  .head div.asc::after { content: " \\25B2"; }
+  .head div.desc::after { content: " \\25BC"; }
+  .body { height: calc(100vh - 230px); min-height: 240px; overflow-y: auto; position: relative; }
+  .row { position: absolute; left: 0; right: 0; height: 26px; border-bottom: 1px solid #eef1f4; }
+  .row div { padding: 4px 8px; white-space: nowrap; overflow: hidden; text-overflow: ellipsis; }
+  .num { text-align: right; font-variant-numeric: tabular-nums; }
+  .foot { display: grid; background: #f6f8fa; border-top: 1px solid #d0d7de; font-weight: 600; }
+  .foot div { padding: 6px 8px; }
+</style>
+</head>
+<body>
+<header><h1 id="title">__TITLE__</h1></header>
+<nav id="tabs"></nav>
+<main id="main"><p class="status">Carregando indice...</p></main>
+<script>
+"use strict";
+var ROW_HEIGHT = 26;
+var APF = {
+  meta: null,
+  data: {},      // table -> loaded rows (chunk order)
+  loaded: {},    // table -> number of chunks loaded
+  waiting: {},   // "table:chunk" -> callback
+  listeners: {}, // table -> refresh of the view currently showing it
+  current: null,
+  manifest: function (m) { APF.meta = m; start(); },
+  chunk: function (name, n, rows) {
+    var cb = APF.waiting[name + ":" + n];
+    delete APF.waiting[name + ":" + n];
+    if (cb) cb(rows);
+  }
+};
+
+function loadScript(src, onError) {
+  var s = document.createElement("script");
+  s.src = src;
+  s.onerror = onError || null;
+  document.head.appendChild(s);
+}
+
+function loadChunks(table, onProgress) {
+  // Chunks load in order, one at a time; each arrival re-renders the view.
+  // Reopening a table while it loads replaces the listener, so pending
+  // chunks refresh the new view instead of the detached one.
+  APF.listeners[table.name] = onProgress;
+  if (APF.data[table.name]) { onProgress(); return; }
+  APF.data[table.name] = [];
+  APF.loaded[table.name] = 0;
+  (function next(n) {
+    if (n >= table.chunks) return;
+    APF.waiting[table.name + ":" + n] = function (rows) {
+      var target = APF.data[table.name];
+      for (var i = 0; i < rows.length; i++) target.push(rows[i]);
+      APF.loaded[table.name] = n + 1;
+      APF.listeners[table.name]();
+      setTimeout(function () { next(n + 1); }, 0);
+    };
+    loadScript("data/" + table.name + "-" + n + ".js");
+  })(0);
+}
+
+function el(tag, cls, text) {
+  var e = document.createElement(tag);
+  if (cls) e.className = cls;
+  if (text !== undefined && text !== null) e.textContent = text;
+  return e;
+}
+
+function fmt(v) {
+  if (typeof v === "number") return v.toLocaleString("pt-BR");
+  if (v === null || v === undefined) return "";
+  if (typeof v === "boolean") return v ? "sim" : "nao";
+  return String(v);
+}
+
+function start() {
+  var tabs = document.getElementById("tabs");
+  document.title = APF.meta.title;
+  var buttons = [];
+  function tab(label, show) {
+    var b = el("button", "", label);
+    b.onclick = function () {
+      buttons.forEach(function (x) { x.classList.remove("active"); });
+      b.classList.add("active");
+      show();
+    };
+    buttons.push(b);
+    tabs.appendChild(b);
+    return b;
+  }
+  tab("Resumo", showSummary).click();
+  APF.meta.tables.forEach(function (t) {
+    tab(t.title + " (" + t.rows.toLocaleString("pt-BR") + ")", function () { showTable(t); });
+  });
+}
+
+function showSummary() {
+  APF.current = null;
+  var main = document.getElementById("main");
+  main.textContent = "";
+  var cards = el("div", "cards");
+  APF.meta.summary.forEach(function (kv) {
+    var c = el("div", "card", kv[0]);
+    c.appendChild(el("b", "", fmt(kv[1])));
+    cards.appendChild(c);
+  });
+  APF.meta.tables.forEach(function (t) {
+    var c = el("div", "card", t.title);
+    c.appendChild(el("b", "", fmt(t.rows)));
+    cards.appendChild(c);
+  });
+  main.appendChild(cards);
+}
+
+function showTable(table) {
+  APF.current = table.name;
+  var main = document.getElementById("main");
+  main.textContent = "";
+  var cols = table.columns;
+  var template = cols.map(function (c) { return c.numeric ? "minmax(70px, 0.5fr)" : "minmax(120px, 1fr)"; }).join(" ");
+  var state = { query: "", facets: {}, sort: -1, desc: false, view: null, text: null };
+
+  var tools = el("div", "tools");
+  var search = el("input");
+  search.placeholder = "Filtrar...";
+  search.oninput = function () { state.query = search.value.toLowerCase(); refresh(); };
+  tools.appendChild(search);
+  cols.forEach(function (c, i) {
+    if (!c.facets) return;
+    var sel = el("select");
+    sel.appendChild(new Option(c.name + ": todos", ""));
+    c.facets.forEach(function (f) { sel.appendChild(new Option(fmt(f[0]) + " (" + fmt(f[1]) + ")", JSON.stringify(f[0]))); });
+    sel.onchange = function () {
+      if (sel.value === "") delete state.facets[i]; else state.facets[i] = JSON.parse(sel.value);
+      refresh();
+    };
+    tools.appendChild(sel);
+  });
+  var status = el("span", "status");
+  tools.appendChild(status);
+  main.appendChild(tools);
+
+  var grid = el("div", "grid");
+  var head = el("div", "head");
+  head.style.gridTemplateColumns = template;
+  var headers = cols.map(function (c, i) {
+    var h = el("div", c.numeric ? "num" : "", c.name);
+    h.onclick = function () {
+      if (state.sort === i) state.desc = !state.desc; else { state.sort = i; state.desc = false; }
+      headers.forEach(function (x) { x.classList.remove("asc", "desc"); });
+      h.classList.add(state.desc ? "desc" : "asc");
+      refresh();
+    };
+    head.appendChild(h);
+    return h;
+  });
+  var body = el("div", "body");
+  var spacer = el("div");
+  body.appendChild(spacer);
+  var foot = el("div", "foot");
+  foot.style.gridTemplateColumns = template;
+  grid.appendChild(head);
+  grid.appendChild(body);
+  grid.appendChild(foot);
+  main.appendChild(grid);
+
+  function rowText(rows, i) {
+    // Lower-cased search text, built once per row on the first text filter.
+    if (!state.text) state.text = [];
+    var t = state.text[i];
+    if (t === undefined) t = state.text[i] = rows[i].map(fmt).join(" \\u0001 ").toLowerCase();
+    return t;
+  }
+
+  function refresh() {
+    if (APF.current !== table.name) return;
+    var rows = APF.data[table.name] || [];
+    var keys = Object.keys(state.facets);
+    var view = [];
+    for (var i = 0; i < rows.length; i++) {
+      var ok = true;
+      for (var k = 0; k < keys.length && ok; k++) ok = rows[i][keys[k]] === state.facets[keys[k]];
+      if (ok && state.query) ok = rowText(rows, i).indexOf(state.query) >= 0;
+      if (ok) view.push(i);
+    }
+    if (state.sort >= 0) {
+      var s = state.sort, sign = state.desc ? -1 : 1, numeric = cols[s].numeric;
+      view.sort(function (a, b) {
+        var x = rows[a][s], y = rows[b][s];
+        if (x === y) return a - b;
+        if (x === null || x === undefined) return 1;
+        if (y === null || y === undefined) return -1;
+        if (numeric) return (x - y) * sign;
+        return String(x).localeCompare(String(y), "pt-BR") * sign;
+      });
+    }
+    state.view = view;
+    var loaded = APF.loaded[table.name] || 0;
+    status.textContent = fmt(view.length) + " de " + fmt(rows.length) + " linhas" +
+      (loaded < table.chunks ? " (carregando " + loaded + "/" + table.chunks + " blocos)" : "");
+    foot.textContent = "";
+    cols.forEach(function (c, j) {
+      var total = "";
+      if (c.numeric) {
+        var sum = 0;
+        for (var v = 0; v < view.length; v++) sum += rows[view[v]][j] || 0;
+        total = fmt(Math.round(sum * 100) / 100);
+      } else if (j === 0) {
+        total = "Total";
+      }
+      foot.appendChild(el("div", c.numeric ? "num" : "", total));
+    });
+    spacer.style.height = view.length * ROW_HEIGHT + "px";
+    paint();
+  }
+
+  function paint() {
+    // Only the rows in the viewport (plus a margin) are in the DOM.
+    var rows = APF.data[table.name] || [];
+    var view = state.view || [];
+    var first = Math.max(0, Math.floor(body.scrollTop / ROW_HEIGHT) - 10);
+    var last = Math.min(view.length, first + Math.ceil(body.clientHeight / ROW_HEIGHT) + 20);
+    while (body.childNodes.length > 1) body.removeChild(body.lastChild);
+    for (var p = first; p < last; p++) {
+      var r = rows[view[p]];
+      var line = el("div", "row");
+      line.style.gridTemplateColumns = template;
+      line.style.top = p * ROW_HEIGHT + "px";
+      for (var j = 0; j < cols.length; j++) {
+        var cell = el("div", cols[j].numeric ? "num" : "", fmt(r[j]));
+        cell.title = cell.textContent;
+        line.appendChild(cell);
+      }
+      body.appendChild(line);
+    }
+  }
+
+  body.onscroll = paint;
+  refresh();
+  loadChunks(table, refresh);
+}
+
+loadScript("data/manifest.js", function () {
+  document.getElementById("main").textContent = "Indice nao encontrado (data/manifest.js).";
+});
+</script>
+</body>
+</html>
+"""
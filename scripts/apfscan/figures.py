@@ -0,0 +1,286 @@
+"""Index of the APF figures quoted across the documents, and their conflicts.
+
+The same totals are repeated in ``docs/*.md``, ``README.md`` and in string
+literals of the report scripts. Every line of those files goes once through
+a table of :data:`RULES`; each hit becomes a :class:`Figure` with a key such
+as ``contagem.pf_nao_ajustado`` or ``reconciliada.ee_qty``. The scope prefix
+separates the detailed count (one ALI per table) from the reconciliation
+with grouped ALIs: a line is ``reconciliada`` when it or the line above
+says so, when it sits under a "Reconciliada" heading, or when the rule only
+exists in the reconciliation tables.
+
+:func:`check` then reports keys quoted with different values, per-scope
+arithmetic (type totals vs. the unadjusted total, unadjusted x VAF vs. the
+adjusted total) and Markdown tables whose ``Total`` row is not the sum of
+the rows above it.
+"""
+from __future__ import annotations
+
+import re
+from collections import Counter, defaultdict
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+
+CONTAGEM = "contagem"
+RECONCILIADA = "reconciliada"
+TIPOS = ("ali", "aie", "ee", "ce", "se")
+
+_LINE_RECONCILED = re.compile(r"reconcilia|agrupad[oa]s?\b|agrupamento correto|IFPUG correto|corrigindo", re.I)
+_HEADING_RECONCILED = re.compile(r"reconcilia", re.I)
+_HEADING = re.compile(r"^(#{1,6})\s+(.*)")
+_TOTAL_ROW = re.compile(r"total\b", re.I)
+_NUMBER = r"\d{1,3}(?:\.\d{3})+(?:,\d+)?|\d+(?:,\d+)?"
+_TIPO = r"(?P<tipo>ALI|AIE|EE|CE|SE)"
+
+
+@dataclass(frozen=True)
+class Rule:
+    pattern: re.Pattern[str]
+    scope: str | None = None  # forced scope
+    each: bool = False  # every match on the line, not just the first
+    when: re.Pattern[str] | None = None  # only on lines matching this
+    decimal: bool = False  # "1.16" and "1,16" both mean 1.16
+
+
+def _rule(pattern: str, **kwargs: object) -> Rule:
+    return Rule(re.compile(pattern.replace("NUM", _NUMBER).replace("TIPO", _TIPO), re.I), **kwargs)  # type: ignore[arg-type]
+
+
+# Group names are figure labels; with a ``tipo`` group they become ``<tipo>_<name>``.
+RULES: tuple[Rule, ...] = (
+    # totals
+    _rule(r"TOTAL N[AÃ]O AJUSTADO\**\s*\|\s*\**(?P<funcoes>NUM)\**\s*\|\s*\**(?P<pf_nao_ajustado>NUM) PF"),
+    _rule(r"(?P<pf_nao_ajustado>NUM) PF n[aã]o ajustados"),
+    _rule(r"Pontos de Fun[cç][aã]o N[aã]o Ajustados\**\s*\|\s*\**(?P<pf_nao_ajustado>NUM)"),
+    _rule(r"^\|\s*\*\*PF N[aã]o Ajustados\*\*\s*\|[^|]*\|\s*\**(?P<pf_nao_ajustado>NUM)", scope=RECONCILIADA),
+    _rule(r"PF Ajustado = (?P<pf_nao_ajustado>NUM) [×x*]"),
+    _rule(r"\((?P<pf_ajustado>NUM) (?:PF )?ajustados"),
+    _rule(r"(?P<pf_ajustado>NUM) PF ajustados"),
+    _rule(r"TOTAL AJUSTADO:?\**\s*(?P<pf_ajustado>NUM) PF"),
+    _rule(r"Pontos de Fun[cç][aã]o Ajustados\**\s*\|\s*\**(?P<pf_ajustado>NUM)"),
+    _rule(r"(?:≈|[×x*] [\d,.]+ =) (?P<pf_ajustado>NUM) PF"),
+    _rule(r"^\|\s*PF Ajustados\s*\|\s*(?P<pf_ajustado>NUM)\s*\|"),
+    _rule(r"^\|\s*\*\*PF Ajustados\*\*\s*\|[^|]*\|\s*\**(?P<pf_ajustado>NUM)", scope=RECONCILIADA),
+    _rule(r"^\|\s*\*\*TOTAL\*\*\s*\|\s*\*\*\d+\*\*\s*\|\s*\*\*(?P<pf_ajustado>NUM) PF\*\*"),  # README
+    _rule(r"\bVAF\b[:\s=*]*(?P<vaf>\d[.,]\d+)\b(?!\s*[+×*])", decimal=True),  # not "VAF = 0,51 + 0,65"
+    _rule(r"Total de Fun[cç][oõ]es Identificadas\**\s*\|\s*(?P<funcoes>\d+)"),
+    # per function type
+    _rule(r"^\|\s*\**TIPO\**(?:\s*\([^)|]*\))?\s*\|\s*(?P<qty>\d+)\s*\|\s*(?P<pf>NUM)\s*\|$"),
+    _rule(r"^\|\s*\*\*TOTAL TIPOs?\*\*\s*\|\s*\*\*(?P<qty>\d+)\*\*\s*\|(?:\s*\|)*\s*\*\*(?P<pf>NUM)\*\*"),
+    _rule(r"^\|\s*\|\s*\*\*TOTAL TIPOs?\*\*\s*(?:\|\s*)+\*\*(?P<pf>NUM)\*\*\s*\|$"),
+    _rule(r"(?P<qty>\d+) TIPO\b", each=True, when=re.compile(r"Total de Fun[cç][oõ]es (?:de Dados|Transacionais)", re.I)),
+    _rule(r"^\|\s*TIPOs? contados\s*\|[^|]*\|\s*(?P<qty>\d+)\s*\|", scope=RECONCILIADA),
+    _rule(r"= (?P<qty>\d+) TIPOs = (?P<pf>NUM) PF"),
+    # code evidence
+    _rule(r"^\|\s*\**Entidades(?: de dom[ií]nio)?\**(?: \([^|]*\))?\s*\|\s*(?P<entidades>\d+)\s*\|"),
+    _rule(r"^\|\s*\**Controllers\**(?: \(total\))?\s*\|\s*(?P<controllers>\d+)\b"),
+    _rule(r"^\|\s*\**Services\**\s*\|\s*(?P<services>\d+)\b"),
+    _rule(r"Endpoints API[^|]*\|\s*(?P<endpoints>\d+)\s*\|"),
+    _rule(r"(?P<endpoints>\d+) endpoints (?:REAIS|reais|na API)"),
+)
+
+
+@dataclass(frozen=True)
+class Figure:
+    key: str
+    value: float
+    text: str
+    path: str
+    line: int
+
+
+@dataclass(frozen=True)
+class Inconsistency:
+    kind: str  # "divergente", "soma", "vaf", "tabela"
+    key: str
+    message: str
+    figures: tuple[Figure, ...] = ()
+
+
+@dataclass
+class FigureIndex:
+    figures: list[Figure] = field(default_factory=list)
+    tables: list[Inconsistency] = field(default_factory=list)
+    files: int = 0
+
+    def by_key(self) -> dict[str, list[Figure]]:
+        grouped: dict[str, list[Figure]] = defaultdict(list)
+        for f in self.figures:
+            grouped[f.key].append(f)
+        return dict(grouped)
+
+
+def parse_number(text: str, decimal: bool = False) -> float:
+    """Brazilian notation: ``2.474`` -> 2474, ``2.869,84`` -> 2869.84 (``decimal``: ``1.16`` -> 1.16)."""
+    if decimal:
+        return float(text.replace(",", "."))
+    return float(text.replace(".", "").replace(",", "."))
+
+
+def _cell_number(cell: str) -> float | None:
+    cell = cell.strip().strip("*").strip()
+    cell = re.sub(r"\s*PF$", "", cell)
+    if cell in ("", "-", "—", "0"):
+        return 0.0 if cell == "0" else None
+    if re.fullmatch(_NUMBER, cell):
+        return parse_number(cell)
+    return None
+
+
+class _TableState:
+    """Running column sums of the Markdown table being read."""
+
+    def __init__(self) -> None:
+        self.sums: list[float] = []
+        self.numeric: list[int] = []
+        self.rows = 0
+        self.closed = False
+
+    def feed(self, cells: list[str], path: str, line: int) -> Inconsistency | None:
+        if self.closed:
+            return None
+        # The label is the first cell, or the second when the first is a blank "#" column.
+        first = 1 if len(cells) > 1 and not cells[0].strip() else 0
+        label = cells[first].strip().strip("*").strip()
+        values = [_cell_number(c) for c in cells]
+        if not _TOTAL_ROW.match(label):
+            if len(self.sums) < len(values):
+                self.sums += [0.0] * (len(values) - len(self.sums))
+                self.numeric += [0] * (len(values) - len(self.numeric))
+            for i, v in enumerate(values):
+                if v is not None:
+                    self.sums[i] += v
+                    self.numeric[i] += 1
+            self.rows += 1
+            return None
+        self.closed = True
+        wrong = []
+        for i, v in enumerate(values[first + 1 :], start=first + 1):
+            # Only columns numeric in every body row are additive.
+            if v is None or i >= len(self.sums) or self.numeric[i] != self.rows or self.rows < 2:
+                continue
+            if abs(self.sums[i] - v) > 0.5:
+                wrong.append(f"coluna {i + 1}: total {v:g}, soma das linhas {self.sums[i]:g}")
+        if not wrong:
+            return None
+        return Inconsistency("tabela", f"{path}:{line}", f"Linha '{label}': " + "; ".join(wrong))
+
+
+def _split_row(line: str) -> list[str]:
+    return line.strip().strip("|").split("|")
+
+
+def scan_lines(lines: Iterable[str], path: str, index: FigureIndex) -> None:
+    headings: list[tuple[int, str]] = []
+    previous = ""
+    table: _TableState | None = None
+    markdown = path.endswith(".md")
+    for number, line in enumerate(lines, 1):
+        line = line.rstrip("\n")
+        if markdown:
+            h = _HEADING.match(line)
+            if h:
+                level = len(h.group(1))
+                headings = [(lv, t) for lv, t in headings if lv < level] + [(level, h.group(2))]
+            stripped = line.strip()
+            if stripped.startswith("|"):
+                if re.fullmatch(r"\|[\s:|-]+\|?", stripped):
+                    table = _TableState()
+                elif table is not None:
+                    problem = table.feed(_split_row(stripped), path, number)
+                    if problem is not None:
+                        index.tables.append(problem)
+            else:
+                table = None
+
+        reconciled = bool(_LINE_RECONCILED.search(line) or _LINE_RECONCILED.search(previous)) or any(
+            _HEADING_RECONCILED.search(t) for _, t in headings
+        )
+        for rule in RULES:
+            if rule.when is not None and not rule.when.search(line):
+                continue
+            matches: Iterator[re.Match[str]] = rule.pattern.finditer(line) if rule.each else iter(
+                [m] if (m := rule.pattern.search(line)) else []
+            )
+            for m in matches:
+                scope = rule.scope or (RECONCILIADA if reconciled else CONTAGEM)
+                groups = m.groupdict()
+                tipo = (groups.pop("tipo", None) or "").lower()
+                for name, text in groups.items():
+                    if text is None:
+                        continue
+                    label = f"{tipo}_{name}" if tipo else name
+                    index.figures.append(
+                        Figure(f"{scope}.{label}", parse_number(text, rule.decimal), text, path, number)
+                    )
+        previous = line
+
+
+def document_paths(root: Path) -> list[Path]:
+    docs = sorted((root / "docs").glob("*.md"))
+    scripts = sorted((root / "scripts").glob("*.py"))
+    readme = root / "README.md"
+    return ([readme] if readme.exists() else []) + docs + scripts
+
+
+def build_index(root: Path, paths: Iterable[Path] | None = None) -> FigureIndex:
+    index = FigureIndex()
+    for path in paths if paths is not None else document_paths(root):
+        rel = path.relative_to(root).as_posix()
+        with open(path, encoding="utf-8", errors="replace") as f:
+            scan_lines(f, rel, index)
+        index.files += 1
+    return index
+
+
+def _consensus(figures: list[Figure]) -> float:
+    return Counter(f.value for f in figures).most_common(1)[0][0]
+
+
+def check(index: FigureIndex) -> list[Inconsistency]:
+    problems: list[Inconsistency] = []
+    grouped = index.by_key()
+    for key in sorted(grouped):
+        figs = grouped[key]
+        values = Counter(f.value for f in figs)
+        if len(values) > 1:
+            parts = ", ".join(
+                f"{value:g} ({n}x)" for value, n in values.most_common()
+            )
+            problems.append(Inconsistency("divergente", key, f"Valores diferentes: {parts}", tuple(figs)))
+
+    for scope in (CONTAGEM, RECONCILIADA):
+        def value(label: str) -> float | None:
+            figs = grouped.get(f"{scope}.{label}")
+            return _consensus(figs) if figs else None
+
+        for part, total in (("pf", "pf_nao_ajustado"), ("qty", "funcoes")):
+            parts = [value(f"{tipo}_{part}") for tipo in TIPOS]
+            expected = value(total)
+            if expected is not None and all(p is not None for p in parts):
+                soma = sum(parts)  # type: ignore[arg-type]
+                if abs(soma - expected) > 0.5:
+                    detail = " + ".join(f"{p:g}" for p in parts)  # type: ignore[str-format]
+                    problems.append(
+                        Inconsistency(
+                            "soma",
+                            f"{scope}.{total}",
+                            f"ALI+AIE+EE+CE+SE = {detail} = {soma:g}, documentado {expected:g}",
+                            tuple(grouped[f"{scope}.{total}"]),
+                        )
+                    )
+        bruto, vaf, ajustado = value("pf_nao_ajustado"), value("vaf"), value("pf_ajustado")
+        if vaf is None and scope == RECONCILIADA:
+            figs = grouped.get(f"{CONTAGEM}.vaf")  # the reconciliation reuses the detailed VAF
+            vaf = _consensus(figs) if figs else None
+        if bruto is not None and vaf is not None and ajustado is not None and round(bruto * vaf) != ajustado:
+            problems.append(
+                Inconsistency(
+                    "vaf",
+                    f"{scope}.pf_ajustado",
+                    f"{bruto:g} x {vaf:g} = {bruto * vaf:.2f}, documentado {ajustado:g}",
+                    tuple(grouped[f"{scope}.pf_ajustado"]),
+                )
+            )
+    return problems + index.tables
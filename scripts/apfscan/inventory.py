@@ -0,0 +1,74 @@
+"""Function inventory of the migrated system, one row per counted function.
+
+Data functions: an ALI per EF table (DET/RET from the model snapshot) and
+the AIEs listed in ``docs/contagem-apf.md`` section 4. Transactions: one per
+controller action, typed and weighted by :class:`~apfscan.dtos.DtoIndex`,
+optionally with the FTR of the dependency graph (:mod:`apfscan.depgraph`).
+Rows are generated lazily in the order the Deltapoint sheet lists them
+(ALI, AIE, EE, CE, SE) and carry precomputed PF values.
+"""
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+
+from .deltapoint import FunctionValues, ctl_code
+from .depgraph import action_reach
+from .dtos import TRANSACTION_WEIGHTS, DtoIndex, transaction_complexity
+from .efmodel import ALI_WEIGHTS, EfModel, ali_complexity
+
+TIPOS = ("ALI", "AIE", "EE", "CE", "SE")
+
+_AIE_SECTION = re.compile(r"^## \d+\. Arquivos de Interface Externa", re.M)
+_AIE_ROW = re.compile(r"^\|\s*\d+\s*\|\s*([^|]+?)\s*\|[^|]*\|\s*([^|]+?)\s*\|\s*(\d+)\s*\|$", re.M)
+_LEVELS = {"simples": "Baixa", "baixa": "Baixa", "media": "Media", "média": "Media", "complexa": "Alta", "alta": "Alta"}
+
+
+@dataclass(frozen=True)
+class AieRow:
+    nome: str
+    complexidade: str
+    pf: int
+
+
+def parse_aie_rows(md_text: str) -> list[AieRow]:
+    """AIE table of ``contagem-apf.md`` (``| # | AIE | Descricao | Complexidade | PF |``)."""
+    m = _AIE_SECTION.search(md_text)
+    if m is None:
+        return []
+    end = md_text.find("\n## ", m.end())
+    section = md_text[m.end() : end if end >= 0 else len(md_text)]
+    return [
+        AieRow(nome.strip(), _LEVELS.get(level.strip().lower(), "Baixa"), int(pf))
+        for nome, level, pf in _AIE_ROW.findall(section)
+    ]
+
+
+def function_rows(
+    model: EfModel,
+    dtos: DtoIndex,
+    aies: Iterable[AieRow] = (),
+    *,
+    ftr_from_graph: bool = False,
+) -> Iterator[FunctionValues]:
+    for entity in sorted(model.tables(), key=lambda e: (e.module, e.short_name)):
+        level = ali_complexity(model.det(entity), model.ret(entity))
+        pf = float(ALI_WEIGHTS[level])
+        yield f"{entity.module} - {entity.short_name}", "ALI", ctl_code("ALI", level), pf, pf
+
+    for aie in aies:
+        pf = float(aie.pf)
+        yield aie.nome, "AIE", ctl_code("AIE", aie.complexidade), pf, pf
+
+    reach = {(r.controller, r.action): r.ftr for r in action_reach(dtos.index, model)} if ftr_from_graph else {}
+    by_tipo: dict[str, list[FunctionValues]] = {tipo: [] for tipo in TIPOS[2:]}
+    for m in dtos.action_metrics():
+        level, pf = m.complexidade, float(m.pf)
+        if ftr_from_graph:
+            level = transaction_complexity(m.tipo, m.det, reach[(m.controller, m.action)])
+            pf = float(TRANSACTION_WEIGHTS[m.tipo][level])
+        name = f"{m.controller.removesuffix('Controller')} - {m.verb} {m.action}"
+        by_tipo[m.tipo].append((name, m.tipo, ctl_code(m.tipo, level), pf, pf))
+    for tipo in TIPOS[2:]:
+        yield from by_tipo[tipo]
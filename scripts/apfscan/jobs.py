@@ -0,0 +1,246 @@
+"""Resumable batch jobs: per-item checkpoints, progress/ETA and budgets.
+
+A job is a list of item keys (a file as ``path:size:mtime_ns``, a commit as
+its SHA) and a function that turns one key into a JSON-serializable
+result. :func:`run_job` appends each result to a JSONL checkpoint as soon
+as it is computed; the first line records the job fingerprint (kind and
+parameters), so a checkpoint is only resumed by the same job. A torn last
+line, left by a kill in the middle of a write, is dropped on load. The file
+is fsynced every few seconds, so a preempted run loses at most that window.
+
+A run stops cleanly (checkpoint flushed, status ``complete=False``) when
+its time or item budget is spent or on SIGTERM/SIGINT; the next run with
+the same parameters skips every key already in the checkpoint. Results
+for keys a run does not ask for are kept (a commit range resumed in
+segments), unless a wanted key supersedes them: keys with the same
+``identity`` (the path of a file key) stand for older versions of an item.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import signal
+import sys
+import time
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any
+
+DEFAULT_JOBS_DIR = Path("output/cache/jobs")
+
+
+@dataclass(frozen=True)
+class Budget:
+    seconds: float | None = None
+    items: int | None = None
+
+
+@dataclass
+class JobStatus:
+    total: int
+    resumed: int  # items taken from the checkpoint
+    processed: int = 0  # items computed in this run
+    seconds: float = 0.0
+    stopped: str | None = None  # "tempo", "itens", "sinal"
+
+    @property
+    def done(self) -> int:
+        return self.resumed + self.processed
+
+    @property
+    def complete(self) -> bool:
+        return self.done >= self.total
+
+
+class Checkpoint:
+    """Append-only JSONL of finished items under a job fingerprint."""
+
+    def __init__(self, path: Path, fingerprint: str, sync_seconds: float = 2.0) -> None:
+        self.path = path
+        self.fingerprint = fingerprint
+        self.sync_seconds = sync_seconds
+        self._fh: IO[str] | None = None
+        self._synced = time.monotonic()
+
+    def load(self) -> dict[str, Any]:
+        if not self.path.exists():
+            return {}
+        results: dict[str, Any] = {}
+        with self.path.open(encoding="utf-8") as fh:
+            try:
+                header = json.loads(fh.readline())
+            except ValueError:
+                return {}
+            if header.get("job") != self.fingerprint:
+                return {}
+            for line in fh:
+                try:
+                    item = json.loads(line)
+                except ValueError:
+                    break  # torn write: everything after it is lost anyway
+                results[item["key"]] = item["result"]
+        return results
+
+    def open(self, kept: dict[str, Any]) -> None:
+        """Start appending after ``kept`` (the loaded results not superseded).
+
+        Unless the file holds exactly the header and ``kept``, it is first
+        rewritten atomically with them: that drops a torn tail (appending
+        after it would hide every later result from the next load), another
+        job's header, and superseded keys of files that have since changed,
+        so the checkpoint does not grow with every edit.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if not self._appendable(len(kept)):
+            tmp = self.path.with_suffix(".tmp")
+            with tmp.open("w", encoding="utf-8") as out:
+                out.write(json.dumps({"job": self.fingerprint}) + "\n")
+                for key, result in kept.items():
+                    out.write(json.dumps({"key": key, "result": result}, ensure_ascii=False) + "\n")
+            os.replace(tmp, self.path)
+        self._fh = self.path.open("a", encoding="utf-8")
+        self._sync(force=True)
+
+    def _appendable(self, items: int) -> bool:
+        try:
+            with self.path.open("rb") as fh:
+                lines = fh.read().split(b"\n")
+        except OSError:
+            return False
+        try:
+            header = json.loads(lines[0])
+        except ValueError:
+            return False
+        # header + items + the empty string after the final newline
+        return len(lines) == items + 2 and lines[-1] == b"" and header.get("job") == self.fingerprint
+
+    def append(self, key: str, result: Any) -> None:
+        assert self._fh is not None
+        self._fh.write(json.dumps({"key": key, "result": result}, ensure_ascii=False) + "\n")
+        self._sync()
+
+    def _sync(self, force: bool = False) -> None:
+        assert self._fh is not None
+        self._fh.flush()
+        now = time.monotonic()
+        if force or now - self._synced >= self.sync_seconds:
+            os.fsync(self._fh.fileno())
+            self._synced = now
+
+    def close(self) -> None:
+        if self._fh is not None:
+            self._sync(force=True)
+            self._fh.close()
+            self._fh = None
+
+    def reset(self) -> None:
+        self.close()
+        self.path.unlink(missing_ok=True)
+
+
+def job_checkpoint(root: Path, job: str, params: dict[str, Any], jobs_dir: Path = DEFAULT_JOBS_DIR) -> Checkpoint:
+    """Checkpoint of ``job`` under ``jobs_dir``; different ``params`` get different files."""
+    fingerprint = hashlib.sha256(json.dumps({"job": job, **params}, sort_keys=True).encode()).hexdigest()
+    directory = jobs_dir if jobs_dir.is_absolute() else root / jobs_dir
+    return Checkpoint(directory / f"{job}-{fingerprint[:12]}.jsonl", fingerprint)
+
+
+class Progress:
+    """Throttled ``done/total, items/s, ETA`` lines on stderr."""
+
+    def __init__(self, label: str, total: int, done: int, interval: float = 2.0, stream: IO[str] | None = None) -> None:
+        self.label = label
+        self.total = total
+        self.start_done = done
+        self.interval = interval
+        self.stream = stream or sys.stderr
+        self.start = self._last = time.monotonic()
+
+    def line(self, done: int) -> str:
+        elapsed = time.monotonic() - self.start
+        rate = (done - self.start_done) / elapsed if elapsed > 0 else 0.0
+        remaining = self.total - done
+        eta = f"{remaining / rate:.0f} s" if rate > 0 else "-"
+        pct = 100.0 * done / self.total if self.total else 100.0
+        return f"{self.label}: {done}/{self.total} ({pct:.0f}%), {rate:.1f}/s, ETA {eta}"
+
+    def update(self, done: int) -> None:
+        now = time.monotonic()
+        if now - self._last >= self.interval:
+            self._last = now
+            print(self.line(done), file=self.stream, flush=True)
+
+    def finish(self, done: int) -> None:
+        print(self.line(done), file=self.stream, flush=True)
+
+
+@contextmanager
+def _stop_on_signals(flag: list[str]) -> Iterator[None]:
+    """SIGTERM/SIGINT end the run after the current item instead of killing it."""
+
+    def handler(signum: int, frame: object) -> None:
+        flag.append("sinal")
+
+    previous = {}
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            previous[sig] = signal.signal(sig, handler)
+        except ValueError:  # not the main thread
+            pass
+    try:
+        yield
+    finally:
+        for sig, old in previous.items():
+            signal.signal(sig, old)
+
+
+def run_job(
+    checkpoint: Checkpoint,
+    keys: Sequence[str],
+    work: Callable[[str], Any],
+    *,
+    budget: Budget = Budget(),
+    label: str = "itens",
+    progress_interval: float = 2.0,
+    identity: Callable[[str], str] | None = None,
+) -> tuple[dict[str, Any], JobStatus]:
+    """Compute ``work(key)`` for every key not in the checkpoint; return all results in key order.
+
+    ``identity`` maps a key to the item it versions; saved keys whose item
+    is wanted under another key are dropped from the checkpoint.
+    """
+    saved = checkpoint.load()
+    wanted = set(keys)
+    resumed = {k: v for k, v in saved.items() if k in wanted}
+    items = {identity(k) for k in wanted} if identity else set()
+    kept = {k: v for k, v in saved.items() if k in wanted or identity is None or identity(k) not in items}
+    status = JobStatus(total=len(keys), resumed=len(resumed))
+    results = dict(resumed)
+    progress = Progress(label, len(keys), status.done, progress_interval)
+    start = time.monotonic()
+    stop: list[str] = []
+    checkpoint.open(kept)
+    try:
+        with _stop_on_signals(stop):
+            for key in keys:
+                if key in results:
+                    continue
+                if budget.seconds is not None and time.monotonic() - start >= budget.seconds:
+                    stop.append("tempo")
+                if budget.items is not None and status.processed >= budget.items:
+                    stop.append("itens")
+                if stop:
+                    break
+                results[key] = work(key)
+                checkpoint.append(key, results[key])
+                status.processed += 1
+                progress.update(status.done)
+    finally:
+        checkpoint.close()
+    status.seconds = time.monotonic() - start
+    status.stopped = stop[0] if stop else None
+    progress.finish(status.done)
+    return {k: results[k] for k in keys if k in results}, status
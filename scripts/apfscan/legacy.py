@@ -0,0 +1,367 @@
+"""Legacy Lumen/Doctrine backend: entities and routes, compared with the migrated model.
+
+Entities come from the Doctrine annotations in ``app/Entities/*.php``
+(``@ORM\\Entity``/``@ORM\\Table`` on the class, ``@ORM\\Column`` and
+``@ORM\\ManyToOne``/``OneToOne``/``OneToMany``/``ManyToMany`` on the
+properties); routes from ``app()->router->get(...)`` calls in ``routes/*.php``
+with their ``group(['prefix' => ...])`` nesting. Each file is read once,
+line by line: annotations accumulate while a docblock is open and are
+attached to the next property or class declaration.
+
+Legacy and migrated entities are joined on a hashed, name-normalized key:
+camel-case words, accents stripped, Portuguese plurals singularized and
+word order ignored, so ``ContrarrazoesRecursoDenuncia`` meets
+``ContrarrazaoRecursoDenuncia`` and ``DenunciaAdmissibilidade`` meets
+``AdmissibilidadeDenuncia``.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .efmodel import ALI_WEIGHTS, EfModel, ali_complexity
+from .walk import walk_files
+
+LEGACY_ROOT = Path("docs") / "Sistema legado" / "Eleitoral-Backend"
+ENTITIES_DIR = LEGACY_ROOT / "app" / "Entities"
+ROUTES_DIR = LEGACY_ROOT / "routes"
+UNMATCHED_MODULE = "(sem correspondente)"
+
+_ORM = re.compile(r"@ORM\\(\w+)(?:\((.*)\))?")
+_ATTR = re.compile(r'(\w+)\s*=\s*"([^"]*)"')
+_CASCADE = re.compile(r'\bcascade\s*=\s*\{([^}]*)\}')
+_ORPHAN_REMOVAL = re.compile(r'\borphanRemoval\s*=\s*true\b', re.IGNORECASE)
+_PROPERTY = re.compile(r"^\s*(?:private|protected|public)\s+(?:static\s+)?(?:\??[\w\\]+\s+)?\$(\w+)")
+_CLASS = re.compile(r"^\s*(?:abstract\s+|final\s+)?class\s+(\w+)")
+_ROUTE = re.compile(r"\brouter->(get|post|put|patch|delete|options)\(")
+_LITERAL = re.compile(r"""['"]([^'"]*)['"]""")
+_USES = re.compile(r"""['"](\w+)@(\w+)['"]""")
+_GROUP = re.compile(r"\brouter->group\(")
+_PREFIX = re.compile(r"""['"]prefix['"]\s*=>\s*['"]([^'"]*)['"]""")
+_STRING = re.compile(r""""(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'""")
+ASSOCIATIONS = ("ManyToOne", "OneToOne", "OneToMany", "ManyToMany")
+
+_PLURALS = (("oes", "ao"), ("aes", "ao"), ("ais", "al"), ("eis", "el"), ("ns", "m"), ("res", "r"), ("zes", "z"), ("s", ""))
+_STOPWORDS = frozenset({"entity", "de", "da", "do", "das", "dos", "e", "tb"})
+
+
+@dataclass(frozen=True)
+class LegacyColumn:
+    property: str
+    column: str
+    type: str
+    id: bool = False
+
+
+@dataclass(frozen=True)
+class LegacyAssociation:
+    kind: str
+    property: str
+    target: str
+    join_column: str | None
+    cascade: tuple[str, ...] = ()
+    orphan_removal: bool = False
+
+    @property
+    def dependent(self) -> bool:
+        """A child collection whose rows are removed with the owner (a RET of the owner)."""
+        return self.kind == "OneToMany" and (
+            self.orphan_removal or "remove" in self.cascade or "all" in self.cascade
+        )
+
+
+@dataclass
+class LegacyEntity:
+    name: str
+    path: str
+    table: str | None = None
+    schema: str | None = None
+    columns: list[LegacyColumn] = field(default_factory=list)
+    associations: list[LegacyAssociation] = field(default_factory=list)
+
+    @property
+    def det(self) -> int:
+        """Non-key columns plus owning-side foreign keys (``JoinColumn``)."""
+        fks = sum(1 for a in self.associations if a.join_column)
+        return max(sum(1 for c in self.columns if not c.id) + fks, 1)
+
+    @property
+    def ret(self) -> int:
+        """The entity itself plus each dependent child collection, as in :meth:`EfModel.ret`."""
+        return 1 + sum(1 for a in self.associations if a.dependent)
+
+    @property
+    def pf(self) -> int:
+        return ALI_WEIGHTS[ali_complexity(self.det, self.ret)]
+
+
+@dataclass(frozen=True)
+class LegacyRoute:
+    method: str
+    path: str
+    controller: str | None
+    action: str | None
+    file: str
+    line: int
+
+
+def name_words(name: str) -> tuple[str, ...]:
+    """Order-independent, singular, accent-free words of an entity or table name."""
+    ascii_name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    if ascii_name.isupper() or "_" in ascii_name:
+        raw = ascii_name.lower().split("_")
+    else:
+        raw = re.findall(r"[A-Z]+(?=[A-Z][a-z]|\b|\d)|[A-Z]?[a-z]+|\d+", ascii_name)
+    words = []
+    for word in raw:
+        word = word.lower()
+        if not word or word in _STOPWORDS:
+            continue
+        for suffix, replacement in _PLURALS:
+            if word.endswith(suffix) and len(word) > len(suffix) + 2:
+                word = word[: -len(suffix)] + replacement
+                break
+        words.append(word)
+    return tuple(sorted(words))
+
+
+def name_key(name: str) -> int:
+    return int.from_bytes(hashlib.blake2b(" ".join(name_words(name)).encode(), digest_size=8).digest(), "little")
+
+
+def _attrs(args: str) -> dict[str, str]:
+    """Quoted annotation attributes, plus ``cascade={...}`` and ``orphanRemoval=true``."""
+    attrs = dict(_ATTR.findall(args))
+    cascade = _CASCADE.search(args)
+    if cascade:
+        attrs["cascade"] = ",".join(_LITERAL.findall(cascade.group(1)))
+    if _ORPHAN_REMOVAL.search(args):
+        attrs["orphanRemoval"] = "true"
+    return attrs
+
+
+def _lines(path: Path) -> Iterator[str]:
+    with open(path, encoding="utf-8", errors="replace") as f:
+        yield from f
+
+
+def parse_entity(lines: Iterable[str], path: str = "") -> LegacyEntity | None:
+    """One Doctrine entity from its source lines; ``None`` without ``@ORM\\Entity``."""
+    entity: LegacyEntity | None = None
+    class_annotations: list[tuple[str, dict[str, str]]] = []
+    pending: list[tuple[str, dict[str, str]]] = []
+    in_doc = False
+    for line in lines:
+        stripped = line.strip()
+        if stripped.startswith("/**"):
+            in_doc, pending = True, []
+        if in_doc:
+            for m in _ORM.finditer(stripped):
+                pending.append((m.group(1), _attrs(m.group(2) or "")))
+            if "*/" in stripped:
+                in_doc = False
+            continue
+        if entity is None:
+            m = _CLASS.match(line)
+            if m:
+                class_annotations = pending
+                if not any(kind == "Entity" for kind, _ in class_annotations):
+                    return None
+                entity = LegacyEntity(name=m.group(1), path=path)
+                for kind, attrs in class_annotations:
+                    if kind == "Table":
+                        entity.table = attrs.get("name")
+                        entity.schema = attrs.get("schema")
+                pending = []
+            continue
+        m = _PROPERTY.match(line)
+        if m and pending:
+            prop = m.group(1)
+            kinds = {kind: attrs for kind, attrs in pending}
+            if "Column" in kinds:
+                attrs = kinds["Column"]
+                entity.columns.append(LegacyColumn(prop, attrs.get("name", prop), attrs.get("type", ""), "Id" in kinds))
+            for kind in ASSOCIATIONS:
+                if kind in kinds:
+                    attrs = kinds[kind]
+                    target = attrs.get("targetEntity", "").rsplit("\\", 1)[-1]
+                    join = kinds.get("JoinColumn", {}).get("name")
+                    cascade = tuple(c for c in attrs.get("cascade", "").split(",") if c)
+                    entity.associations.append(
+                        LegacyAssociation(kind, prop, target, join, cascade, attrs.get("orphanRemoval") == "true")
+                    )
+            pending = []
+        elif stripped.startswith(("public function", "public static function", "function")):
+            pending = []
+    return entity
+
+
+def parse_routes(lines: Iterable[str], file: str = "") -> list[LegacyRoute]:
+    """Routes of a Lumen routes file, with ``group`` prefixes applied."""
+    routes: list[LegacyRoute] = []
+    depth = 0
+    groups: list[tuple[int, str]] = []  # (depth inside the group closure, prefix)
+    open_route: tuple[str, str | None, int] | None = None
+    pending_prefix: str | None = None
+    for number, line in enumerate(lines, 1):
+        code = line.split("//", 1)[0] if "://" not in line else line
+        if _GROUP.search(code):
+            m = _PREFIX.search(code)
+            pending_prefix = m.group(1) if m else ""
+        rest = code
+        m = _ROUTE.search(rest)
+        if m:
+            open_route = (m.group(1).upper(), None, number)
+            rest = rest[m.end():]
+        if open_route is not None and open_route[1] is None:
+            # The path literal may sit on the line after ``router->get(``.
+            literal = _LITERAL.search(rest)
+            if literal:
+                open_route = (open_route[0], literal.group(1), open_route[2])
+                rest = rest[literal.end():]
+        if open_route is not None and open_route[1] is not None:
+            uses = _USES.search(rest)
+            if uses or ");" in rest:
+                method, raw, start = open_route
+                prefix = "/".join(p.strip("/") for _, p in groups if p)
+                full = "/" + "/".join(part for part in (prefix, raw.strip("/")) if part)
+                routes.append(
+                    LegacyRoute(method, full, uses.group(1) if uses else None, uses.group(2) if uses else None, file, start)
+                )
+                open_route = None
+        bare = _STRING.sub('""', code)
+        for ch in bare:
+            if ch == "{":
+                depth += 1
+                if pending_prefix is not None:
+                    groups.append((depth, pending_prefix))
+                    pending_prefix = None
+            elif ch == "}":
+                while groups and groups[-1][0] == depth:
+                    groups.pop()
+                depth -= 1
+    return routes
+
+
+@dataclass
+class LegacyScan:
+    entities: list[LegacyEntity] = field(default_factory=list)
+    routes: list[LegacyRoute] = field(default_factory=list)
+    files: int = 0
+
+
+def scan_legacy(root: Path) -> LegacyScan:
+    scan = LegacyScan()
+    for entry in walk_files(root / ENTITIES_DIR, (".php",)):
+        scan.files += 1
+        rel = Path(entry.path).relative_to(root).as_posix()
+        entity = parse_entity(_lines(Path(entry.path)), rel)
+        if entity is not None:
+            scan.entities.append(entity)
+    for entry in walk_files(root / ROUTES_DIR, (".php",)):
+        scan.files += 1
+        rel = Path(entry.path).relative_to(root).as_posix()
+        scan.routes.extend(parse_routes(_lines(Path(entry.path)), rel))
+    return scan
+
+
+@dataclass(frozen=True)
+class EntityMatch:
+    legacy: LegacyEntity | None
+    migrated: str | None  # EF short name
+    modulo: str
+    migrated_det: int = 0
+    migrated_pf: int = 0
+
+
+@dataclass
+class ModuleComparison:
+    modulo: str
+    migradas: int  # count_entities_by_module
+    modelo_ef: int
+    legado: int
+    correspondentes: int
+    pf_legado: int
+    pf_migrado: int
+
+
+@dataclass
+class AliComparison:
+    matches: list[EntityMatch]
+    modules: list[ModuleComparison]
+
+    @property
+    def matched(self) -> list[EntityMatch]:
+        return [m for m in self.matches if m.legacy is not None and m.migrated is not None]
+
+    @property
+    def legacy_only(self) -> list[EntityMatch]:
+        return [m for m in self.matches if m.migrated is None]
+
+    @property
+    def migrated_only(self) -> list[EntityMatch]:
+        return [m for m in self.matches if m.legacy is None]
+
+
+def compare_ali(
+    legacy: Iterable[LegacyEntity],
+    model: EfModel,
+    entity_by_module: Iterable[tuple[str, int]],
+) -> AliComparison:
+    """Join legacy entities to the EF model by name key (class name, then table name)."""
+    migrated: dict[int, tuple[str, str, int, int]] = {}
+    for entity in model.tables():
+        det = max(model.det(entity), 1)
+        ret = model.ret(entity)
+        row = (entity.short_name, entity.module, det, ALI_WEIGHTS[ali_complexity(det, ret)])
+        migrated.setdefault(name_key(entity.short_name), row)
+        if entity.table:
+            migrated.setdefault(name_key(entity.table), row)
+
+    matches: list[EntityMatch] = []
+    used: set[str] = set()
+    for item in sorted(legacy, key=lambda e: e.name):
+        found = None
+        for key in (name_key(item.name), name_key(item.table or "")):
+            candidate = migrated.get(key)
+            if candidate is not None and candidate[0] not in used:
+                found = candidate
+                break
+        if found is None:
+            matches.append(EntityMatch(item, None, UNMATCHED_MODULE))
+        else:
+            used.add(found[0])
+            matches.append(EntityMatch(item, found[0], found[1], found[2], found[3]))
+    for short, modulo, det, pf in sorted({row for row in migrated.values() if row[0] not in used}):
+        matches.append(EntityMatch(None, short, modulo, det, pf))
+
+    counted = dict(entity_by_module)
+    per_module: dict[str, Counter[str]] = defaultdict(Counter)
+    for m in matches:
+        c = per_module[m.modulo]
+        if m.migrated is not None:
+            c["modelo_ef"] += 1
+            c["pf_migrado"] += m.migrated_pf
+        if m.legacy is not None:
+            c["legado"] += 1
+            c["pf_legado"] += m.legacy.pf
+        if m.legacy is not None and m.migrated is not None:
+            c["correspondentes"] += 1
+    modules = [
+        ModuleComparison(
+            modulo=name,
+            migradas=counted.get(name, 0),
+            modelo_ef=c["modelo_ef"],
+            legado=c["legado"],
+            correspondentes=c["correspondentes"],
+            pf_legado=c["pf_legado"],
+            pf_migrado=c["pf_migrado"],
+        )
+        for name, c in sorted(per_module.items(), key=lambda kv: (kv[0] == UNMATCHED_MODULE, kv[0]))
+    ]
+    return AliComparison(matches=matches, modules=modules)
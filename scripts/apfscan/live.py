@@ -0,0 +1,265 @@
+"""Long-running recount: parsed sources kept in memory, served over HTTP/JSON.
+
+:class:`LiveSnapshot` holds the C# index, DTO metrics, EF model, frontend
+calls and React routes. :meth:`LiveSnapshot.apply` takes the changed paths
+reported by a watcher and re-does only the affected part: changed C# files
+are re-parsed through :meth:`CsIndex.refresh` (the DTO cache invalidates
+their dependents), the EF model only when the model snapshot or DbContext
+changes, the service calls and routes only when their app sources change.
+
+Every query answer is serialized once per refresh; a request is a dict
+lookup plus a socket write. Watching uses ``watchdog`` when installed and
+falls back to polling ``stat`` over the watched trees.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import asdict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from urllib.parse import unquote, urlsplit
+
+from .apicalls import SERVICE_DIRS, HttpCall, scan_calls
+from .csharp import API_ROOT, INDEX_EXCLUDES, CsIndex
+from .dtos import DtoIndex, load_dto_index
+from .efmodel import DBCONTEXT_PATH, SNAPSHOT_PATH, EfModel, load_ef_model
+from .pages import APPS, RoutePage, route_pages
+from .snapshot import ApfTotals, ApiCounts, CodeSnapshot, build_snapshot, count_api, parse_apf_totals
+from .walk import walk_files
+
+DOC_APF = Path("docs") / "contagem-apf.md"
+WATCHED = (
+    (API_ROOT, (".cs",)),
+    (SNAPSHOT_PATH.parent, (SNAPSHOT_PATH.name,)),  # Migrations/ is excluded from the API walk
+    *((Path("apps") / app / "src", (".ts", ".tsx", ".js", ".jsx")) for app in APPS),
+    (DOC_APF.parent, (DOC_APF.name,)),
+)
+_MODEL_FILES = frozenset({SNAPSHOT_PATH.as_posix(), DBCONTEXT_PATH.as_posix()})
+
+
+def _excluded(rel: str) -> bool:
+    return any(part in INDEX_EXCLUDES for part in Path(rel).parts[:-1])
+
+
+def _json(payload: Any) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class LiveSnapshot:
+    """Parsed source index plus pre-serialized query answers."""
+
+    def __init__(self, root: Path, cs_cache: Path | None = None) -> None:
+        self.root = root
+        self.ef_model: EfModel = load_ef_model(root)
+        self.dtos = load_dto_index(root, self._entity_names(), cs_cache)
+        self.index: CsIndex = self.dtos.index
+        self.api: ApiCounts = count_api(root)
+        self.calls: list[HttpCall] = scan_calls(root)
+        self.rotas: list[RoutePage] = route_pages(root)
+        self.totals: ApfTotals | None = self._load_totals()
+        self.snapshot: CodeSnapshot
+        self.responses: dict[str, bytes] = {}
+        self.refreshes = 0
+        self.refreshed_at = 0.0
+        self._lock = threading.Lock()
+        self._rebuild()
+
+    def _entity_names(self) -> list[str]:
+        return [e.short_name for e in self.ef_model.tables()]
+
+    def _load_totals(self) -> ApfTotals | None:
+        try:
+            return parse_apf_totals((self.root / DOC_APF).read_text(encoding="utf-8"))
+        except (OSError, RuntimeError, AttributeError):
+            return None
+
+    def apply(self, paths: Iterable[str]) -> bool:
+        """Refresh from changed repo-relative ``paths``; False when none matters."""
+        paths = set(paths)
+        api_prefix = API_ROOT.as_posix() + "/"
+        cs = {p for p in paths if p.startswith(api_prefix) and p.endswith(".cs")}
+        services = tuple(d.as_posix() + "/" for d in SERVICE_DIRS)
+        frontend = {p for p in paths if p.startswith("apps/") and not p.startswith(api_prefix)}
+        if not cs and not frontend and DOC_APF.as_posix() not in paths:
+            return False
+        with self._lock:
+            model_changed = bool(cs & _MODEL_FILES)
+            if model_changed:
+                self.ef_model = load_ef_model(self.root)
+            indexed = {p for p in cs if not _excluded(p)}
+            changed = self.index.refresh(indexed) if indexed else set()
+            if changed or model_changed:
+                self.dtos = DtoIndex(self.index, self._entity_names(), None if model_changed else changed)
+            if cs:
+                self.api = count_api(self.root)
+            if any(p.startswith(services) for p in frontend):
+                self.calls = scan_calls(self.root)
+            if frontend:
+                self.rotas = route_pages(self.root)
+            if DOC_APF.as_posix() in paths:
+                self.totals = self._load_totals()
+            self._rebuild()
+        return True
+
+    def _rebuild(self) -> None:
+        self.dtos.store()
+        s = build_snapshot(self.root, self.api, self.ef_model, self.dtos, self.calls, self.rotas)
+        self.snapshot = s
+        modules: dict[str, dict[str, Any]] = {m: {"modulo": m, "entidades": q} for m, q in s.entity_by_module}
+        for row in s.ali_by_module:
+            modules.setdefault(row.modulo, {"modulo": row.modulo, "entidades": 0})["ali"] = asdict(row)
+        for entity in self.ef_model.tables():
+            if entity.module in modules:
+                modules[entity.module].setdefault("tabelas", []).append(entity.short_name)
+
+        controllers: dict[str, dict[str, Any]] = {c: {"controller": c, "endpoints": q} for c, q in s.endpoints_by_controller}
+        for row in s.transacoes_by_controller:
+            controllers.setdefault(row.controller, {"controller": row.controller})["transacoes"] = asdict(row)
+        for row in s.uso_by_controller:
+            controllers.setdefault(row.controller, {"controller": row.controller})["uso"] = asdict(row)
+        for m in self.dtos.action_metrics():
+            controllers.setdefault(m.controller, {"controller": m.controller}).setdefault("acoes", []).append(asdict(m))
+
+        scalars = {k: v for k, v in asdict(s).items() if not isinstance(v, list)}
+        responses = {
+            "/snapshot": _json({"totals": asdict(self.totals) if self.totals else None, "snapshot": asdict(s)}),
+            "/summary": _json({"totals": asdict(self.totals) if self.totals else None, **scalars}),
+            "/modules": _json(sorted(modules)),
+            "/controllers": _json(sorted(controllers)),
+            "/routes": _json([asdict(r) for r in s.rotas]),
+        }
+        responses.update({f"/modules/{name}": _json(v) for name, v in modules.items()})
+        responses.update({f"/controllers/{name}": _json(v) for name, v in controllers.items()})
+        self.refreshes += 1
+        self.refreshed_at = time.time()
+        responses["/health"] = _json({"commit": s.commit, "refreshes": self.refreshes, "refreshed_at": self.refreshed_at})
+        self.responses = responses  # single assignment: readers never see a half-built table
+
+    def save(self) -> None:
+        with self._lock:
+            self.index.save()
+
+
+# -- watching ---------------------------------------------------------
+
+
+def _stat_tree(root: Path) -> dict[str, tuple[int, int]]:
+    seen: dict[str, tuple[int, int]] = {}
+    for rel_dir, suffixes in WATCHED:
+        for entry in walk_files(root / rel_dir, suffixes, exclude=INDEX_EXCLUDES):
+            st = entry.stat()
+            seen[Path(entry.path).relative_to(root).as_posix()] = (st.st_size, st.st_mtime_ns)
+    return seen
+
+
+class PollWatcher:
+    """``stat`` diff of the watched trees every ``interval`` seconds."""
+
+    def __init__(self, root: Path, interval: float = 1.0) -> None:
+        self.root = root
+        self.interval = interval
+        self._state = _stat_tree(root)
+
+    def changes(self) -> set[str]:
+        current = _stat_tree(self.root)
+        changed = {p for p, sig in current.items() if self._state.get(p) != sig}
+        changed |= set(self._state) - set(current)
+        self._state = current
+        return changed
+
+    def run(self, on_change: Callable[[set[str]], None], stop: threading.Event) -> None:
+        while not stop.wait(self.interval):
+            changed = self.changes()
+            if changed:
+                on_change(changed)
+
+
+class EventWatcher:
+    """``watchdog`` observer; events are batched for ``interval`` seconds."""
+
+    def __init__(self, root: Path, interval: float = 0.3) -> None:
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+
+        self.root = root
+        self.interval = interval
+        self._pending: set[str] = set()
+        self._guard = threading.Lock()
+        watcher = self
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event: Any) -> None:
+                if event.is_directory:
+                    return
+                for raw in (event.src_path, getattr(event, "dest_path", "")):
+                    if raw:
+                        watcher._add(raw)
+
+        self.observer = Observer()
+        for rel_dir, _ in WATCHED:
+            if (root / rel_dir).is_dir():
+                self.observer.schedule(Handler(), str(root / rel_dir), recursive=True)
+
+    def _add(self, raw: str) -> None:
+        try:
+            rel = Path(raw).relative_to(self.root).as_posix()
+        except ValueError:
+            return
+        if _excluded(rel) and rel not in _MODEL_FILES:
+            return
+        with self._guard:
+            self._pending.add(rel)
+
+    def run(self, on_change: Callable[[set[str]], None], stop: threading.Event) -> None:
+        self.observer.start()
+        try:
+            while not stop.wait(self.interval):
+                with self._guard:
+                    batch, self._pending = self._pending, set()
+                if batch:
+                    on_change(batch)
+        finally:
+            self.observer.stop()
+            self.observer.join()
+
+
+def make_watcher(root: Path, interval: float) -> PollWatcher | EventWatcher:
+    try:
+        return EventWatcher(root)
+    except ImportError:
+        return PollWatcher(root, interval)
+
+
+# -- HTTP ---------------------------------------------------------------
+
+
+def make_server(live: LiveSnapshot, host: str = "127.0.0.1", port: int = 8765) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        server_version = "apfscan-live"
+
+        def do_GET(self) -> None:  # noqa: N802 (http.server API)
+            path = unquote(urlsplit(self.path).path).rstrip("/") or "/snapshot"
+            body = live.responses.get(path)
+            if body is None:
+                self._send(HTTPStatus.NOT_FOUND, _json({"erro": f"Rota desconhecida: {path}"}))
+            else:
+                self._send(HTTPStatus.OK, body)
+
+        def _send(self, status: HTTPStatus, body: bytes) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            if os.environ.get("APF_LIVE_VERBOSE"):
+                super().log_message(format, *args)
+
+    return ThreadingHTTPServer((host, port), Handler)
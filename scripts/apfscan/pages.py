@@ -0,0 +1,305 @@
+"""React Router inventory: route path -> page component, per app.
+
+Starts at ``apps/<app>/src/App.tsx`` and reads the JSX ``<Route>`` tree
+(nesting, ``index`` routes, layout routes without ``path``). Each
+``element`` is resolved to the module that defines its component through
+the file's imports, ``lazy(() => import(...))`` bindings and barrel
+re-exports (``export { X } from './X'``). A component whose module holds
+its own ``<Route>`` tree (``<Route path="/admin/*" element={<AdminRoutes />} />``)
+is expanded in place under the parent path.
+
+:class:`ModuleGraph` parses every module at most once and memoizes
+specifier resolution, so barrels and route modules shared by many routes
+cost one read each.
+"""
+from __future__ import annotations
+
+import os
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from . import bytescan
+
+APPS = ("admin", "public")
+ENTRY = Path("src") / "App.tsx"
+_EXTENSIONS = (".tsx", ".ts", ".jsx", ".js")
+
+_IMPORT = re.compile(r"""^\s*import\s+(?:type\s+)?(.+?)\s+from\s+['"]([^'"]+)['"]""", re.M | re.S)
+_REEXPORT = re.compile(r"""^\s*export\s+(?:type\s+)?(\{[^}]*\}|\*(?:\s+as\s+\w+)?)\s+from\s+['"]([^'"]+)['"]""", re.M)
+_LAZY = re.compile(
+    r"""\b(?:const|let)\s+(\w+)\s*=\s*(?:React\.)?lazy\(\s*\(\)\s*=>\s*import\(\s*['"]([^'"]+)['"]\s*\)"""
+    r"""(?:\s*\.then\(\s*\(?\s*\w+\s*\)?\s*=>\s*\(\s*\{\s*default\s*:\s*\w+\.(\w+))?"""
+)
+_DECLARES = r"""^\s*export\s+(?:default\s+)?(?:async\s+)?(?:function|const|class|let)\s+{name}\b"""
+_COMPONENT = re.compile(r"<([A-Z][\w.]*)")
+_ATTR_STRING = re.compile(r"""\b{name}\s*=\s*(?:"([^"]*)"|'([^']*)'|\{{\s*["'`]([^"'`]*)["'`]\s*\}})""")
+# Elements that wrap the page rather than being it.
+WRAPPERS = frozenset({"Suspense", "ErrorBoundary", "Fragment", "React.Fragment", "StrictMode"})
+
+
+@dataclass(frozen=True)
+class RoutePage:
+    app: str
+    path: str
+    component: str | None
+    module: str | None
+    kind: str  # "page", "layout" or "redirect"
+    lazy: bool = False
+
+
+@dataclass
+class _Module:
+    path: Path
+    text: str
+    imports: dict[str, tuple[str, str]] = field(default_factory=dict)  # local -> (specifier, imported|"default")
+    lazy: dict[str, tuple[str, str]] = field(default_factory=dict)
+    reexports: list[tuple[str, dict[str, str] | None]] = field(default_factory=list)
+    has_routes: bool = False
+
+
+@dataclass
+class _Tag:
+    attrs: str
+    closing: bool
+    self_closing: bool
+    end: int
+
+
+def _parse_named(clause: str) -> dict[str, str]:
+    """``{ A, B as C }`` -> {"A": "A", "C": "B"} (local -> exported)."""
+    names: dict[str, str] = {}
+    for part in clause.strip().strip("{}").split(","):
+        part = part.strip().removeprefix("type ").strip()
+        if not part:
+            continue
+        if " as " in part:
+            exported, local = (p.strip() for p in part.split(" as ", 1))
+        else:
+            exported = local = part
+        names[local] = exported
+    return names
+
+
+class ModuleGraph:
+    """Parsed TS/TSX modules of one app, keyed by resolved path."""
+
+    def __init__(self, src_root: Path) -> None:
+        self.src_root = src_root
+        self._modules: dict[Path, _Module | None] = {}
+        self._resolved: dict[tuple[Path, str], Path | None] = {}
+        self._exports: dict[tuple[Path, str], Path | None] = {}
+        self.visited = 0
+
+    def resolve(self, spec: str, importer: Path) -> Path | None:
+        key = (importer.parent, spec)
+        if key in self._resolved:
+            return self._resolved[key]
+        if spec.startswith("@/"):
+            base = self.src_root / spec[2:]
+        elif spec.startswith("."):
+            base = Path(os.path.normpath(importer.parent / spec))
+        else:
+            base = None  # package import
+        found = None
+        if base is not None:
+            candidates = [base] if base.suffix in _EXTENSIONS else []
+            candidates += [base.with_name(base.name + ext) for ext in _EXTENSIONS]
+            candidates += [base / f"index{ext}" for ext in _EXTENSIONS]
+            found = next((c for c in candidates if c.is_file()), None)
+        self._resolved[key] = found
+        return found
+
+    def module(self, path: Path) -> _Module | None:
+        if path in self._modules:
+            return self._modules[path]
+        try:
+            text = bytescan.read_text(path)
+        except OSError:
+            self._modules[path] = None
+            return None
+        self.visited += 1
+        mod = _Module(path=path, text=text, has_routes="<Route" in text)
+        for m in _IMPORT.finditer(text):
+            clause, spec = m.group(1).strip(), m.group(2)
+            default, _, named = clause.partition("{")
+            default = default.strip().rstrip(",").strip()
+            if default and not default.startswith("*"):
+                mod.imports[default] = (spec, "default")
+            if named:
+                for local, exported in _parse_named("{" + named).items():
+                    mod.imports[local] = (spec, exported)
+        for m in _LAZY.finditer(text):
+            mod.lazy[m.group(1)] = (m.group(2), m.group(3) or "default")
+        for m in _REEXPORT.finditer(text):
+            clause = m.group(1)
+            mod.reexports.append((m.group(2), None if clause.startswith("*") else _parse_named(clause)))
+        self._modules[path] = mod
+        return mod
+
+    def defining_module(self, path: Path, name: str, _seen: frozenset[Path] = frozenset()) -> Path | None:
+        """Module that actually declares export ``name`` of ``path`` (follows barrels)."""
+        key = (path, name)
+        if key in self._exports:
+            return self._exports[key]
+        mod = self.module(path)
+        result: Path | None = None
+        if mod is not None and path not in _seen:
+            if name == "default" or re.search(_DECLARES.format(name=re.escape(name)), mod.text, re.M):
+                result = path
+            else:
+                for spec, names in mod.reexports:
+                    if names is not None and name not in names.values() and name not in names:
+                        continue
+                    exported = names.get(name, name) if names else name
+                    target = self.resolve(spec, path)
+                    if target is not None:
+                        result = self.defining_module(target, exported, _seen | {path})
+                        if result is not None:
+                            break
+        self._exports[key] = result
+        return result
+
+    def component_module(self, importer: Path, name: str) -> tuple[Path | None, bool]:
+        """(defining module, is lazy) for a component used in ``importer``."""
+        mod = self.module(importer)
+        if mod is None:
+            return None, False
+        root = name.split(".", 1)[0]
+        if root in mod.lazy:
+            spec, exported = mod.lazy[root]
+            target = self.resolve(spec, importer)
+            return (self.defining_module(target, exported) if target else None), True
+        if root in mod.imports:
+            spec, exported = mod.imports[root]
+            target = self.resolve(spec, importer)
+            return (self.defining_module(target, exported) if target else None), False
+        if re.search(_DECLARES.format(name=re.escape(root)).replace("export\\s+", "(?:export\\s+)?"), mod.text, re.M):
+            return importer, False
+        return None, False
+
+
+def _scan_tag(text: str, start: int) -> _Tag:
+    """``<Route ...>`` starting at ``start``; braces may hold nested JSX."""
+    closing = text.startswith("</", start)
+    i = start + (len("</Route") if closing else len("<Route"))
+    depth = 0
+    in_string: str | None = None
+    while i < len(text):
+        ch = text[i]
+        if in_string:
+            if ch == in_string:
+                in_string = None
+        elif ch in "\"'" and depth == 0:
+            in_string = ch
+        elif ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+        elif ch == ">" and depth == 0:
+            self_closing = text[i - 1] == "/"
+            return _Tag(text[start:i + 1], closing, self_closing, i + 1)
+        i += 1
+    return _Tag(text[start:], closing, True, len(text))
+
+
+def _attr(attrs: str, name: str) -> str | None:
+    m = re.search(_ATTR_STRING.pattern.format(name=name), attrs)
+    if not m:
+        return None
+    return next(g for g in m.groups() if g is not None)
+
+
+def _element(attrs: str) -> str:
+    m = re.search(r"\belement\s*=\s*\{", attrs)
+    if not m:
+        return ""
+    depth = 1
+    i = m.end()
+    while i < len(attrs) and depth:
+        depth += {"{": 1, "}": -1}.get(attrs[i], 0)
+        i += 1
+    return attrs[m.end():i - 1]
+
+
+def _join(parent: str, child: str | None) -> str:
+    if child is None:
+        return parent
+    if child.startswith("/"):
+        return child
+    return (parent.rstrip("/") + "/" + child).replace("//", "/") if parent else "/" + child
+
+
+class RouteInventory:
+    def __init__(self, root: Path, app: str) -> None:
+        self.root = root
+        self.app = app
+        self.graph = ModuleGraph(root / "apps" / app / "src")
+        self._expanding: set[Path] = set()
+
+    def routes(self) -> list[RoutePage]:
+        entry = self.root / "apps" / self.app / ENTRY
+        if not entry.exists():
+            return []
+        return self._routes_in(entry, "")
+
+    def _routes_in(self, path: Path, prefix: str) -> list[RoutePage]:
+        mod = self.graph.module(path)
+        if mod is None or not mod.has_routes:
+            return []
+        self._expanding.add(path)
+        text = mod.text
+        rows: list[RoutePage] = []
+        stack: list[str] = [prefix]
+        pos = 0
+        tag_re = re.compile(r"</?Route\b")
+        while True:
+            m = tag_re.search(text, pos)
+            if not m:
+                break
+            tag = _scan_tag(text, m.start())
+            pos = tag.end
+            if tag.closing:
+                if len(stack) > 1:
+                    stack.pop()
+                continue
+            raw_path = _attr(tag.attrs, "path")
+            is_index = re.search(r"\bindex\b(?!\s*=\s*\{\s*false)", tag.attrs) is not None
+            full = _join(stack[-1], raw_path) if raw_path is not None else stack[-1] or "/"
+            has_children = not tag.self_closing
+            rows.extend(self._classify(path, full, _element(tag.attrs), has_children, is_index or raw_path is not None))
+            if has_children:
+                stack.append(full if raw_path is not None else stack[-1])
+        self._expanding.discard(path)
+        return rows
+
+    def _classify(self, importer: Path, full: str, element: str, has_children: bool, routed: bool) -> list[RoutePage]:
+        names = [n for n in _COMPONENT.findall(element) if n not in WRAPPERS]
+        if not names:
+            return []
+        if "Navigate" in names:
+            return [RoutePage(self.app, full, "Navigate", None, "redirect")]
+        name = names[-1]
+        target, lazy = self.graph.component_module(importer, name)
+        rel = target.relative_to(self.root).as_posix() if target is not None else None
+        if target is not None and target != importer and target not in self._expanding:
+            mod = self.graph.module(target)
+            if mod is not None and mod.has_routes:
+                # Nested route module: its routes live under this path.
+                nested = self._routes_in(target, full.removesuffix("/*"))
+                if nested:
+                    return nested
+        kind = "layout" if has_children or not routed else "page"
+        return [RoutePage(self.app, full, name, rel, kind, lazy)]
+
+
+def route_pages(root: Path, apps: tuple[str, ...] = APPS) -> list[RoutePage]:
+    rows: list[RoutePage] = []
+    for app in apps:
+        rows.extend(RouteInventory(root, app).routes())
+    return rows
+
+
+def page_count(rows: list[RoutePage], app: str) -> int:
+    """Distinct page components routed in ``app``."""
+    return len({(r.module, r.component) for r in rows if r.app == app and r.kind == "page"})
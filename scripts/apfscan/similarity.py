@@ -0,0 +1,297 @@
+"""Near-duplicate controller actions and service methods (MinHash + LSH).
+
+Every public method of the migrated controllers/services and of the legacy
+Laravel controllers/BOs becomes a :class:`CodeUnit`: its body is tokenized
+(comments dropped, literals collapsed, identifiers lowercased or, in
+structural mode, abstracted to ``ID``) and cut into ``k``-token shingles.
+
+Signatures use one-permutation hashing: each shingle is hashed once and
+lands in one of ``num_hashes`` bins, keeping the bin minimum; empty bins
+borrow from the next filled one (rotation densification). The fraction of
+equal bins estimates Jaccard similarity like classic MinHash at a fraction
+of the cost. LSH splits signatures into bands; units sharing a band bucket
+are candidates, each checked against the bucket's first member by exact
+Jaccard, and accepted pairs are merged with union-find. No all-pairs step.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+from collections import defaultdict
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from . import bytescan
+from .csharp import API_ROOT
+from .walk import walk_files
+
+CS_SOURCES = (
+    API_ROOT / "CAU.Eleitoral.Api" / "Controllers",
+    API_ROOT / "CAU.Eleitoral.Api" / "Services",
+    API_ROOT / "CAU.Eleitoral.Application" / "Services",
+)
+LEGACY_APP = Path("docs") / "Sistema legado" / "Eleitoral-Backend" / "app"
+PHP_SOURCES = (
+    LEGACY_APP / "Http" / "Controllers",
+    LEGACY_APP / "Business",
+    LEGACY_APP / "Service",
+    LEGACY_APP / "Services",
+)
+
+_CS_METHOD = re.compile(
+    r"^[ \t]*(?:\[[^\]\n]*\][ \t]*)*public\s+(?:(?:static|async|virtual|override|sealed|new)\s+)*"
+    r"(?!class\b|record\b|interface\b|enum\b|struct\b)[\w.<>\[\]?]+(?:,\s*[\w.<>\[\]?]+)*\s+(\w+)\s*(?:<[^>\n]*>)?\s*\(",
+    re.M,
+)
+_PHP_METHOD = re.compile(r"^[ \t]*(?:final\s+)?public\s+(?:static\s+)?function\s+(\w+)\s*\(", re.M)
+_CLASS = re.compile(r"\b(?:class|record|interface)\s+(\w+)")
+_LINE_COMMENT = {"cs": re.compile(r"//[^\n]*"), "php": re.compile(r"(?://|#)[^\n]*")}
+_BLOCK_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_STRING = re.compile(r'@?\$?"(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\'')
+_TOKEN = re.compile(r"\$?[A-Za-z_]\w*|\d+(?:\.\d+)?|=>|->|::|\?\?|&&|\|\||[=!<>]=|\S")
+
+KEYWORDS = {
+    "cs": frozenset(
+        """abstract as async await base bool break case catch char class const continue decimal default
+        do double else enum false finally float for foreach if in int interface is long new null object
+        out override private protected public readonly ref return sealed static string switch this throw
+        true try typeof using var virtual void when where while yield""".split()
+    ),
+    "php": frozenset(
+        """abstract array as break case catch class clone const continue default do echo else elseif
+        empty false finally for foreach function if instanceof isset list new null private protected
+        public return self static switch this throw true try unset use while""".split()
+    ),
+}
+
+
+@dataclass(frozen=True)
+class CodeUnit:
+    lang: str  # "cs" or "php"
+    path: str
+    owner: str
+    name: str
+    line: int
+    tokens: int
+
+    @property
+    def label(self) -> str:
+        return f"{self.owner}.{self.name}"
+
+
+@dataclass
+class Cluster:
+    members: list[CodeUnit]
+    similarity: float  # mean exact Jaccard of each member to the cluster representative
+
+    @property
+    def langs(self) -> set[str]:
+        return {m.lang for m in self.members}
+
+
+@dataclass
+class SimilarityReport:
+    units: int = 0
+    files: int = 0
+    candidates: int = 0
+    clusters: list[Cluster] = field(default_factory=list)
+
+
+def _body_end(code: str, start: int) -> int:
+    """Offset just past the method body (brace-matched, or the ``;`` of ``=>`` bodies)."""
+    depth = 0
+    opened = False
+    i = start
+    while i < len(code):
+        ch = code[i]
+        if ch == "{":
+            depth += 1
+            opened = True
+        elif ch == "}":
+            depth -= 1
+            if opened and depth == 0:
+                return i + 1
+        elif ch == ";" and not opened and depth == 0:
+            return i + 1
+        i += 1
+    return len(code)
+
+
+def method_bodies(text: str, lang: str) -> Iterator[tuple[str, str, int, str]]:
+    """(owner class, method, line, source) for each public method of ``text``."""
+    # Blank comments and literals with same-length filler so offsets keep valid line numbers.
+    code = _BLOCK_COMMENT.sub(lambda m: re.sub(r"[^\n]", " ", m.group()), text)
+    code = _LINE_COMMENT[lang].sub(lambda m: " " * len(m.group()), code)
+    masked = _STRING.sub(lambda m: '"' + " " * (len(m.group()) - 2) + '"', code)
+    classes = [(m.start(), m.group(1)) for m in _CLASS.finditer(masked)]
+    pattern = _CS_METHOD if lang == "cs" else _PHP_METHOD
+    for m in pattern.finditer(masked):
+        name = m.group(1)
+        if name == "__construct":
+            continue
+        owner = next((c for pos, c in reversed(classes) if pos < m.start()), "")
+        if lang == "cs" and name == owner:
+            continue
+        end = _body_end(masked, m.end())
+        yield owner, name, masked.count("\n", 0, m.start()) + 1, code[m.start():end]
+
+
+def tokenize(source: str, lang: str, structural: bool = False) -> list[str]:
+    keywords = KEYWORDS[lang]
+    tokens: list[str] = []
+    for tok in _TOKEN.findall(_STRING.sub('"S"', source)):
+        first = tok[0]
+        if first == '"':
+            tokens.append("STR")
+        elif first.isdigit():
+            tokens.append("NUM")
+        elif first.isalpha() or first in "_$":
+            low = tok.lstrip("$").lower()
+            tokens.append(low if low in keywords or not structural else "ID")
+        else:
+            tokens.append(tok)
+    return tokens
+
+
+def shingles(tokens: Sequence[str], k: int) -> set[int]:
+    if len(tokens) < k:
+        grams = [" ".join(tokens)] if tokens else []
+    else:
+        grams = [" ".join(tokens[i:i + k]) for i in range(len(tokens) - k + 1)]
+    return {int.from_bytes(hashlib.blake2b(g.encode(), digest_size=8).digest(), "little") for g in grams}
+
+
+_EMPTY = 1 << 64
+
+
+def oph_signature(hashes: Iterable[int], num_hashes: int) -> tuple[int, ...]:
+    """One-permutation MinHash with rotation densification."""
+    bins = [_EMPTY] * num_hashes
+    for h in hashes:
+        b = h % num_hashes
+        v = h // num_hashes
+        if v < bins[b]:
+            bins[b] = v
+    if all(v == _EMPTY for v in bins):
+        return tuple(bins)
+    filled = bins[:]
+    for i in range(num_hashes):
+        if bins[i] == _EMPTY:
+            j = 1
+            while bins[(i + j) % num_hashes] == _EMPTY:
+                j += 1
+            filled[i] = bins[(i + j) % num_hashes] + j * _EMPTY
+    return tuple(filled)
+
+
+def lsh_params(num_hashes: int, threshold: float) -> tuple[int, int]:
+    """(bands, rows) with ``bands * rows == num_hashes`` and the S-curve midpoint
+    ``(1/bands) ** (1/rows)`` as high as possible without exceeding ``threshold``:
+    candidates are verified exactly, so false positives only cost time."""
+    best = (num_hashes, 1)
+    for rows in range(1, num_hashes + 1):
+        if num_hashes % rows == 0 and (rows / num_hashes) ** (1 / rows) <= threshold:
+            best = (num_hashes // rows, rows)
+    return best
+
+
+def jaccard(a: set[int], b: set[int]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class _UnionFind:
+    def __init__(self, n: int) -> None:
+        self.parent = list(range(n))
+
+    def find(self, x: int) -> int:
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a: int, b: int) -> None:
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+def collect_units(
+    root: Path,
+    langs: Iterable[str] = ("cs", "php"),
+    *,
+    k: int = 5,
+    structural: bool = False,
+    min_tokens: int = 30,
+) -> tuple[list[CodeUnit], list[set[int]], int]:
+    """Units, their shingle sets and the number of files read."""
+    sources = {"cs": (CS_SOURCES, (".cs",)), "php": (PHP_SOURCES, (".php",))}
+    units: list[CodeUnit] = []
+    sets: list[set[int]] = []
+    files = 0
+    for lang in langs:
+        dirs, suffixes = sources[lang]
+        for rel_dir in dirs:
+            for entry in walk_files(root / rel_dir, suffixes):
+                files += 1
+                rel = Path(entry.path).relative_to(root).as_posix()
+                for owner, name, line, source in method_bodies(bytescan.read_text(entry.path), lang):
+                    tokens = tokenize(source, lang, structural)
+                    if len(tokens) < min_tokens:
+                        continue
+                    units.append(CodeUnit(lang, rel, owner, name, line, len(tokens)))
+                    sets.append(shingles(tokens, k))
+    return units, sets, files
+
+
+def find_clusters(
+    units: Sequence[CodeUnit],
+    sets: Sequence[set[int]],
+    *,
+    threshold: float = 0.8,
+    num_hashes: int = 128,
+) -> tuple[list[Cluster], int]:
+    """Clusters of two or more units, largest first, and the candidate pairs checked."""
+    bands, rows = lsh_params(num_hashes, threshold)
+    uf = _UnionFind(len(units))
+    checked: set[tuple[int, int]] = set()
+    buckets: list[dict[tuple[int, ...], int]] = [{} for _ in range(bands)]
+    for idx, shingle_set in enumerate(sets):
+        sig = oph_signature(shingle_set, num_hashes)
+        for band in range(bands):
+            key = sig[band * rows:(band + 1) * rows]
+            first = buckets[band].setdefault(key, idx)
+            if first == idx or (first, idx) in checked:
+                continue
+            checked.add((first, idx))
+            if jaccard(sets[first], shingle_set) >= threshold:
+                uf.union(first, idx)
+
+    groups: dict[int, list[int]] = defaultdict(list)
+    for idx in range(len(units)):
+        groups[uf.find(idx)].append(idx)
+    clusters = []
+    for rep, members in groups.items():
+        if len(members) < 2:
+            continue
+        sims = [jaccard(sets[rep], sets[m]) for m in members if m != rep]
+        clusters.append(Cluster([units[m] for m in members], sum(sims) / len(sims)))
+    clusters.sort(key=lambda c: (-len(c.members), -c.similarity, c.members[0].label))
+    return clusters, len(checked)
+
+
+def near_duplicates(
+    root: Path,
+    langs: Iterable[str] = ("cs", "php"),
+    *,
+    threshold: float = 0.8,
+    k: int = 5,
+    num_hashes: int = 128,
+    structural: bool = False,
+    min_tokens: int = 30,
+) -> SimilarityReport:
+    units, sets, files = collect_units(root, langs, k=k, structural=structural, min_tokens=min_tokens)
+    clusters, candidates = find_clusters(units, sets, threshold=threshold, num_hashes=num_hashes)
+    return SimilarityReport(units=len(units), files=files, candidates=candidates, clusters=clusters)
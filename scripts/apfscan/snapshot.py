@@ -0,0 +1,252 @@
+"""Code snapshot of the migrated system: structural counts plus the parsed
+EF model, DTO transactions, frontend usage and routes.
+
+Everything takes the repository ``root`` explicitly so the recount can run
+against any checkout (CI, synthetic benchmark trees) and be imported
+without the PDF/XLSX renderers.
+"""
+from __future__ import annotations
+
+import re
+import subprocess
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from . import bytescan
+from .apicalls import (
+    ControllerUsage,
+    HttpCall,
+    ServiceUsage,
+    join_calls,
+    route_table,
+    scan_calls,
+    usage_by_controller,
+    usage_by_service,
+)
+from .dtos import DtoIndex, TransacaoControllerComplexity, load_dto_index, transacoes_by_controller
+from .efmodel import AliModuleComplexity, EfModel, ali_by_module, load_ef_model
+from .pages import RoutePage, page_count, route_pages
+from .walk import walk_files
+
+ENTITIES_ROOT = Path("apps") / "api" / "CAU.Eleitoral.Domain" / "Entities"
+CONTROLLERS_ROOT = Path("apps") / "api" / "CAU.Eleitoral.Api" / "Controllers"
+SERVICES_ROOT = Path("apps") / "api" / "CAU.Eleitoral.Application" / "Services"
+
+
+@dataclass
+class ApfTotals:
+    ali_qty: int
+    ali_pf: int
+    aie_qty: int
+    aie_pf: int
+    ee_qty: int
+    ee_pf: int
+    ce_qty: int
+    ce_pf: int
+    se_qty: int
+    se_pf: int
+    total_funcoes: int
+    total_nao_ajustado: int
+    vaf: float
+    total_ajustado: int
+
+
+@dataclass
+class CodeSnapshot:
+    commit: str
+    generated_at: str
+    entidades: int
+    controllers_total: int
+    controllers_funcionais: int
+    endpoints: int
+    http_get: int
+    http_post: int
+    http_put: int
+    http_delete: int
+    http_patch: int
+    services_app: int
+    pages_admin: int
+    pages_public: int
+    entity_by_module: list[tuple[str, int]]
+    endpoints_by_controller: list[tuple[str, int]]
+    ali_by_module: list[AliModuleComplexity] = field(default_factory=list)
+    transacoes_by_controller: list[TransacaoControllerComplexity] = field(default_factory=list)
+    uso_by_controller: list[ControllerUsage] = field(default_factory=list)
+    uso_by_service: list[ServiceUsage] = field(default_factory=list)
+    rotas: list[RoutePage] = field(default_factory=list)
+    committed_at: str = ""  # commit date of ``commit``; unlike generated_at, a function of the tree
+
+
+def run(cmd: str, root: Path) -> str:
+    result = subprocess.run(
+        cmd,
+        shell=True,
+        check=True,
+        text=True,
+        capture_output=True,
+        cwd=root,
+    )
+    return result.stdout.strip()
+
+
+def parse_apf_totals(md_text: str) -> ApfTotals:
+    def extract(pattern: str) -> str:
+        match = re.search(pattern, md_text, flags=re.MULTILINE)
+        if not match:
+            raise RuntimeError(f"Pattern not found: {pattern}")
+        return match.group(1).replace(".", "")
+
+    ali_qty, ali_pf = re.search(
+        r"\| \*\*ALI\*\* .*?\| ([0-9.]+) \| ([0-9.]+) \|", md_text
+    ).groups()
+    aie_qty, aie_pf = re.search(
+        r"\| \*\*AIE\*\* .*?\| ([0-9.]+) \| ([0-9.]+) \|", md_text
+    ).groups()
+    ee_qty, ee_pf = re.search(
+        r"\| \*\*EE\*\* .*?\| ([0-9.]+) \| ([0-9.]+) \|", md_text
+    ).groups()
+    ce_qty, ce_pf = re.search(
+        r"\| \*\*CE\*\* .*?\| ([0-9.]+) \| ([0-9.]+) \|", md_text
+    ).groups()
+    se_qty, se_pf = re.search(
+        r"\| \*\*SE\*\* .*?\| ([0-9.]+) \| ([0-9.]+) \|", md_text
+    ).groups()
+
+    total_funcoes = int(extract(r"\| \*\*Total de Funções Identificadas\*\* \| ([0-9.]+) \|"))
+    total_nao_ajustado = int(extract(r"\| \*\*TOTAL NÃO AJUSTADO\*\* \| \*\*[0-9.]+\*\* \| \*\*([0-9.]+) PF\*\* \|"))
+    total_ajustado = int(extract(r"\| \*\*Pontos de Função Ajustados\*\* \| \*\*([0-9.]+) PF\*\* \|"))
+
+    vaf_match = re.search(r"\| \*\*Fator de Ajuste \(VAF\)\*\* \| \*\*([0-9.,]+)\*\* \|", md_text)
+    if not vaf_match:
+        raise RuntimeError("VAF not found in contagem-apf.md")
+    vaf = float(vaf_match.group(1).replace(",", "."))
+
+    return ApfTotals(
+        ali_qty=int(ali_qty.replace(".", "")),
+        ali_pf=int(ali_pf.replace(".", "")),
+        aie_qty=int(aie_qty.replace(".", "")),
+        aie_pf=int(aie_pf.replace(".", "")),
+        ee_qty=int(ee_qty.replace(".", "")),
+        ee_pf=int(ee_pf.replace(".", "")),
+        ce_qty=int(ce_qty.replace(".", "")),
+        ce_pf=int(ce_pf.replace(".", "")),
+        se_qty=int(se_qty.replace(".", "")),
+        se_pf=int(se_pf.replace(".", "")),
+        total_funcoes=total_funcoes,
+        total_nao_ajustado=total_nao_ajustado,
+        vaf=vaf,
+        total_ajustado=total_ajustado,
+    )
+
+
+def count_entities_by_module(root: Path) -> list[tuple[str, int]]:
+    entities_root = root / ENTITIES_ROOT
+    if not entities_root.exists():
+        raise RuntimeError(f"Diretorio nao encontrado: {entities_root}")
+
+    class_pattern = re.compile(rb"public\s+(?:partial\s+)?class\s+\w+\s*:\s*BaseEntity\b")
+    result: list[tuple[str, int]] = []
+
+    for module_dir in sorted(p for p in entities_root.iterdir() if p.is_dir()):
+        module_total = 0
+        for cs_file in walk_files(module_dir, (".cs",)):
+            if bytescan.contains(cs_file.path, class_pattern):
+                module_total += 1
+        result.append((module_dir.name, module_total))
+
+    return result
+
+
+def count_endpoints_by_controller(root: Path) -> list[tuple[str, int]]:
+    controllers_root = root / CONTROLLERS_ROOT
+    if not controllers_root.exists():
+        raise RuntimeError(f"Diretorio nao encontrado: {controllers_root}")
+
+    endpoint_pattern = re.compile(rb"\[Http(Get|Post|Put|Delete|Patch)\b")
+    rows: list[tuple[str, int]] = []
+    for controller_file in walk_files(controllers_root, ("Controller.cs",), recursive=False):
+        if controller_file.name == "BaseController.cs":
+            continue
+        rows.append((controller_file.name[: -len(".cs")], bytescan.count(controller_file.path, endpoint_pattern)))
+
+    rows.sort(key=lambda item: (-item[1], item[0]))
+    return rows
+
+
+def count_files(root: Path, relative_dir: Path | str, suffix: str) -> int:
+    return sum(1 for _ in walk_files(root / relative_dir, (suffix,)))
+
+
+def count_http_attributes(root: Path) -> Counter[str]:
+    """Lines carrying each ``[Http*]`` attribute, across every ``*Controller.cs``."""
+    controllers_root = root / CONTROLLERS_ROOT
+    line_pattern = re.compile(rb"^.*?\[Http(Get|Post|Put|Delete|Patch)", flags=re.MULTILINE)
+    counts: Counter[str] = Counter()
+    for controller_file in walk_files(controllers_root, ("Controller.cs",)):
+        counts.update(bytescan.find_groups(controller_file.path, line_pattern, 1))
+    return counts
+
+
+@dataclass
+class ApiCounts:
+    """Attribute/class counts over the API sources (cheap byte scans)."""
+
+    entity_by_module: list[tuple[str, int]]
+    endpoints_by_controller: list[tuple[str, int]]
+    http: Counter[str]
+    controllers_total: int
+    services_app: int
+
+
+def count_api(root: Path) -> ApiCounts:
+    return ApiCounts(
+        entity_by_module=count_entities_by_module(root),
+        endpoints_by_controller=count_endpoints_by_controller(root),
+        http=count_http_attributes(root),
+        controllers_total=count_files(root, CONTROLLERS_ROOT, "Controller.cs"),
+        services_app=count_files(root, SERVICES_ROOT, "Service.cs"),
+    )
+
+
+def build_snapshot(
+    root: Path,
+    api: ApiCounts,
+    ef_model: EfModel,
+    dtos: DtoIndex,
+    calls: list[HttpCall],
+    rotas: list[RoutePage],
+) -> CodeSnapshot:
+    """Assemble a snapshot from already-parsed parts (see :mod:`apfscan.live`)."""
+    usage = join_calls(route_table(dtos.index), calls)
+    return CodeSnapshot(
+        commit=run("git rev-parse --short HEAD", root),
+        generated_at=run("date '+%Y-%m-%d %H:%M:%S %z'", root),
+        entidades=sum(qty for _, qty in api.entity_by_module),
+        controllers_total=api.controllers_total,
+        controllers_funcionais=len(api.endpoints_by_controller),
+        endpoints=sum(qty for _, qty in api.endpoints_by_controller),
+        http_get=api.http["Get"],
+        http_post=api.http["Post"],
+        http_put=api.http["Put"],
+        http_delete=api.http["Delete"],
+        http_patch=api.http["Patch"],
+        services_app=api.services_app,
+        pages_admin=page_count(rotas, "admin"),
+        pages_public=page_count(rotas, "public"),
+        entity_by_module=api.entity_by_module,
+        endpoints_by_controller=api.endpoints_by_controller,
+        ali_by_module=ali_by_module(ef_model),
+        transacoes_by_controller=transacoes_by_controller(dtos.action_metrics()),
+        uso_by_controller=usage_by_controller(usage),
+        uso_by_service=usage_by_service(usage),
+        rotas=rotas,
+        committed_at=run("git show -s --format=%ci HEAD", root),
+    )
+
+
+def get_code_snapshot(root: Path, cs_index: Path | None = None) -> CodeSnapshot:
+    """Scan ``root``; ``cs_index`` is the persistent C# index cache (``None``: cold parse)."""
+    ef_model = load_ef_model(root)
+    dtos = load_dto_index(root, (e.short_name for e in ef_model.tables()), cs_index)
+    return build_snapshot(root, count_api(root), ef_model, dtos, scan_calls(root), route_pages(root))
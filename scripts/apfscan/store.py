@@ -0,0 +1,268 @@
+"""SQLite history of APF recounts.
+
+Each recount (``CodeSnapshot`` + ``ApfTotals``) becomes one ``snapshots``
+row holding every scalar metric plus a few pre-aggregated totals, and the
+per-module/per-controller lists go to child tables keyed by
+``snapshot_id``. A snapshot is written in one transaction with one
+``executemany`` per child table. Indexes on commit, date, module and
+controller keep the trend/history queries to index lookups.
+
+Recounts accumulate (several a day is normal). Imported snapshots are
+unique per source and date: importing the same Markdown again replaces
+its row instead of adding a second point to the trend.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import sqlite3
+from collections.abc import Iterable, Sequence
+from dataclasses import is_dataclass
+from pathlib import Path
+from typing import Any
+
+SCHEMA_VERSION = 2
+RECOUNT_SOURCE = "recount"
+
+SNAPSHOT_COLUMNS = (
+    "entidades",
+    "controllers_total",
+    "controllers_funcionais",
+    "endpoints",
+    "http_get",
+    "http_post",
+    "http_put",
+    "http_delete",
+    "http_patch",
+    "services_app",
+    "pages_admin",
+    "pages_public",
+)
+TOTALS_COLUMNS = (
+    "ali_qty",
+    "ali_pf",
+    "aie_qty",
+    "aie_pf",
+    "ee_qty",
+    "ee_pf",
+    "ce_qty",
+    "ce_pf",
+    "se_qty",
+    "se_pf",
+    "total_funcoes",
+    "total_nao_ajustado",
+    "vaf",
+    "total_ajustado",
+)
+# Sums over the child tables, stored on the snapshot row for dashboards.
+AGGREGATE_COLUMNS = ("ali_modelo_pf", "transacoes_acoes", "transacoes_pf", "endpoints_usados", "chamadas_orfas")
+
+# table -> (CodeSnapshot attribute, columns). Tuples map positionally, dataclasses by name.
+CHILD_TABLES: dict[str, tuple[str, tuple[str, ...]]] = {
+    "entity_modules": ("entity_by_module", ("modulo", "entidades")),
+    "controller_endpoints": ("endpoints_by_controller", ("controller", "endpoints")),
+    "ali_modules": ("ali_by_module", ("modulo", "tabelas", "det_total", "baixa", "media", "alta", "pf")),
+    "transacoes_controllers": (
+        "transacoes_by_controller",
+        ("controller", "acoes", "ee", "ce", "se", "det_total", "baixa", "media", "alta", "pf"),
+    ),
+    "uso_controllers": ("uso_by_controller", ("controller", "endpoints", "usados", "nao_usados", "chamadas")),
+    "uso_services": ("uso_by_service", ("app", "modulo", "chamadas", "casadas", "orfas")),
+    "rotas": ("rotas", ("app", "path", "component", "module", "kind", "lazy")),
+}
+_TEXT_COLUMNS = frozenset({"modulo", "controller", "app", "path", "component", "module", "kind"})
+
+TREND_METRICS = SNAPSHOT_COLUMNS + TOTALS_COLUMNS + AGGREGATE_COLUMNS
+
+
+def _schema() -> str:
+    scalar = ",\n    ".join(
+        f"{c} {'REAL' if c == 'vaf' else 'INTEGER'}" for c in SNAPSHOT_COLUMNS + TOTALS_COLUMNS + AGGREGATE_COLUMNS
+    )
+    ddl = [
+        f"""
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    commit_sha TEXT NOT NULL,
+    generated_at TEXT NOT NULL,
+    snapshot_date TEXT NOT NULL,
+    recorded_at TEXT NOT NULL,
+    source TEXT NOT NULL DEFAULT 'recount',
+    {scalar}
+);
+CREATE INDEX IF NOT EXISTS ix_snapshots_commit ON snapshots(commit_sha);
+CREATE INDEX IF NOT EXISTS ix_snapshots_date ON snapshots(snapshot_date, generated_at);
+CREATE UNIQUE INDEX IF NOT EXISTS ux_snapshots_import ON snapshots(source, snapshot_date)
+    WHERE source <> 'recount';
+"""
+    ]
+    for table, (_, columns) in CHILD_TABLES.items():
+        cols = ",\n    ".join(f"{c} {'TEXT' if c in _TEXT_COLUMNS else 'INTEGER'}" for c in columns)
+        ddl.append(
+            f"""
+CREATE TABLE IF NOT EXISTS {table} (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots(id) ON DELETE CASCADE,
+    {cols}
+);
+CREATE INDEX IF NOT EXISTS ix_{table}_snapshot ON {table}(snapshot_id);
+"""
+        )
+        key = "modulo" if "modulo" in columns else "controller" if "controller" in columns else None
+        if key:
+            ddl.append(f"CREATE INDEX IF NOT EXISTS ix_{table}_{key} ON {table}({key}, snapshot_id);\n")
+    return "".join(ddl)
+
+
+def _row(item: Any, columns: Sequence[str]) -> tuple[Any, ...]:
+    if is_dataclass(item):
+        return tuple(getattr(item, c) for c in columns)
+    return tuple(item)[: len(columns)]
+
+
+class SnapshotStore:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            with self.conn:
+                if version == 1:
+                    # v1 allowed the same import twice; keep its latest row.
+                    self.conn.execute(
+                        "DELETE FROM snapshots WHERE source <> ? AND id NOT IN "
+                        "(SELECT MAX(id) FROM snapshots WHERE source <> ? GROUP BY source, snapshot_date)",
+                        (RECOUNT_SOURCE, RECOUNT_SOURCE),
+                    )
+                self.conn.executescript(_schema())
+                self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> SnapshotStore:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def save(self, totals: Any, snapshot: Any, *, source: str = RECOUNT_SOURCE) -> int:
+        """Insert one recount, or replace the import of ``source`` for the same date; returns its ``snapshot_id``."""
+        children = {
+            table: [_row(item, columns) for item in getattr(snapshot, attr, None) or ()]
+            for table, (attr, columns) in CHILD_TABLES.items()
+        }
+        def total(table: str, pos: int) -> int | None:
+            # NULL rather than 0 when the snapshot has no such rows (e.g. imported Markdown).
+            return sum(r[pos] for r in children[table]) if children[table] else None
+
+        aggregates = {
+            "ali_modelo_pf": total("ali_modules", -1),
+            "transacoes_acoes": total("transacoes_controllers", 1),
+            "transacoes_pf": total("transacoes_controllers", -1),
+            "endpoints_usados": total("uso_controllers", 2),
+            "chamadas_orfas": total("uso_services", -1),
+        }
+        generated_at = str(snapshot.generated_at)
+        values: dict[str, Any] = {
+            "commit_sha": snapshot.commit,
+            "generated_at": generated_at,
+            "snapshot_date": generated_at[:10],
+            "recorded_at": dt.datetime.now().astimezone().isoformat(timespec="seconds"),
+            "source": source,
+        }
+        values.update({c: getattr(snapshot, c, None) for c in SNAPSHOT_COLUMNS})
+        values.update({c: getattr(totals, c, None) for c in TOTALS_COLUMNS} if totals is not None else {})
+        values.update(aggregates)
+
+        with self.conn:
+            if source != RECOUNT_SOURCE:
+                self.conn.execute(
+                    "DELETE FROM snapshots WHERE source = ? AND snapshot_date = ?", (source, values["snapshot_date"])
+                )
+            cur = self.conn.execute(
+                f"INSERT INTO snapshots ({', '.join(values)}) VALUES ({', '.join('?' for _ in values)})",
+                tuple(values.values()),
+            )
+            snapshot_id = cur.lastrowid
+            assert snapshot_id is not None
+            for table, rows in children.items():
+                if not rows:
+                    continue
+                columns = CHILD_TABLES[table][1]
+                self.conn.executemany(
+                    f"INSERT INTO {table} (snapshot_id, {', '.join(columns)}) "
+                    f"VALUES (?, {', '.join('?' for _ in columns)})",
+                    ((snapshot_id, *row) for row in rows),
+                )
+        return snapshot_id
+
+    def snapshots(self, limit: int | None = None) -> list[sqlite3.Row]:
+        """Most recent snapshots first, with their headline totals."""
+        sql = (
+            "SELECT id, snapshot_date, generated_at, commit_sha, source, endpoints, entidades, "
+            "total_nao_ajustado, total_ajustado FROM snapshots ORDER BY generated_at DESC, id DESC"
+        )
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return self.conn.execute(sql).fetchall()
+
+    def trend(self, metrics: Iterable[str], since: str | None = None, per_day: bool = False) -> list[sqlite3.Row]:
+        cols = list(metrics)
+        unknown = [m for m in cols if m not in TREND_METRICS]
+        if unknown:
+            raise ValueError(f"Metrica desconhecida: {', '.join(unknown)}")
+        where = "WHERE snapshot_date >= ?" if since else ""
+        params = (since,) if since else ()
+        if per_day:
+            # Last snapshot of each day.
+            sql = (
+                f"SELECT snapshot_date, commit_sha, {', '.join(cols)} FROM snapshots s "
+                f"WHERE id = (SELECT id FROM snapshots WHERE snapshot_date = s.snapshot_date "
+                f"ORDER BY generated_at DESC, id DESC LIMIT 1) {'AND snapshot_date >= ?' if since else ''} "
+                f"ORDER BY snapshot_date"
+            )
+        else:
+            sql = (
+                f"SELECT snapshot_date, generated_at, commit_sha, {', '.join(cols)} FROM snapshots {where} "
+                f"ORDER BY generated_at, id"
+            )
+        return self.conn.execute(sql, params).fetchall()
+
+    def controller_history(self, controller: str) -> list[sqlite3.Row]:
+        """Endpoints, transaction PF and frontend usage of one controller across snapshots."""
+        return self.conn.execute(
+            """
+            SELECT s.snapshot_date, s.commit_sha, ce.endpoints,
+                   tc.acoes, tc.ee, tc.ce, tc.se, tc.pf AS transacoes_pf,
+                   uc.usados, uc.nao_usados, uc.chamadas
+            FROM controller_endpoints ce
+            JOIN snapshots s ON s.id = ce.snapshot_id
+            LEFT JOIN transacoes_controllers tc ON tc.snapshot_id = ce.snapshot_id AND tc.controller = ce.controller
+            LEFT JOIN uso_controllers uc ON uc.snapshot_id = ce.snapshot_id AND uc.controller = ce.controller
+            WHERE ce.controller = ?
+            ORDER BY s.generated_at, s.id
+            """,
+            (controller,),
+        ).fetchall()
+
+    def module_history(self, modulo: str) -> list[sqlite3.Row]:
+        return self.conn.execute(
+            """
+            SELECT s.snapshot_date, s.commit_sha, em.entidades,
+                   am.tabelas, am.det_total, am.pf AS ali_pf
+            FROM entity_modules em
+            JOIN snapshots s ON s.id = em.snapshot_id
+            LEFT JOIN ali_modules am ON am.snapshot_id = em.snapshot_id AND am.modulo = em.modulo
+            WHERE em.modulo = ?
+            ORDER BY s.generated_at, s.id
+            """,
+            (modulo,),
+        ).fetchall()
+
+    def names(self, table: str, column: str) -> list[str]:
+        if table not in CHILD_TABLES or column not in CHILD_TABLES[table][1]:
+            raise ValueError(f"Coluna desconhecida: {table}.{column}")
+        return [r[0] for r in self.conn.execute(f"SELECT DISTINCT {column} FROM {table} ORDER BY 1")]
+
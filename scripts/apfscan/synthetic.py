@@ -0,0 +1,305 @@
+"""Synthetic repository generator for benchmarking the APF scripts offline.
+
+Produces a tree shaped like this repository (``apps/api`` controllers,
+domain entities and services, ``apps/admin``/``apps/public`` pages,
+``docs/contagem-apf.md``) plus a Deltapoint-shaped XLSX, sized by
+:class:`SyntheticParams`. Output is deterministic for a given seed.
+"""
+from __future__ import annotations
+
+import random
+import subprocess
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from . import deltapoint
+from .deltapoint import FunctionValues
+
+API = Path("apps") / "api"
+CONTROLLERS_DIR = API / "CAU.Eleitoral.Api" / "Controllers"
+ENTITIES_DIR = API / "CAU.Eleitoral.Domain" / "Entities"
+SERVICES_DIR = API / "CAU.Eleitoral.Application" / "Services"
+MODEL_SNAPSHOT = API / "CAU.Eleitoral.Infrastructure" / "Migrations" / "AppDbContextModelSnapshot.cs"
+XLSX_NAME = "Deltapoint_Sintetico.xlsx"
+
+_VERBS = ("Get", "Get", "Post", "Put", "Delete")
+# Unaccented UI text, so fix-accents always has work to do.
+_UI_PHRASES = (
+    "Configuracoes da Eleicao",
+    "Nao foi possivel carregar o Calendario",
+    "Historico de Votacao e Apuracao",
+    "Relatorio de Denuncias",
+    "Informacoes da Comissao",
+    "Voce nao possui permissao",
+    "Periodo de Inscricao",
+)
+_TIPOS = (("ALI", "ALIL", 7), ("EE", "EEA", 4), ("CE", "CEA", 4), ("SE", "SEA", 5), ("AIE", "AIEL", 5))
+
+
+@dataclass(frozen=True)
+class SyntheticParams:
+    controllers: int = 20
+    actions: int = 16
+    entity_modules: int = 8
+    entities_per_module: int = 20
+    services: int = 15
+    pages: int = 70
+    xlsx_rows: int = 500
+    seed: int = 42
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def _controller_source(name: str, actions: int, rng: random.Random) -> str:
+    lines = [
+        "using Microsoft.AspNetCore.Mvc;",
+        "",
+        "namespace CAU.Eleitoral.Api.Controllers;",
+        "",
+        f"public class {name}Controller : BaseController",
+        "{",
+    ]
+    for i in range(actions):
+        verb = rng.choice(_VERBS)
+        route = '("{id:guid}")' if verb != "Post" else ""
+        lines.extend(
+            [
+                "    /// <summary>",
+                f"    /// Acao {i} de {name}",
+                "    /// </summary>",
+                f"    [Http{verb}{route}]",
+                f"    [ProducesResponseType(typeof({name}Dto), StatusCodes.Status200OK)]",
+                f"    public async Task<ActionResult<{name}Dto>> Acao{i}(Guid id, CancellationToken cancellationToken)",
+                "    {",
+                f"        var result = await _service.Acao{i}Async(id, cancellationToken);",
+                "        return Ok(result);",
+                "    }",
+                "",
+            ]
+        )
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def _entity_source(module: str, name: str, rng: random.Random) -> str:
+    props = "\n".join(
+        f"    public string? Campo{i} {{ get; set; }}" for i in range(rng.randint(4, 14))
+    )
+    return (
+        "using CAU.Eleitoral.Domain.Common;\n\n"
+        f"namespace CAU.Eleitoral.Domain.Entities.{module};\n\n"
+        f"public class {name} : BaseEntity\n{{\n{props}\n}}\n"
+    )
+
+
+def _model_snapshot(params: SyntheticParams, rng: random.Random) -> str:
+    """EF Core ``ModelSnapshot`` shaped like the real migration output."""
+    names = [
+        (f"Modulo{m:02d}", f"Entidade{m:02d}x{e:03d}")
+        for m in range(params.entity_modules)
+        for e in range(params.entities_per_module)
+    ]
+    ns = "CAU.Eleitoral.Domain.Entities"
+    out = [
+        "namespace CAU.Eleitoral.Infrastructure.Migrations",
+        "{",
+        "    partial class AppDbContextModelSnapshot : ModelSnapshot",
+        "    {",
+        "        protected override void BuildModel(ModelBuilder modelBuilder)",
+        "        {",
+    ]
+    for module, name in names:
+        out.append(f'            modelBuilder.Entity("{ns}.{module}.{name}", b =>')
+        out.append("                {")
+        out.append('                    b.Property<Guid>("Id")')
+        out.append('                        .HasColumnType("uuid");')
+        for i in range(rng.randint(4, 40)):
+            out.append(f'                    b.Property<string>("Campo{i}")')
+            out.append('                        .HasColumnType("text");')
+        out.append('                    b.Property<Guid?>("PaiId")')
+        out.append('                        .HasColumnType("uuid");')
+        out.append('                    b.HasKey("Id");')
+        out.append(f'                    b.ToTable("{name}");')
+        out.append("                });")
+    for index, (module, name) in enumerate(names[1:], start=1):
+        parent_module, parent = names[rng.randrange(index)]
+        out.append(f'            modelBuilder.Entity("{ns}.{module}.{name}", b =>')
+        out.append("                {")
+        out.append(f'                    b.HasOne("{ns}.{parent_module}.{parent}", "Pai")')
+        out.append("                        .WithMany()")
+        out.append('                        .HasForeignKey("PaiId");')
+        out.append('                    b.Navigation("Pai");')
+        out.append("                });")
+    out.extend(["        }", "    }", "}"])
+    return "\n".join(out) + "\n"
+
+
+def _page_source(name: str, rng: random.Random) -> str:
+    items = "\n".join(
+        f"      <p className=\"text-sm\">{rng.choice(_UI_PHRASES)}</p>" for _ in range(rng.randint(5, 25))
+    )
+    return (
+        "import { useState } from 'react'\n\n"
+        f"export default function {name}() {{\n"
+        "  const [open] = useState(false)\n"
+        "  return (\n"
+        "    <div>\n"
+        f"      <h1>{rng.choice(_UI_PHRASES)}</h1>\n"
+        f"{items}\n"
+        "    </div>\n"
+        "  )\n"
+        "}\n"
+    )
+
+
+def _app_source(pages: list[tuple[int, str]], nested: str | None) -> str:
+    """``App.tsx`` routing every page: even pages imported eagerly, odd ones through ``lazy()``."""
+    imports = ["import { lazy, Suspense } from 'react'", "import { Routes, Route } from 'react-router-dom'"]
+    routes = []
+    for group, name in pages:
+        spec = f"@/pages/grupo{group}/{name}"
+        if int(name[-4:]) % 4 < 2:
+            imports.append(f"import {name} from '{spec}'")
+        else:
+            imports.append(f"const {name} = lazy(() => import('{spec}'))")
+        routes.append(f'        <Route path="/grupo{group}/{name.lower()}" element={{<{name} />}} />')
+    if nested:
+        imports.append(f"import {{ {nested} }} from '@/routes/{nested}'")
+        routes.append(f'        <Route path="/{nested.lower()}/*" element={{<{nested} />}} />')
+    return (
+        "\n".join(imports)
+        + "\n\nexport default function App() {\n  return (\n    <Suspense fallback={null}>\n      <Routes>\n"
+        + "\n".join(routes)
+        + "\n      </Routes>\n    </Suspense>\n  )\n}\n"
+    )
+
+
+def _contagem_md(params: SyntheticParams) -> str:
+    ali = params.entity_modules * params.entities_per_module
+    ee = params.controllers * params.actions // 2
+    ce = params.controllers * params.actions // 3
+    se = params.controllers
+    aie = 3
+    pf = {"ALI": ali * 7, "AIE": aie * 5, "EE": ee * 4, "CE": ce * 4, "SE": se * 5}
+    total_qty = ali + aie + ee + ce + se
+    total_pf = sum(pf.values())
+    adjusted = round(total_pf * 1.16)
+
+    def n(value: int) -> str:
+        return f"{value:,}".replace(",", ".")
+
+    return "\n".join(
+        [
+            "# Contagem APF (sintetica)",
+            "",
+            "| Tipo de Função | Quantidade | PF Total |",
+            "|----------------|-----------|----------|",
+            f"| **ALI** (Arquivo Lógico Interno) | {n(ali)} | {n(pf['ALI'])} |",
+            f"| **AIE** (Arquivo Interface Externa) | {n(aie)} | {n(pf['AIE'])} |",
+            f"| **EE** (Entrada Externa) | {n(ee)} | {n(pf['EE'])} |",
+            f"| **CE** (Consulta Externa) | {n(ce)} | {n(pf['CE'])} |",
+            f"| **SE** (Saída Externa) | {n(se)} | {n(pf['SE'])} |",
+            f"| **TOTAL NÃO AJUSTADO** | **{n(total_qty)}** | **{n(total_pf)} PF** |",
+            "",
+            "| Métrica | Valor |",
+            "|---------|-------|",
+            f"| **Total de Funções Identificadas** | {n(total_qty)} |",
+            "| **Fator de Ajuste (VAF)** | **1,16** |",
+            f"| **Pontos de Função Ajustados** | **{n(adjusted)} PF** |",
+            "",
+        ]
+    )
+
+
+def write_deltapoint_xlsx(path: Path, rows: int, seed: int = 42) -> Path:
+    """Workbook with the ``Resumo``/``Funções`` layout read by ``load_deltapoint_xlsx``."""
+    rng = random.Random(seed)
+
+    def values() -> Iterator[FunctionValues]:
+        for i in range(rows):
+            tipo, ctl, pf = rng.choice(_TIPOS)
+            yield f"Funcao sintetica {i}", tipo, ctl, float(pf), float(pf)
+
+    deltapoint.write_deltapoint_xlsx(
+        path, values(), sistema="Portal Sintetico", contador="Benchmark", tipo_contagem="Estimada"
+    )
+    return path
+
+
+def generate_tree(dest: Path, params: SyntheticParams, *, xlsx: bool = True, git: bool = True) -> Path:
+    """Create the synthetic repository under ``dest`` and return ``dest``."""
+    rng = random.Random(params.seed)
+    dest.mkdir(parents=True, exist_ok=True)
+
+    controllers = dest / CONTROLLERS_DIR
+    controllers.mkdir(parents=True, exist_ok=True)
+    (controllers / "BaseController.cs").write_text(
+        "namespace CAU.Eleitoral.Api.Controllers;\n\npublic abstract class BaseController { }\n",
+        encoding="utf-8",
+    )
+    for c in range(params.controllers):
+        name = f"Modulo{c:03d}"
+        (controllers / f"{name}Controller.cs").write_text(
+            _controller_source(name, params.actions, rng), encoding="utf-8"
+        )
+
+    for m in range(params.entity_modules):
+        module = f"Modulo{m:02d}"
+        module_dir = dest / ENTITIES_DIR / module
+        module_dir.mkdir(parents=True, exist_ok=True)
+        for e in range(params.entities_per_module):
+            name = f"Entidade{m:02d}x{e:03d}"
+            (module_dir / f"{name}.cs").write_text(_entity_source(module, name, rng), encoding="utf-8")
+
+    snapshot = dest / MODEL_SNAPSHOT
+    snapshot.parent.mkdir(parents=True, exist_ok=True)
+    snapshot.write_text(_model_snapshot(params, rng), encoding="utf-8")
+
+    services = dest / SERVICES_DIR
+    services.mkdir(parents=True, exist_ok=True)
+    for s in range(params.services):
+        (services / f"Servico{s:03d}Service.cs").write_text(
+            f"namespace CAU.Eleitoral.Application.Services;\n\npublic class Servico{s:03d}Service {{ }}\n",
+            encoding="utf-8",
+        )
+
+    routed: dict[str, list[tuple[int, str]]] = {"admin": [], "public": []}
+    for p in range(params.pages):
+        app = "admin" if p % 2 == 0 else "public"
+        pages = dest / "apps" / app / "src" / "pages" / f"grupo{p % 7}"
+        pages.mkdir(parents=True, exist_ok=True)
+        name = f"Pagina{p:04d}"
+        (pages / f"{name}.tsx").write_text(_page_source(name, rng), encoding="utf-8")
+        routed[app].append((p % 7, name))
+
+    for app, app_pages in routed.items():
+        src = dest / "apps" / app / "src"
+        src.mkdir(parents=True, exist_ok=True)
+        # Group 0 lives in a nested route module, like a feature router would.
+        nested_pages = [pg for pg in app_pages if pg[0] == 0]
+        nested = "Grupo0Routes" if nested_pages else None
+        if nested:
+            (src / "routes").mkdir(exist_ok=True)
+            module = _app_source(nested_pages, None).replace("export default function App()", f"export function {nested}()")
+            (src / "routes" / f"{nested}.tsx").write_text(module.replace('path="/grupo0/', 'path="'), encoding="utf-8")
+        (src / "App.tsx").write_text(
+            _app_source([pg for pg in app_pages if pg[0] != 0], nested), encoding="utf-8"
+        )
+
+    docs = dest / "docs"
+    docs.mkdir(parents=True, exist_ok=True)
+    (docs / "contagem-apf.md").write_text(_contagem_md(params), encoding="utf-8")
+    (dest / ".gitignore").write_text("output/\n", encoding="utf-8")
+
+    if xlsx:
+        write_deltapoint_xlsx(dest / XLSX_NAME, params.xlsx_rows, params.seed)
+
+    if git:
+        env_args = ["-c", "user.name=bench", "-c", "user.email=bench@localhost"]
+        subprocess.run(["git", "init", "-q"], cwd=dest, check=True)
+        subprocess.run(["git", "add", "-A"], cwd=dest, check=True)
+        subprocess.run(["git", *env_args, "commit", "-q", "-m", "synthetic"], cwd=dest, check=True)
+    return dest
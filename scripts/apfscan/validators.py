@@ -0,0 +1,159 @@
+"""FluentValidation inventory: validated input fields per request DTO.
+
+Each ``AbstractValidator<TDto>`` under ``Application/Validators`` lists the
+fields of an external input the system actually checks. The rules come
+from the shared :class:`~apfscan.csharp.CsIndex` (``CsType.rules``, parsed
+with the rest of the symbols, so no file is read again here). A validator's
+fields are its ``RuleFor`` properties plus, for ``RuleForEach(...)
+.SetValidator(new Child())``, the fields of the child validator
+(``Provas.Descricao``); a rule is cross-field when its conditions or
+comparisons read another property (``.When(x => !x.Deferido)``,
+``.Equal(x => x.NewPassword)``, ``RuleFor(x => x).Must(...)``).
+
+Endpoints are joined through a type -> action index built once from the
+request types of :meth:`~apfscan.dtos.DtoIndex.action_metrics`, so every
+validator is looked up by its DTO name instead of scanning the actions.
+A DTO may have several validators (all of them run); an endpoint then
+counts the union of their fields.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from .csharp import CsIndex, CsType, is_validator, split_top_level
+from .dtos import APPLICATION, ActionMetrics, DtoIndex, TypeRef
+
+VALIDATORS_DIR = APPLICATION / "Validators"
+
+
+@dataclass(frozen=True)
+class ValidatorInfo:
+    name: str
+    dto: str
+    file: str
+    fields: tuple[str, ...]  # validated properties, nested ones as ``Parent.Field``
+    rules: int
+    checks: int
+    cross_field: int
+    children: tuple[str, ...]
+
+    @property
+    def det(self) -> int:
+        return len(self.fields)
+
+
+@dataclass(frozen=True)
+class EndpointValidation:
+    controller: str
+    action: str
+    verb: str
+    template: str | None
+    tipo: str
+    dto: str
+    validator: str
+    det_acao: int  # DET estimated for the action (request + response DTOs)
+    det_dto: int  # DET of the request DTO alone
+    det_validado: int
+    regras_cruzadas: int
+
+
+def validated_type(cs_type: CsType) -> str | None:
+    """``AbstractValidator<CreateChapaDto>`` -> ``CreateChapaDto``."""
+    for base in cs_type.bases:
+        head, _, inner = base.partition("<")
+        if head.rsplit(".", 1)[-1] == "AbstractValidator" and inner.endswith(">"):
+            args = split_top_level(inner[:-1])
+            if len(args) == 1:
+                return TypeRef.parse(args[0]).name
+    return None
+
+
+def scan_validators(
+    index: CsIndex, prefix: str | None = VALIDATORS_DIR.as_posix() + "/"
+) -> dict[str, list[ValidatorInfo]]:
+    """Validators under ``prefix`` (``None``: the whole index) grouped by the DTO they validate."""
+    found: dict[str, tuple[str, CsType]] = {}
+    for rel, cs_type in index.iter_types(prefix):
+        if is_validator(cs_type):
+            found[cs_type.name] = (rel, cs_type)
+
+    fields_cache: dict[str, tuple[str, ...]] = {}
+
+    def fields_of(name: str, stack: tuple[str, ...]) -> tuple[str, ...]:
+        # Only top-level results are cached: inside a cycle the result is cut
+        # short by the caller's stack and would be wrong for any other caller.
+        if not stack and name in fields_cache:
+            return fields_cache[name]
+        if name in stack or name not in found:
+            return ()
+        names: dict[str, None] = {}
+        for rule in found[name][1].rules:
+            if rule.child:
+                nested = fields_of(rule.child, (*stack, name))
+                names.update(dict.fromkeys(f"{rule.property}.{f}" for f in nested))
+                if nested:
+                    continue
+            if rule.property:
+                names[rule.property] = None
+        fields = tuple(names)
+        if not stack:
+            fields_cache[name] = fields
+        return fields
+
+    result: dict[str, list[ValidatorInfo]] = defaultdict(list)
+    for name, (rel, cs_type) in sorted(found.items()):
+        dto = validated_type(cs_type)
+        if dto is None:
+            continue
+        result[dto].append(
+            ValidatorInfo(
+                name=name,
+                dto=dto,
+                file=rel,
+                fields=fields_of(name, ()),
+                rules=len(cs_type.rules),
+                checks=sum(len(r.checks) for r in cs_type.rules),
+                cross_field=sum(1 for r in cs_type.rules if r.cross_field),
+                children=tuple(sorted({r.child for r in cs_type.rules if r.child})),
+            )
+        )
+    return dict(result)
+
+
+def actions_by_type(actions: Iterable[ActionMetrics]) -> dict[str, list[ActionMetrics]]:
+    """Request type name (wrappers such as ``List<T>`` unwrapped) -> actions receiving it."""
+    table: dict[str, list[ActionMetrics]] = defaultdict(list)
+    for metrics in actions:
+        for text in metrics.request:
+            table[TypeRef.parse(text).unwrap().name].append(metrics)
+    return dict(table)
+
+
+def join_endpoints(
+    validators: dict[str, list[ValidatorInfo]], by_type: dict[str, list[ActionMetrics]], dtos: DtoIndex
+) -> list[EndpointValidation]:
+    rows = []
+    for dto, infos in validators.items():
+        actions = by_type.get(dto, ())
+        det_dto = dtos.info(dto).det if actions else 0
+        fields = {f for info in infos for f in info.fields}
+        for m in actions:
+            rows.append(
+                EndpointValidation(
+                    controller=m.controller,
+                    action=m.action,
+                    verb=m.verb,
+                    template=m.template,
+                    tipo=m.tipo,
+                    dto=dto,
+                    validator=", ".join(info.name for info in infos),
+                    det_acao=m.det,
+                    det_dto=det_dto,
+                    det_validado=len(fields),
+                    regras_cruzadas=sum(info.cross_field for info in infos),
+                )
+            )
+    rows.sort(key=lambda r: (r.controller, r.action))
+    return rows
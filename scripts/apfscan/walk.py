@@ -0,0 +1,209 @@
+"""Pruning, ``.gitignore``-aware directory walker.
+
+Built on ``os.scandir`` so the ``DirEntry`` objects (and their cached
+``stat``/type data) are handed straight to callers. Build output such as
+``bin/``, ``obj/``, ``dist/``, ``.turbo/`` and ``node_modules/`` is pruned
+before it is ever listed.
+"""
+from __future__ import annotations
+
+import os
+import re
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Any
+
+DEFAULT_EXCLUDES: frozenset[str] = frozenset(
+    {
+        ".git",
+        ".turbo",
+        ".vite",
+        ".next",
+        "node_modules",
+        "bin",
+        "obj",
+        "dist",
+        "coverage",
+        "__pycache__",
+    }
+)
+
+
+def _glob_to_regex(glob: str) -> str:
+    out: list[str] = []
+    i = 0
+    while i < len(glob):
+        c = glob[i]
+        if glob.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+            continue
+        if glob.startswith("/**", i) and i + 3 == len(glob):
+            out.append("/.*")
+            i += 3
+            continue
+        if c == "*":
+            if glob.startswith("**", i):
+                out.append(".*")
+                i += 2
+                continue
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            end = glob.find("]", i + 1)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                body = glob[i + 1 : end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = end
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+class GitIgnore:
+    """Rules of one ``.gitignore`` file, matched relative to its directory.
+
+    Supports the commonly used subset of the format: comments, ``!``
+    negation, trailing ``/`` (directories only), anchored patterns and
+    ``**``. The last matching rule wins, as in git.
+    """
+
+    def __init__(self, base: str, lines: Iterable[str]) -> None:
+        self.base = base
+        self.rules: list[tuple[re.Pattern[str], bool, bool]] = []
+        for raw in lines:
+            line = raw.rstrip("\n").rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            if line.startswith("\\"):
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            if not line:
+                continue
+            anchored = "/" in line
+            line = line.lstrip("/")
+            body = _glob_to_regex(line)
+            pattern = re.compile(body if anchored else f"(?:.*/)?{body}")
+            self.rules.append((pattern, negate, dir_only))
+
+    @classmethod
+    def load(cls, directory: str) -> GitIgnore | None:
+        path = os.path.join(directory, ".gitignore")
+        try:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                ignore = cls(directory, f)
+        except OSError:
+            return None
+        return ignore if ignore.rules else None
+
+    def match(self, path: str, is_dir: bool) -> bool | None:
+        """True (ignored), False (re-included by ``!``) or None (no rule)."""
+        rel = os.path.relpath(path, self.base).replace(os.sep, "/")
+        result: bool | None = None
+        for pattern, negate, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if pattern.fullmatch(rel):
+                result = not negate
+        return result
+
+
+def _is_ignored(path: str, is_dir: bool, ignores: tuple[GitIgnore, ...]) -> bool:
+    ignored = False
+    for ignore in ignores:
+        verdict = ignore.match(path, is_dir)
+        if verdict is not None:
+            ignored = verdict
+    return ignored
+
+
+def walk_files(
+    root: str | os.PathLike[str],
+    extensions: Iterable[str] | None = None,
+    *,
+    exclude: Iterable[str] = DEFAULT_EXCLUDES,
+    use_gitignore: bool = True,
+    recursive: bool = True,
+) -> Iterator[os.DirEntry[str]]:
+    """Yield ``DirEntry`` objects for files under ``root``, in sorted order.
+
+    ``extensions`` filters by suffix (``".cs"``, ``".tsx"``; any ``str.endswith``
+    suffix such as ``"Controller.cs"`` also works). ``exclude`` names
+    directories that are never entered. ``.gitignore`` files found along the
+    way (and in the parents of ``root`` up to the repository top) are honored.
+    """
+    root = os.fspath(root)
+    suffixes = tuple(extensions) if extensions is not None else None
+    excluded = frozenset(exclude)
+
+    ignores: tuple[GitIgnore, ...] = ()
+    if use_gitignore:
+        ignores = tuple(_parent_ignores(root))
+
+    stack: list[tuple[str, tuple[GitIgnore, ...]]] = [(root, ignores)]
+    while stack:
+        directory, inherited = stack.pop()
+        if use_gitignore and directory != root:
+            local = GitIgnore.load(directory)
+            if local is not None:
+                inherited = inherited + (local,)
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            continue
+
+        subdirs: list[str] = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if not recursive or entry.name in excluded:
+                    continue
+                if inherited and _is_ignored(entry.path, True, inherited):
+                    continue
+                subdirs.append(entry.path)
+            elif entry.is_file():
+                if suffixes is not None and not entry.name.endswith(suffixes):
+                    continue
+                if inherited and _is_ignored(entry.path, False, inherited):
+                    continue
+                yield entry
+        for path in reversed(subdirs):
+            stack.append((path, inherited))
+
+
+def _parent_ignores(root: str) -> Iterator[GitIgnore]:
+    """``.gitignore`` files from the enclosing repository top down to ``root``."""
+    chain: list[str] = []
+    current = os.path.abspath(root)
+    while True:
+        chain.append(current)
+        if os.path.exists(os.path.join(current, ".git")):
+            break
+        parent = os.path.dirname(current)
+        if parent == current:
+            chain = [os.path.abspath(root)]
+            break
+        current = parent
+    for directory in reversed(chain):
+        ignore = GitIgnore.load(directory)
+        if ignore is not None:
+            yield ignore
+
+
+def walk_paths(
+    root: str | os.PathLike[str],
+    extensions: Iterable[str] | None = None,
+    **kwargs: Any,
+) -> list[Path]:
+    """Convenience wrapper returning sorted ``Path`` objects."""
+    return [Path(entry.path) for entry in walk_files(root, extensions, **kwargs)]
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""Offline benchmark suite for the APF / accent scripts.
+
+Generates a synthetic repository (see ``apfscan/synthetic.py``), times the
+scan, parse, render and rewrite stages of every script against it and
+writes the results as JSON. ``--compare`` checks a run against a previous
+JSON and exits non-zero on regressions, so it can gate performance changes.
+
+Usage:
+  python3 scripts/bench_apf.py --output output/bench/apf.json
+  python3 scripts/bench_apf.py --controllers 200 --actions 30 --pages 2000 --xlsx-rows 100000
+  python3 scripts/bench_apf.py --compare output/bench/apf.json --tolerance 0.25
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import importlib.util
+import json
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+from apfscan.deltapoint import write_deltapoint_xlsx
+from apfscan.depgraph import action_reach
+from apfscan.dtos import load_dto_index
+from apfscan.efmodel import load_ef_model
+from apfscan.explorer import write_explorer
+from apfscan.snapshot import get_code_snapshot, parse_apf_totals
+from apfscan.synthetic import CONTROLLERS_DIR, XLSX_NAME, SyntheticParams, generate_tree
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+
+def load_script(filename: str) -> ModuleType:
+    """Import a script by path (``fix-accents.py`` is not a valid module name)."""
+    name = filename.removesuffix(".py").replace("-", "_")
+    spec = importlib.util.spec_from_file_location(name, SCRIPTS_DIR / filename)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def measure(fn: Callable[[], Any], repeat: int, setup: Callable[[], Any] | None = None) -> dict[str, Any]:
+    runs: list[float] = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+    return {
+        "min": min(runs),
+        "median": statistics.median(runs),
+        "max": max(runs),
+        "runs": runs,
+    }
+
+
+def bench_recount(tree: Path, repeat: int) -> dict[str, Any]:
+    recount = load_script("recount_apf_snapshot.py")
+    recount.set_root(tree)
+    cs_index = recount.CS_INDEX
+
+    md_text = recount.DOC_APF.read_text(encoding="utf-8")
+    totals = parse_apf_totals(md_text)
+    snapshot = get_code_snapshot(tree, cs_index)
+    model = load_ef_model(tree)
+    entities = [e.short_name for e in model.tables()]
+    index = load_dto_index(tree, entities, cs_index).index
+    return {
+        "scan": measure(lambda: get_code_snapshot(tree, cs_index), repeat),
+        "parse_ef_model": measure(lambda: load_ef_model(tree), repeat),
+        "index_dtos_cold": measure(lambda: load_dto_index(tree, entities, None), repeat),
+        "index_dtos_warm": measure(lambda: load_dto_index(tree, entities, cs_index), repeat),
+        "ftr_graph": measure(lambda: action_reach(index, model), repeat),
+        "parse": measure(lambda: parse_apf_totals(md_text), repeat),
+        "render_markdown": measure(lambda: recount.build_markdown(totals, snapshot), repeat),
+        "render_pdf": measure(lambda: recount.build_pdf(totals, snapshot, recount.OUT_PDF), repeat),
+    }
+
+
+def bench_gap_report(tree: Path, repeat: int) -> dict[str, Any]:
+    gap = load_script("generate_apf_gap_report.py")
+    explorer = load_script("apf_explorer.py")
+    xlsx = tree / XLSX_NAME
+    controllers = tree / CONTROLLERS_DIR
+    output_pdf = tree / "output" / "pdf" / "gap.pdf"
+    output_pdf.parent.mkdir(parents=True, exist_ok=True)
+
+    resumo, rows = gap.load_deltapoint_xlsx(xlsx)
+    counts = gap.count_api_endpoints(controllers)
+    return {
+        "parse": measure(lambda: gap.load_deltapoint_xlsx(xlsx), repeat),
+        "scan": measure(lambda: gap.count_api_endpoints(controllers), repeat),
+        "export_xlsx": measure(
+            lambda: write_deltapoint_xlsx(
+                tree / "output" / "xlsx" / "export.xlsx",
+                ((r.funcao, r.tipo, r.ctl, r.pfb, r.pfl) for r in rows),
+                sistema=resumo.sistema,
+            ),
+            repeat,
+        ),
+        "render_explorer": measure(
+            lambda: write_explorer(
+                tree / "output" / "explorer",
+                [explorer.estimate_table(rows)],
+                title=resumo.sistema,
+            ),
+            repeat,
+        ),
+        "render_pdf": measure(
+            lambda: gap.build_pdf(
+                output_pdf=output_pdf,
+                deltapoint_xlsx_name=xlsx.name,
+                deltapoint_resumo=resumo,
+                deltapoint_rows=rows,
+                controller_counts=counts,
+                analysis_date="2026-01-01",
+            ),
+            repeat,
+        ),
+    }
+
+
+def bench_fix_accents(tree: Path, repeat: int, params: SyntheticParams) -> dict[str, Any]:
+    fix = load_script("fix-accents.py")
+    apps = tree / "apps"
+    pristine = tree / "output" / "pristine-apps"
+    shutil.copytree(apps, pristine)
+
+    def files() -> list[str]:
+        return sorted(e.path for e in fix.walk_files(apps, (".tsx",)))
+
+    def restore() -> None:
+        shutil.rmtree(apps)
+        shutil.copytree(pristine, apps)
+
+    def rewrite() -> None:
+        for path in files():
+            fix.process_file(path)
+
+    def patch() -> None:
+        for path in files():
+            fix.process_file(path, str(tree), emit_patch=True)
+
+    return {
+        "scan": measure(files, repeat),
+        "render_patch": measure(patch, repeat, setup=restore),
+        "rewrite": measure(rewrite, repeat, setup=restore),
+    }
+
+
+BENCHES: dict[str, Callable[[Path, int, SyntheticParams], dict[str, Any]]] = {
+    "recount_apf_snapshot": lambda tree, repeat, _params: bench_recount(tree, repeat),
+    "generate_apf_gap_report": lambda tree, repeat, _params: bench_gap_report(tree, repeat),
+    "fix_accents": bench_fix_accents,
+}
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    """Stages whose median got slower than ``baseline * (1 + tolerance)``."""
+    regressions: list[str] = []
+    for script, stages in current["results"].items():
+        base_stages = baseline.get("results", {}).get(script, {})
+        for stage, stats in stages.items():
+            base = base_stages.get(stage)
+            if not isinstance(stats, dict) or not isinstance(base, dict) or "median" not in base:
+                continue
+            if stats["median"] > base["median"] * (1 + tolerance):
+                ratio = stats["median"] / base["median"] if base["median"] else float("inf")
+                regressions.append(
+                    f"{script}.{stage}: {base['median'] * 1000:.1f} ms -> {stats['median'] * 1000:.1f} ms ({ratio:.2f}x)"
+                )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark dos scripts APF em repositorio sintetico.")
+    defaults = SyntheticParams()
+    parser.add_argument("--controllers", type=int, default=defaults.controllers)
+    parser.add_argument("--actions", type=int, default=defaults.actions, help="Acoes por controller.")
+    parser.add_argument("--entity-modules", type=int, default=defaults.entity_modules)
+    parser.add_argument("--entities-per-module", type=int, default=defaults.entities_per_module)
+    parser.add_argument("--services", type=int, default=defaults.services)
+    parser.add_argument("--pages", type=int, default=defaults.pages, help="Paginas .tsx (admin + public).")
+    parser.add_argument("--xlsx-rows", type=int, default=defaults.xlsx_rows)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--only",
+        action="append",
+        choices=sorted(BENCHES),
+        help="Roda apenas o(s) script(s) indicado(s).",
+    )
+    parser.add_argument("--output", type=Path, help="Grava o resultado em JSON.")
+    parser.add_argument("--compare", type=Path, help="JSON de uma execucao anterior para comparar.")
+    parser.add_argument("--tolerance", type=float, default=0.20, help="Regressao tolerada (0.20 = 20%%).")
+    parser.add_argument("--keep-tree", action="store_true", help="Nao remove o repositorio sintetico.")
+    args = parser.parse_args()
+
+    params = SyntheticParams(
+        controllers=args.controllers,
+        actions=args.actions,
+        entity_modules=args.entity_modules,
+        entities_per_module=args.entities_per_module,
+        services=args.services,
+        pages=args.pages,
+        xlsx_rows=args.xlsx_rows,
+        seed=args.seed,
+    )
+
+    tmp = Path(tempfile.mkdtemp(prefix="apf-bench-"))
+    tree = tmp / "repo"
+    try:
+        start = time.perf_counter()
+        try:
+            generate_tree(tree, params)
+        except ImportError:
+            generate_tree(tree, params, xlsx=False)
+        generate_seconds = time.perf_counter() - start
+
+        results: dict[str, Any] = {}
+        for name in args.only or sorted(BENCHES):
+            try:
+                results[name] = BENCHES[name](tree, args.repeat, params)
+            except ImportError as exc:
+                # reportlab/openpyxl are optional for a benchmark run.
+                results[name] = {"skipped": f"dependencia ausente: {exc.name}"}
+            print(f"{name}:", file=sys.stderr)
+            for stage, stats in results[name].items():
+                if isinstance(stats, dict):
+                    print(f"  {stage:<16} {stats['median'] * 1000:10.1f} ms (min {stats['min'] * 1000:.1f})", file=sys.stderr)
+                else:
+                    print(f"  {stage}: {stats}", file=sys.stderr)
+    finally:
+        if args.keep_tree:
+            print(f"Repositorio sintetico: {tree}", file=sys.stderr)
+        else:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    report = {
+        "generated_at": dt.datetime.now().astimezone().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": params.to_dict(),
+        "repeat": args.repeat,
+        "generate_seconds": generate_seconds,
+        "results": results,
+    }
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"Resultado gravado em: {args.output}", file=sys.stderr)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        if baseline.get("params") != report["params"]:
+            print("Aviso: parametros diferentes do baseline; comparacao pode nao ser valida.", file=sys.stderr)
+        regressions = compare(report, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSAO {line}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
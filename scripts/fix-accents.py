@@ -8,9 +8,23 @@ Does NOT touch:
   - Property names, type definitions
   - String literals in code
   - Anything that's not pure JSX text content
+
+Usage:
+  python3 scripts/fix-accents.py               # rewrite files in place
+  python3 scripts/fix-accents.py --emit-patch  # print a unified diff, touch nothing
+  python3 scripts/fix-accents.py --mine        # rank unaccented words worth adding to WORDS
 """
-import re
+import argparse
+import difflib
 import os
+import re
+import sys
+import tempfile
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+
+from apfscan import bytescan
+from apfscan.walk import DEFAULT_EXCLUDES, walk_files
 
 WORDS = {
     'Eleicoes': 'Eleições', 'eleicoes': 'eleições',
@@ -146,6 +160,11 @@ PHRASES = {
 
 _sorted_words = sorted(WORDS.keys(), key=len, reverse=True)
 _word_pattern = re.compile(r'\b(' + '|'.join(re.escape(w) for w in _sorted_words) + r')\b')
+# Byte-level prefilter: a file without any WORDS/PHRASES key can't change,
+# so it is never decoded.
+_needle_pattern = re.compile(
+    b'|'.join(re.escape(k.encode('utf-8')) for k in sorted(set(WORDS) | set(PHRASES), key=len, reverse=True))
+)
 
 def apply_fixes(text):
     text = _word_pattern.sub(lambda m: WORDS.get(m.group(0), m.group(0)), text)
@@ -154,10 +173,7 @@ def apply_fixes(text):
     return text
 
 
-def process_file(filepath):
-    with open(filepath, 'r', encoding='utf-8') as f:
-        original = f.read()
-
+def fix_text(original):
     lines = original.split('\n')
     fixed_lines = []
 
@@ -180,33 +196,285 @@ def process_file(filepath):
 
         fixed_lines.append(result)
 
-    fixed = '\n'.join(fixed_lines)
+    return '\n'.join(fixed_lines)
+
+
+def atomic_write(filepath, text):
+    """Write via a temp file in the same directory + os.replace, so a crash
+    never leaves a truncated file behind."""
+    directory = os.path.dirname(filepath)
+    fd, tmp_path = tempfile.mkstemp(prefix='.fix-accents-', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, os.stat(filepath).st_mode & 0o7777)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def unified_patch(rel, original, fixed):
+    """git-apply compatible diff (a/ b/ prefixes, "no newline" markers)."""
+    out = []
+    diff = difflib.unified_diff(
+        original.splitlines(keepends=True),
+        fixed.splitlines(keepends=True),
+        fromfile=f'a/{rel}',
+        tofile=f'b/{rel}',
+    )
+    for line in diff:
+        if line.endswith('\n'):
+            out.append(line)
+        else:
+            out.append(line + '\n\\ No newline at end of file\n')
+    if not out:
+        return ''
+    return f'diff --git a/{rel} b/{rel}\n' + ''.join(out)
+
+
+def process_file(filepath, project_root=None, emit_patch=False):
+    """Returns True/False (file rewritten) or, with emit_patch, the diff text."""
+    if not bytescan.contains(filepath, _needle_pattern):
+        return '' if emit_patch else False
+    with open(filepath, 'r', encoding='utf-8', newline='') as f:
+        original = f.read()
+
+    fixed = fix_text(original)
+    if emit_patch:
+        if fixed == original:
+            return ''
+        rel = os.path.relpath(filepath, project_root).replace(os.sep, '/')
+        return unified_patch(rel, original, fixed)
+
     if fixed != original:
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(fixed)
+        atomic_write(filepath, fixed)
         return True
     return False
 
 
-def main():
+def _process_job(job):
+    filepath, project_root, emit_patch = job
+    return process_file(filepath, project_root, emit_patch)
+
+
+# ---------------------------------------------------------------------------
+# Mining mode: discover candidate WORDS entries from the user-visible corpus
+# ---------------------------------------------------------------------------
+
+MINE_SOURCES = [
+    ('apps/admin/src', ('.tsx', '.ts')),
+    ('apps/public/src', ('.tsx', '.ts')),
+    ('docs/Sistema legado/Eleitoral-Frontend/src', ('.html', '.ts')),
+    ('docs/Sistema legado/Eleitoral-Profissional-Frontend/src', ('.html', '.ts')),
+]
+
+# Scanned as bytes over an mmap; only the captured spans are decoded.
+# Text nodes between tags (JSX and Angular templates, may span lines).
+_text_node_pattern = re.compile(rb'>([^<>{}]+)<')
+# Attributes rendered to the user, even when they hold a single word.
+_attr_pattern = re.compile(
+    rb'\b(?:placeholder|title|label|alt|aria-label)\s*=\s*(["\'])([^"\'{}]+)\1'
+)
+# String literals with at least one space are prose (messages, toasts, labels);
+# identifiers, routes and CSS classes rarely are.
+_prose_literal_pattern = re.compile(rb'([\'"`])((?:(?!\1)[^\\\n])*?[A-Za-z\x80-\xff] [^\\\n]*?)\1')
+_token_pattern = re.compile(r'[^\W\d_]{3,}')
+
+
+def fold_accents(word):
+    return ''.join(
+        c for c in unicodedata.normalize('NFD', word) if unicodedata.category(c) != 'Mn'
+    )
+
+
+class LossyCounter:
+    """Streaming frequency counter with bounded memory (Manku-Motwani lossy
+    counting). Counts are under-estimated by at most epsilon * N, and every
+    token with a true frequency above that bound is kept."""
+
+    def __init__(self, epsilon=1e-4):
+        self.width = max(1, int(round(1 / epsilon)))
+        self.bucket = 1
+        self.n = 0
+        self.counts = {}  # token -> [count, max_error]
+
+    def add(self, token):
+        self.n += 1
+        entry = self.counts.get(token)
+        if entry is None:
+            self.counts[token] = [1, self.bucket - 1]
+        else:
+            entry[0] += 1
+        if self.n % self.width == 0:
+            bucket = self.bucket
+            self.counts = {t: e for t, e in self.counts.items() if e[0] + e[1] > bucket}
+            self.bucket += 1
+
+    def update(self, tokens):
+        for token in tokens:
+            self.add(token)
+
+    def get(self, token, default=0):
+        entry = self.counts.get(token)
+        return entry[0] if entry else default
+
+    def most_common(self):
+        return sorted(((t, e[0]) for t, e in self.counts.items()), key=lambda i: (-i[1], i[0]))
+
+
+def iter_visible_text(buf, ext):
+    for _, span in bytescan.iter_spans(buf, _text_node_pattern, 1):
+        yield span
+    for _, span in bytescan.iter_spans(buf, _attr_pattern, 2):
+        yield span
+    if ext == '.ts' or ext == '.tsx':
+        for _, span in bytescan.iter_spans(buf, _prose_literal_pattern, 2):
+            yield span
+
+
+def iter_mine_files(project_root, exclude=DEFAULT_EXCLUDES):
+    for rel_dir, exts in MINE_SOURCES:
+        base = os.path.join(project_root, rel_dir)
+        for entry in walk_files(base, exts, exclude=exclude):
+            if not entry.name.endswith('.spec.ts'):
+                yield entry.path, os.path.splitext(entry.name)[1]
+
+
+def load_lexicon(path):
+    """One word per line (e.g. a hunspell/aspell pt_BR word list)."""
+    words = set()
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            word = line.split('/', 1)[0].strip()
+            if word and not word.isascii():
+                words.add(word)
+    return words
+
+
+def mine_candidates(project_root, lexicon=(), epsilon=1e-4, exclude=DEFAULT_EXCLUDES):
+    """Stream the corpus once and return [(token, count, suggestion, seen)],
+    ranked by occurrence. `seen` is how often the accented form itself occurs."""
+    counter = LossyCounter(epsilon)
+    scanned = 0
+    for filepath, ext in iter_mine_files(project_root, exclude):
+        with bytescan.mapped(filepath) as buf:
+            for chunk in iter_visible_text(buf, ext):
+                counter.update(_token_pattern.findall(chunk))
+        scanned += 1
+
+    # folded (lowercase, unaccented) -> accented lowercase form
+    accented = {}
+    for word in list(lexicon) + list(WORDS.values()):
+        accented.setdefault(fold_accents(word).lower(), word.lower())
+    for token, count in counter.most_common():
+        if not token.isascii():
+            accented[fold_accents(token).lower()] = token.lower()
+
+    known = set(WORDS)
+    candidates = []
+    for token, count in counter.most_common():
+        if not token.isascii() or token in known:
+            continue
+        target = accented.get(token.lower())
+        if target is None:
+            continue
+        if token.isupper():
+            suggestion = target.upper()
+        elif token[0].isupper():
+            suggestion = target[0].upper() + target[1:]
+        else:
+            suggestion = target
+        seen = counter.get(suggestion) + (counter.get(target) if suggestion != target else 0)
+        candidates.append((token, count, suggestion, seen))
+    return candidates, scanned
+
+
+def exclude_dirs(args):
+    return DEFAULT_EXCLUDES | set(args.exclude)
+
+
+def run_mine(project_root, args):
+    lexicon = load_lexicon(args.lexicon) if args.lexicon else ()
+    candidates, scanned = mine_candidates(project_root, lexicon, exclude=exclude_dirs(args))
+    candidates = [c for c in candidates if c[1] >= args.min_count][: args.top]
+
+    print(f"# {len(candidates)} candidates from {scanned} files (min count {args.min_count})")
+    print(f"# {'token':<24} {'count':>7}  {'accented':<24} {'seen':>6}")
+    for token, count, suggestion, seen in candidates:
+        print(f"# {token:<24} {count:>7}  {suggestion:<24} {seen:>6}")
+    print()
+    print('# Paste into WORDS after review:')
+    for token, _count, suggestion, _seen in candidates:
+        print(f"    '{token}': '{suggestion}',")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Fix Portuguese diacritics in JSX text content.')
+    parser.add_argument(
+        '--emit-patch',
+        action='store_true',
+        help='Print one unified diff for all files to stdout instead of rewriting them.',
+    )
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=os.cpu_count() or 1,
+        help='Number of worker processes (default: CPU count).',
+    )
+    parser.add_argument(
+        '--exclude',
+        action='append',
+        default=[],
+        metavar='DIR',
+        help='Extra directory name to skip (repeatable); build output and .gitignore are always skipped.',
+    )
+    parser.add_argument(
+        '--mine',
+        action='store_true',
+        help='Report frequent unaccented tokens that have an accented counterpart (no changes).',
+    )
+    parser.add_argument('--lexicon', help='Extra word list (one accented word per line) for --mine.')
+    parser.add_argument('--top', type=int, default=100, help='Max candidates reported by --mine.')
+    parser.add_argument('--min-count', type=int, default=2, help='Min occurrences reported by --mine.')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
     project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     apps_dir = os.path.join(project_root, 'apps')
 
-    tsx_files = []
-    for root, dirs, files in os.walk(apps_dir):
-        dirs[:] = [d for d in dirs if d != 'node_modules']
-        for f in files:
-            if f.endswith('.tsx'):
-                tsx_files.append(os.path.join(root, f))
+    if args.mine:
+        run_mine(project_root, args)
+        return
+
+    tsx_files = sorted(e.path for e in walk_files(apps_dir, ('.tsx',), exclude=exclude_dirs(args)))
+
+    # In patch mode stdout carries only the diff; progress goes to stderr.
+    log = sys.stderr if args.emit_patch else sys.stdout
+    jobs = [(filepath, project_root, args.emit_patch) for filepath in tsx_files]
 
     modified = 0
-    for filepath in sorted(tsx_files):
-        rel = os.path.relpath(filepath, project_root)
-        if process_file(filepath):
-            print(f"  ✏️  {rel}")
+    with ProcessPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+        # map() yields in submission order, so the patch is deterministic.
+        for filepath, result in zip(tsx_files, executor.map(_process_job, jobs, chunksize=16)):
+            if not result:
+                continue
             modified += 1
+            if args.emit_patch:
+                sys.stdout.write(result)
+            else:
+                rel = os.path.relpath(filepath, project_root)
+                print(f"  ✏️  {rel}", file=log)
 
-    print(f"\n✅ Fixed accents in {modified} files (out of {len(tsx_files)} scanned)")
+    verb = 'Would fix' if args.emit_patch else 'Fixed'
+    print(f"\n✅ {verb} accents in {modified} files (out of {len(tsx_files)} scanned)", file=log)
 
 
 if __name__ == '__main__':
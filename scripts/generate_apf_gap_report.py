@@ -1,121 +1,52 @@
 #!/usr/bin/env python3
+"""PDF da analise de gap APF (Deltapoint x codigo).
+
+O PDF fica no cache de build (``apfscan.buildcache``), pela chave do XLSX
+(nome e hash dos bytes), da contagem de endpoints por controller e da
+versao do renderizador; com as mesmas entradas o PDF e copiado do cache,
+sem ler a planilha nem montar o layout. A data impressa e a do ultimo
+commit nos controllers, nao a da execucao, entao rodadas noturnas sem
+mudanca no codigo reaproveitam o PDF. ``--no-cache`` renderiza de novo.
+"""
 from __future__ import annotations
 
 import argparse
 import datetime as dt
-import re
-from collections import Counter
-from dataclasses import dataclass
+import subprocess
 from pathlib import Path
 from typing import Any
 
-import openpyxl
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
-from reportlab.lib.units import cm
-from reportlab.platypus import (
-    PageBreak,
-    Paragraph,
-    SimpleDocTemplate,
-    Spacer,
-    Table,
-    TableStyle,
+from apfscan import columns, deltapoint
+from apfscan.buildcache import DEFAULT_BUILD_CACHE, BuildCache, build_key, renderer_version
+from apfscan.deltapoint import (
+    DeltapointResumo,
+    DeltapointTable,
+    count_api_endpoints,
+    load_deltapoint_xlsx,
 )
 
 
-@dataclass(frozen=True)
-class DeltapointFunctionRow:
-    row: int
-    funcao: str
-    tipo: str
-    ctl: str | None
-    pfb: float
-    pfl: float
-
-
-@dataclass(frozen=True)
-class DeltapointResumo:
-    sistema: str
-    contador: str
-    tipo_contagem: str
-    total_pf: float
-
-
-def _cell_str(value: Any) -> str:
-    if value is None:
-        return ""
-    return str(value).strip()
-
-
-def load_deltapoint_xlsx(xlsx_path: Path) -> tuple[DeltapointResumo, list[DeltapointFunctionRow]]:
-    wb = openpyxl.load_workbook(xlsx_path, data_only=True)
-
-    if "Resumo" not in wb.sheetnames or "Funções" not in wb.sheetnames:
-        raise ValueError("Planilha inesperada: abas 'Resumo' e 'Funções' nao encontradas.")
-
-    ws_resumo = wb["Resumo"]
-    ws_funcoes = wb["Funções"]
-
-    sistema = _cell_str(ws_resumo["D10"].value) or "Portal Candidato"
-    contador = _cell_str(ws_resumo["D12"].value) or ""
-    tipo_contagem = _cell_str(ws_resumo["D13"].value) or ""
-    total_pf = float(ws_resumo["D15"].value or 0)
-
-    rows: list[DeltapointFunctionRow] = []
-    for r in range(3, ws_funcoes.max_row + 1):
-        funcao = _cell_str(ws_funcoes.cell(r, 1).value)
-        tipo = _cell_str(ws_funcoes.cell(r, 2).value)
-        if not funcao and not tipo:
-            continue
-        if not funcao or not tipo:
-            continue
-
-        ctl = _cell_str(ws_funcoes.cell(r, 10).value) or None  # J: ctl (ex: SEA, EEA, ALIL)
-        pfb = float(ws_funcoes.cell(r, 16).value or 0)  # P: PFB
-        pfl = float(ws_funcoes.cell(r, 17).value or 0)  # Q: PFL
-
-        rows.append(
-            DeltapointFunctionRow(
-                row=r,
-                funcao=funcao,
-                tipo=tipo,
-                ctl=ctl,
-                pfb=pfb,
-                pfl=pfl,
-            )
-        )
-
-    resumo = DeltapointResumo(
-        sistema=sistema,
-        contador=contador,
-        tipo_contagem=tipo_contagem,
-        total_pf=total_pf,
-    )
-    return resumo, rows
-
-
-def count_api_endpoints(controllers_dir: Path) -> list[tuple[str, int]]:
-    pattern = re.compile(r"\[Http(Get|Post|Put|Delete|Patch)\b")
-    items: list[tuple[str, int]] = []
-    for p in sorted(controllers_dir.glob("*Controller.cs")):
-        if p.name == "BaseController.cs":
-            continue
-        text = p.read_text(encoding="utf-8")
-        cnt = len(pattern.findall(text))
-        items.append((p.name, cnt))
-    # Desc by endpoints
-    items.sort(key=lambda x: x[1], reverse=True)
-    return items
-
-
 def build_pdf(
     output_pdf: Path,
     deltapoint_xlsx_name: str,
     deltapoint_resumo: DeltapointResumo,
-    deltapoint_rows: list[DeltapointFunctionRow],
+    deltapoint_rows: DeltapointTable,
     controller_counts: list[tuple[str, int]],
+    analysis_date: str,
 ) -> None:
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+    from reportlab.lib.units import cm
+    from reportlab.platypus import (
+        PageBreak,
+        Paragraph,
+        SimpleDocTemplate,
+        Spacer,
+        Table,
+        TableStyle,
+    )
+
     styles = getSampleStyleSheet()
     styles.add(
         ParagraphStyle(
@@ -145,16 +76,14 @@ def build_pdf(
         )
     )
 
-    analysis_date = dt.date.today().strftime("%Y-%m-%d")
-
     def P(text: str, style_name: str = "Normal") -> Paragraph:
         # Use Paragraph to ensure proper wrapping inside Table cells.
         return Paragraph(text, styles[style_name])
 
     # Deltapoint breakdown
-    tipo_counts = Counter(r.tipo for r in deltapoint_rows)
-    pfb_total = sum(r.pfb for r in deltapoint_rows)
-    pfl_total = sum(r.pfl for r in deltapoint_rows)
+    tipo_counts = deltapoint_rows.count_by_tipo()
+    pfb_total = deltapoint_rows.total("pfb")
+    pfl_total = deltapoint_rows.total("pfl")
 
     # API endpoints breakdown
     total_controllers = len(controller_counts)
@@ -176,7 +105,7 @@ def build_pdf(
 
     story.append(Paragraph("Relatorio Tecnico - Analise de Gap em APF", styles["Title"]))
     story.append(Paragraph("Projeto: CAU Sistema Eleitoral (Migrado)", styles["Normal"]))
-    story.append(Paragraph(f"Data do relatorio: {analysis_date}", styles["Normal"]))
+    story.append(Paragraph(f"Data de referencia do codigo: {analysis_date}", styles["Normal"]))
     story.append(Spacer(1, 10))
 
     story.append(Paragraph("1. Objetivo", styles["H1"]))
@@ -295,8 +224,7 @@ def build_pdf(
     # Valores observados no arquivo: ALI simples (7), EE medio (4), CE medio (4), SE medio (5)
     weights = {"ALI": "7", "AIE": "5", "EE": "4", "CE": "4", "SE": "5"}
     pf_by_type = {"ALI": 0.0, "AIE": 0.0, "EE": 0.0, "CE": 0.0, "SE": 0.0}
-    for r in deltapoint_rows:
-        pf_by_type[r.tipo] = pf_by_type.get(r.tipo, 0.0) + r.pfb
+    pf_by_type.update(deltapoint_rows.pf_by_tipo("pfb"))
 
     for tipo in ["ALI", "AIE", "EE", "CE", "SE"]:
         if tipo_counts.get(tipo, 0) == 0 and pf_by_type.get(tipo, 0.0) == 0:
@@ -485,6 +413,20 @@ def build_pdf(
     doc.build(story)
 
 
+def code_date(controllers_dir: Path) -> str:
+    """Date of the last commit touching ``controllers_dir``; today outside a git checkout."""
+    try:
+        result = subprocess.run(
+            ["git", "log", "-1", "--format=%cs", "--", "."],
+            cwd=controllers_dir,
+            capture_output=True,
+            text=True,
+        )
+    except OSError:
+        return dt.date.today().isoformat()
+    return result.stdout.strip() or dt.date.today().isoformat()
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description="Gera PDF de analise de gap APF (Deltapoint vs codigo).")
     parser.add_argument(
@@ -505,6 +447,13 @@ def main() -> int:
         default=Path("output/pdf/relatorio-gap-apf-deltapoint-vs-codigo.pdf"),
         help="Caminho de saida do PDF.",
     )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=DEFAULT_BUILD_CACHE,
+        help="Diretorio do cache de build.",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Renderiza de novo mesmo sem mudanca nas entradas.")
     args = parser.parse_args()
 
     xlsx_path: Path = args.deltapoint_xlsx
@@ -516,19 +465,28 @@ def main() -> int:
     if not controllers_dir.exists():
         raise SystemExit(f"Diretorio de controllers nao encontrado: {controllers_dir}")
 
-    output_pdf.parent.mkdir(parents=True, exist_ok=True)
-
-    resumo, rows = load_deltapoint_xlsx(xlsx_path)
     controller_counts = count_api_endpoints(controllers_dir)
-
-    build_pdf(
-        output_pdf=output_pdf,
-        deltapoint_xlsx_name=xlsx_path.name,
-        deltapoint_resumo=resumo,
-        deltapoint_rows=rows,
-        controller_counts=controller_counts,
+    analysis_date = code_date(controllers_dir)
+    # Everything the PDF prints is in the key, stamps included; none of it is the wall clock.
+    key = build_key(
+        renderer_version(
+            [Path(__file__), Path(deltapoint.__file__), Path(columns.__file__)], packages=("reportlab", "openpyxl")
+        ),
+        {"xlsx": xlsx_path, "xlsx_name": xlsx_path.name, "controllers": controller_counts, "data": analysis_date},
     )
 
+    def render(dest: Path) -> None:
+        resumo, rows = load_deltapoint_xlsx(xlsx_path)
+        build_pdf(
+            output_pdf=dest,
+            deltapoint_xlsx_name=xlsx_path.name,
+            deltapoint_resumo=resumo,
+            deltapoint_rows=rows,
+            controller_counts=controller_counts,
+            analysis_date=analysis_date,
+        )
+
+    BuildCache(args.cache_dir).render(key, output_pdf, render, force=args.no_cache)
     print(str(output_pdf))
     return 0
 
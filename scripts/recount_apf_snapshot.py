@@ -1,182 +1,59 @@
 #!/usr/bin/env python3
+"""Recontagem APF do codigo migrado: Markdown, PDF e historico SQLite.
+
+A varredura fica em ``apfscan.snapshot``; este script so renderiza. O
+ReportLab e importado apenas quando o PDF e gerado, entao ``--json`` e
+``--no-pdf`` iniciam sem ele. O PDF fica no cache de build
+(``apfscan.buildcache``), pela chave do baseline, do snapshot e da versao
+do renderizador: ele imprime o commit e a data do commit, nunca a hora da
+execucao, entao uma noite sem mudanca no codigo copia o PDF do cache.
+``--no-cache`` renderiza de novo. O Markdown (que traz a data/hora do
+snapshot) e sempre renderizado. ``--serve`` mantem o indice em memoria,
+atualiza a partir dos arquivos alterados e responde consultas JSON.
+
+Usage:
+  python3 scripts/recount_apf_snapshot.py
+  python3 scripts/recount_apf_snapshot.py --root /caminho/do/checkout --no-pdf
+  python3 scripts/recount_apf_snapshot.py --json
+  python3 scripts/recount_apf_snapshot.py --no-cache
+  python3 scripts/recount_apf_snapshot.py --serve 8765
+    curl localhost:8765/summary
+    curl localhost:8765/controllers/ImpugnacaoController
+    curl localhost:8765/modules/Denuncias
+"""
 from __future__ import annotations
 
+import argparse
 import datetime as dt
-import re
-import subprocess
-from dataclasses import dataclass
+import json
+import threading
+import time
+from dataclasses import asdict, replace
 from pathlib import Path
 
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
-from reportlab.lib.units import cm
-from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+from apfscan.buildcache import DEFAULT_BUILD_CACHE, BuildCache, build_key, renderer_version
+from apfscan.snapshot import ApfTotals, CodeSnapshot, get_code_snapshot, parse_apf_totals
+from apfscan.store import SnapshotStore
 
-ROOT = Path("/Users/brunosouza/Development/cau-eleitoral-migrado")
+ROOT = Path(__file__).resolve().parent.parent
 DOC_APF = ROOT / "docs" / "contagem-apf.md"
 OUT_MD = ROOT / "docs" / f"contagem-apf-snapshot-{dt.date.today().isoformat()}.md"
 OUT_PDF = ROOT / "output" / "pdf" / f"contagem-apf-snapshot-{dt.date.today().isoformat()}.pdf"
+CS_INDEX = ROOT / "output" / "cache" / "csharp-index.json"
+HISTORY_DB = ROOT / "output" / "apf-history.sqlite"
+BUILD_CACHE = ROOT / DEFAULT_BUILD_CACHE
 
 
-@dataclass
-class ApfTotals:
-    ali_qty: int
-    ali_pf: int
-    aie_qty: int
-    aie_pf: int
-    ee_qty: int
-    ee_pf: int
-    ce_qty: int
-    ce_pf: int
-    se_qty: int
-    se_pf: int
-    total_funcoes: int
-    total_nao_ajustado: int
-    vaf: float
-    total_ajustado: int
-
-
-@dataclass
-class CodeSnapshot:
-    commit: str
-    generated_at: str
-    entidades: int
-    controllers_total: int
-    controllers_funcionais: int
-    endpoints: int
-    http_get: int
-    http_post: int
-    http_put: int
-    http_delete: int
-    http_patch: int
-    services_app: int
-    pages_admin: int
-    pages_public: int
-    entity_by_module: list[tuple[str, int]]
-    endpoints_by_controller: list[tuple[str, int]]
-
-
-def run(cmd: str) -> str:
-    result = subprocess.run(
-        cmd,
-        shell=True,
-        check=True,
-        text=True,
-        capture_output=True,
-        cwd=ROOT,
-    )
-    return result.stdout.strip()
-
-
-def parse_apf_totals(md_text: str) -> ApfTotals:
-    def extract(pattern: str) -> str:
-        match = re.search(pattern, md_text, flags=re.MULTILINE)
-        if not match:
-            raise RuntimeError(f"Pattern not found: {pattern}")
-        return match.group(1).replace(".", "")
-
-    ali_qty, ali_pf = re.search(
-        r"\| \*\*ALI\*\* .*?\| ([0-9.]+) \| ([0-9.]+) \|", md_text
-    ).groups()
-    aie_qty, aie_pf = re.search(
-        r"\| \*\*AIE\*\* .*?\| ([0-9.]+) \| ([0-9.]+) \|", md_text
-    ).groups()
-    ee_qty, ee_pf = re.search(
-        r"\| \*\*EE\*\* .*?\| ([0-9.]+) \| ([0-9.]+) \|", md_text
-    ).groups()
-    ce_qty, ce_pf = re.search(
-        r"\| \*\*CE\*\* .*?\| ([0-9.]+) \| ([0-9.]+) \|", md_text
-    ).groups()
-    se_qty, se_pf = re.search(
-        r"\| \*\*SE\*\* .*?\| ([0-9.]+) \| ([0-9.]+) \|", md_text
-    ).groups()
-
-    total_funcoes = int(extract(r"\| \*\*Total de Funções Identificadas\*\* \| ([0-9.]+) \|"))
-    total_nao_ajustado = int(extract(r"\| \*\*TOTAL NÃO AJUSTADO\*\* \| \*\*[0-9.]+\*\* \| \*\*([0-9.]+) PF\*\* \|"))
-    total_ajustado = int(extract(r"\| \*\*Pontos de Função Ajustados\*\* \| \*\*([0-9.]+) PF\*\* \|"))
-
-    vaf_match = re.search(r"\| \*\*Fator de Ajuste \(VAF\)\*\* \| \*\*([0-9.,]+)\*\* \|", md_text)
-    if not vaf_match:
-        raise RuntimeError("VAF not found in contagem-apf.md")
-    vaf = float(vaf_match.group(1).replace(",", "."))
-
-    return ApfTotals(
-        ali_qty=int(ali_qty.replace(".", "")),
-        ali_pf=int(ali_pf.replace(".", "")),
-        aie_qty=int(aie_qty.replace(".", "")),
-        aie_pf=int(aie_pf.replace(".", "")),
-        ee_qty=int(ee_qty.replace(".", "")),
-        ee_pf=int(ee_pf.replace(".", "")),
-        ce_qty=int(ce_qty.replace(".", "")),
-        ce_pf=int(ce_pf.replace(".", "")),
-        se_qty=int(se_qty.replace(".", "")),
-        se_pf=int(se_pf.replace(".", "")),
-        total_funcoes=total_funcoes,
-        total_nao_ajustado=total_nao_ajustado,
-        vaf=vaf,
-        total_ajustado=total_ajustado,
-    )
-
-
-def count_entities_by_module() -> list[tuple[str, int]]:
-    entities_root = ROOT / "apps" / "api" / "CAU.Eleitoral.Domain" / "Entities"
-    if not entities_root.exists():
-        raise RuntimeError(f"Diretorio nao encontrado: {entities_root}")
-
-    class_pattern = re.compile(r"public\s+(?:partial\s+)?class\s+\w+\s*:\s*BaseEntity\b")
-    result: list[tuple[str, int]] = []
-
-    for module_dir in sorted(p for p in entities_root.iterdir() if p.is_dir()):
-        module_total = 0
-        for cs_file in module_dir.rglob("*.cs"):
-            text = cs_file.read_text(encoding="utf-8")
-            if class_pattern.search(text):
-                module_total += 1
-        result.append((module_dir.name, module_total))
-
-    return result
-
-
-def count_endpoints_by_controller() -> list[tuple[str, int]]:
-    controllers_root = ROOT / "apps" / "api" / "CAU.Eleitoral.Api" / "Controllers"
-    if not controllers_root.exists():
-        raise RuntimeError(f"Diretorio nao encontrado: {controllers_root}")
-
-    endpoint_pattern = re.compile(r"\[Http(Get|Post|Put|Delete|Patch)\b")
-    rows: list[tuple[str, int]] = []
-    for controller_file in sorted(controllers_root.glob("*Controller.cs")):
-        if controller_file.name == "BaseController.cs":
-            continue
-        text = controller_file.read_text(encoding="utf-8")
-        rows.append((controller_file.stem, len(endpoint_pattern.findall(text))))
-
-    rows.sort(key=lambda item: (-item[1], item[0]))
-    return rows
-
-
-def get_code_snapshot() -> CodeSnapshot:
-    entity_by_module = count_entities_by_module()
-    endpoints_by_controller = count_endpoints_by_controller()
-
-    return CodeSnapshot(
-        commit=run("git rev-parse --short HEAD"),
-        generated_at=run("date '+%Y-%m-%d %H:%M:%S %z'"),
-        entidades=sum(qty for _, qty in entity_by_module),
-        controllers_total=int(run("find apps/api/CAU.Eleitoral.Api/Controllers -name '*Controller.cs' | wc -l | tr -d ' '")),
-        controllers_funcionais=len(endpoints_by_controller),
-        endpoints=sum(qty for _, qty in endpoints_by_controller),
-        http_get=int(run(r"rg -n '\[HttpGet' apps/api/CAU.Eleitoral.Api/Controllers --glob '*Controller.cs' | wc -l | tr -d ' '")),
-        http_post=int(run(r"rg -n '\[HttpPost' apps/api/CAU.Eleitoral.Api/Controllers --glob '*Controller.cs' | wc -l | tr -d ' '")),
-        http_put=int(run(r"rg -n '\[HttpPut' apps/api/CAU.Eleitoral.Api/Controllers --glob '*Controller.cs' | wc -l | tr -d ' '")),
-        http_delete=int(run(r"rg -n '\[HttpDelete' apps/api/CAU.Eleitoral.Api/Controllers --glob '*Controller.cs' | wc -l | tr -d ' '")),
-        http_patch=int(run(r"rg -n '\[HttpPatch' apps/api/CAU.Eleitoral.Api/Controllers --glob '*Controller.cs' | wc -l | tr -d ' '")),
-        services_app=int(run("find apps/api/CAU.Eleitoral.Application/Services -name '*Service.cs' | wc -l | tr -d ' '")),
-        pages_admin=int(run("find apps/admin/src/pages -name '*.tsx' | wc -l | tr -d ' '")),
-        pages_public=int(run("find apps/public/src/pages -name '*.tsx' | wc -l | tr -d ' '")),
-        entity_by_module=entity_by_module,
-        endpoints_by_controller=endpoints_by_controller,
-    )
+def set_root(root: Path) -> None:
+    """Point every default input/output path at ``root``."""
+    global ROOT, DOC_APF, OUT_MD, OUT_PDF, CS_INDEX, HISTORY_DB, BUILD_CACHE
+    ROOT = root
+    DOC_APF = root / "docs" / DOC_APF.name
+    OUT_MD = root / "docs" / OUT_MD.name
+    OUT_PDF = root / "output" / "pdf" / OUT_PDF.name
+    CS_INDEX = root / "output" / "cache" / CS_INDEX.name
+    HISTORY_DB = root / "output" / HISTORY_DB.name
+    BUILD_CACHE = root / DEFAULT_BUILD_CACHE
 
 
 def fmt_int(value: int) -> str:
@@ -197,6 +74,12 @@ def build_markdown(t: ApfTotals, s: CodeSnapshot) -> str:
 
     status = "OK" if all(consistency.values()) else "ALERTA"
 
+    ali_model_qty = sum(r.tabelas for r in s.ali_by_module)
+    ali_model_pf = sum(r.pf for r in s.ali_by_module)
+    trans = s.transacoes_by_controller
+    trans_qty = sum(r.acoes for r in trans)
+    trans_pf = sum(r.pf for r in trans)
+
     lines = [
         "# Recontagem APF - Snapshot do Codigo Migrado",
         "",
@@ -233,8 +116,8 @@ def build_markdown(t: ApfTotals, s: CodeSnapshot) -> str:
         f"| Endpoints DELETE | {fmt_int(s.http_delete)} |",
         f"| Endpoints PATCH | {fmt_int(s.http_patch)} |",
         f"| Services de aplicacao (`*Service.cs`) | {fmt_int(s.services_app)} |",
-        f"| Paginas Admin (`apps/admin/src/pages/*.tsx`) | {fmt_int(s.pages_admin)} |",
-        f"| Paginas Public (`apps/public/src/pages/*.tsx`) | {fmt_int(s.pages_public)} |",
+        f"| Paginas Admin (componentes roteados em `apps/admin/src/App.tsx`) | {fmt_int(s.pages_admin)} |",
+        f"| Paginas Public (componentes roteados em `apps/public/src/App.tsx`) | {fmt_int(s.pages_public)} |",
         "",
         "### 2.1 Entidades de dominio por modulo",
         "",
@@ -263,12 +146,118 @@ def build_markdown(t: ApfTotals, s: CodeSnapshot) -> str:
         [
             f"| **Total** | **{fmt_int(s.endpoints)}** |",
             "",
+            "### 2.3 Complexidade dos ALI (modelo EF Core)",
+            "",
+            "DET = colunas de negocio (sem `Id`/auditoria/`IsDeleted`) + colunas de tipos owned; "
+            "RET = 1 + tipos owned + tabelas filhas 1:N com exclusao em cascata. Fonte: `AppDbContextModelSnapshot.cs`.",
+            "",
+            "| Modulo | Tabelas | DET | Baixa | Media | Alta | PF |",
+            "|---|---:|---:|---:|---:|---:|---:|",
+        ]
+    )
+
+    for row in s.ali_by_module:
+        lines.append(
+            f"| {row.modulo} | {fmt_int(row.tabelas)} | {fmt_int(row.det_total)} | {fmt_int(row.baixa)} "
+            f"| {fmt_int(row.media)} | {fmt_int(row.alta)} | {fmt_int(row.pf)} |"
+        )
+
+    lines.extend(
+        [
+            f"| **Total** | **{fmt_int(ali_model_qty)}** | **{fmt_int(sum(r.det_total for r in s.ali_by_module))}** "
+            f"| **{fmt_int(sum(r.baixa for r in s.ali_by_module))}** | **{fmt_int(sum(r.media for r in s.ali_by_module))}** "
+            f"| **{fmt_int(sum(r.alta for r in s.ali_by_module))}** | **{fmt_int(ali_model_pf)}** |",
+            "",
+            "### 2.4 Complexidade das transacoes (DTOs)",
+            "",
+            "Uma transacao por acao de controller: GET = CE (SE quando relatorio/exportacao/estatistica), "
+            "demais verbos = EE. DET = campos dos DTOs de entrada e saida (aninhados e herdados achatados) + 1; "
+            "FTR = entidades referenciadas pelos DTOs.",
+            "",
+            "| Controller | Acoes | EE | CE | SE | DET | Baixa | Media | Alta | PF |",
+            "|---|---:|---:|---:|---:|---:|---:|---:|---:|---:|",
+        ]
+    )
+
+    for row in trans:
+        lines.append(
+            f"| {row.controller} | {fmt_int(row.acoes)} | {fmt_int(row.ee)} | {fmt_int(row.ce)} | {fmt_int(row.se)} "
+            f"| {fmt_int(row.det_total)} | {fmt_int(row.baixa)} | {fmt_int(row.media)} | {fmt_int(row.alta)} | {fmt_int(row.pf)} |"
+        )
+
+    lines.extend(
+        [
+            f"| **Total** | **{fmt_int(trans_qty)}** | **{fmt_int(sum(r.ee for r in trans))}** "
+            f"| **{fmt_int(sum(r.ce for r in trans))}** | **{fmt_int(sum(r.se for r in trans))}** "
+            f"| **{fmt_int(sum(r.det_total for r in trans))}** | **{fmt_int(sum(r.baixa for r in trans))}** "
+            f"| **{fmt_int(sum(r.media for r in trans))}** | **{fmt_int(sum(r.alta for r in trans))}** "
+            f"| **{fmt_int(trans_pf)}** |",
+            "",
+            "### 2.5 Uso dos endpoints pelos frontends",
+            "",
+            "Chamadas HTTP extraidas de `apps/admin/src/services` e `apps/public/src/services`, casadas com as rotas "
+            "dos controllers por metodo + caminho normalizado. Chamada orfa = sem rota correspondente na API.",
+            "",
+            "| Controller | Endpoints | Usados | Nao usados | Chamadas |",
+            "|---|---:|---:|---:|---:|",
+        ]
+    )
+
+    for row in s.uso_by_controller:
+        lines.append(
+            f"| {row.controller} | {fmt_int(row.endpoints)} | {fmt_int(row.usados)} | {fmt_int(row.nao_usados)} "
+            f"| {fmt_int(row.chamadas)} |"
+        )
+
+    lines.extend(
+        [
+            f"| **Total** | **{fmt_int(sum(r.endpoints for r in s.uso_by_controller))}** "
+            f"| **{fmt_int(sum(r.usados for r in s.uso_by_controller))}** "
+            f"| **{fmt_int(sum(r.nao_usados for r in s.uso_by_controller))}** "
+            f"| **{fmt_int(sum(r.chamadas for r in s.uso_by_controller))}** |",
+            "",
+            "| App | Service | Chamadas | Casadas | Orfas |",
+            "|---|---|---:|---:|---:|",
+        ]
+    )
+
+    for row in s.uso_by_service:
+        lines.append(
+            f"| {row.app} | {row.modulo} | {fmt_int(row.chamadas)} | {fmt_int(row.casadas)} | {fmt_int(row.orfas)} |"
+        )
+
+    lines.extend(
+        [
+            f"| **Total** | | **{fmt_int(sum(r.chamadas for r in s.uso_by_service))}** "
+            f"| **{fmt_int(sum(r.casadas for r in s.uso_by_service))}** "
+            f"| **{fmt_int(sum(r.orfas for r in s.uso_by_service))}** |",
+            "",
+            "### 2.6 Rotas e paginas (React Router)",
+            "",
+            "Rotas lidas de `App.tsx` (e modulos de rotas aninhados), com o componente de pagina resolvido pelos "
+            "imports e `lazy(() => import(...))`. Layouts e redirecionamentos nao contam como tela.",
+            "",
+            "| App | Rota | Componente | Tipo | Lazy |",
+            "|---|---|---|---|---|",
+        ]
+    )
+
+    for rota in s.rotas:
+        lines.append(
+            f"| {rota.app} | `{rota.path}` | {rota.component or '-'} | {rota.kind} | {'sim' if rota.lazy else 'nao'} |"
+        )
+
+    lines.extend(
+        [
+            "",
         "## 3. Checagens de Consistencia",
         "",
         f"- ALI da contagem ({t.ali_qty}) == entidades do codigo ({s.entidades}): **{'OK' if consistency['ALI_vs_entidades'] else 'ALERTA'}**",
         f"- Soma de funcoes (ALI+AIE+EE+CE+SE) == total funcoes ({t.total_funcoes}): **{'OK' if consistency['formula_funcoes'] else 'ALERTA'}**",
         f"- Soma de PF por tipo == total nao ajustado ({t.total_nao_ajustado}): **{'OK' if consistency['formula_nao_ajustado'] else 'ALERTA'}**",
         f"- Calculo de PF ajustado (nao ajustado x VAF) == total ajustado ({t.total_ajustado}): **{'OK' if consistency['formula_ajustado'] else 'ALERTA'}**",
+        f"- PF de ALI pelo modelo EF Core ({fmt_int(ali_model_pf)}, {fmt_int(ali_model_qty)} tabelas) vs contagem ({fmt_int(t.ali_pf)}): **diferenca {fmt_int(ali_model_pf - t.ali_pf)} PF** (informativo)",
+        f"- PF de transacoes pelos DTOs ({fmt_int(trans_pf)}, {fmt_int(trans_qty)} acoes) vs EE+CE+SE da contagem ({fmt_int(t.ee_pf + t.ce_pf + t.se_pf)}): **diferenca {fmt_int(trans_pf - (t.ee_pf + t.ce_pf + t.se_pf))} PF** (informativo)",
         "",
         "## 4. Conclusao",
         "",
@@ -279,8 +268,14 @@ def build_markdown(t: ApfTotals, s: CodeSnapshot) -> str:
     return "\n".join(lines)
 
 
-def build_pdf(t: ApfTotals, s: CodeSnapshot) -> None:
-    OUT_PDF.parent.mkdir(parents=True, exist_ok=True)
+def build_pdf(t: ApfTotals, s: CodeSnapshot, output_pdf: Path) -> None:
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+    from reportlab.lib.units import cm
+    from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+    output_pdf.parent.mkdir(parents=True, exist_ok=True)
 
     styles = getSampleStyleSheet()
     title = ParagraphStyle(
@@ -318,7 +313,7 @@ def build_pdf(t: ApfTotals, s: CodeSnapshot) -> None:
     )
 
     doc = SimpleDocTemplate(
-        str(OUT_PDF),
+        str(output_pdf),
         pagesize=A4,
         leftMargin=2.0 * cm,
         rightMargin=2.0 * cm,
@@ -330,7 +325,7 @@ def build_pdf(t: ApfTotals, s: CodeSnapshot) -> None:
 
     story = []
     story.append(Paragraph("Recontagem APF - Snapshot do Codigo Migrado", title))
-    story.append(Paragraph(f"Data/hora: {s.generated_at} | Commit: {s.commit}", subtitle))
+    story.append(Paragraph(f"Commit: {s.commit} | Data do commit: {s.committed_at}", subtitle))
     story.append(Paragraph("1. Resultado APF", h2))
 
     table_data = [
@@ -374,8 +369,8 @@ def build_pdf(t: ApfTotals, s: CodeSnapshot) -> None:
         ["Endpoints DELETE", fmt_int(s.http_delete)],
         ["Endpoints PATCH", fmt_int(s.http_patch)],
         ["Services de aplicacao (*Service.cs)", fmt_int(s.services_app)],
-        ["Paginas Admin (pages/*.tsx)", fmt_int(s.pages_admin)],
-        ["Paginas Public (pages/*.tsx)", fmt_int(s.pages_public)],
+        ["Paginas Admin (rotas em App.tsx)", fmt_int(s.pages_admin)],
+        ["Paginas Public (rotas em App.tsx)", fmt_int(s.pages_public)],
     ]
     metrics_table = Table(metrics_data, colWidths=[10.5 * cm, 5.5 * cm])
     metrics_table.setStyle(
@@ -442,23 +437,229 @@ def build_pdf(t: ApfTotals, s: CodeSnapshot) -> None:
     story.append(controllers_table)
     story.append(Spacer(1, 0.35 * cm))
 
+    if s.ali_by_module:
+        story.append(Paragraph("5. Complexidade ALI (modelo EF Core)", h2))
+        ali_data = [["Modulo", "Tabelas", "DET", "Baixa", "Media", "Alta", "PF"]]
+        for row in s.ali_by_module:
+            ali_data.append(
+                [
+                    row.modulo,
+                    fmt_int(row.tabelas),
+                    fmt_int(row.det_total),
+                    fmt_int(row.baixa),
+                    fmt_int(row.media),
+                    fmt_int(row.alta),
+                    fmt_int(row.pf),
+                ]
+            )
+        ali_data.append(
+            [
+                "Total",
+                fmt_int(sum(r.tabelas for r in s.ali_by_module)),
+                fmt_int(sum(r.det_total for r in s.ali_by_module)),
+                fmt_int(sum(r.baixa for r in s.ali_by_module)),
+                fmt_int(sum(r.media for r in s.ali_by_module)),
+                fmt_int(sum(r.alta for r in s.ali_by_module)),
+                fmt_int(sum(r.pf for r in s.ali_by_module)),
+            ]
+        )
+        ali_table = Table(ali_data, colWidths=[4.5 * cm] + [1.9 * cm] * 6)
+        ali_table.setStyle(
+            TableStyle(
+                [
+                    ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1e3a8a")),
+                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+                    ("GRID", (0, 0), (-1, -1), 0.5, colors.HexColor("#cbd5e1")),
+                    ("ROWBACKGROUNDS", (0, 1), (-1, -2), [colors.white, colors.HexColor("#f8fafc")]),
+                    ("BACKGROUND", (0, -1), (-1, -1), colors.HexColor("#e2e8f0")),
+                    ("FONTNAME", (0, -1), (-1, -1), "Helvetica-Bold"),
+                    ("FONTSIZE", (0, 0), (-1, -1), 9),
+                    ("ALIGN", (1, 1), (-1, -1), "RIGHT"),
+                ]
+            )
+        )
+        story.append(ali_table)
+        story.append(Spacer(1, 0.35 * cm))
+
+    if s.transacoes_by_controller:
+        story.append(Paragraph("6. Complexidade das transacoes (DTOs)", h2))
+        trans_data = [["Controller", "Acoes", "EE", "CE", "SE", "DET", "PF"]]
+        for row in s.transacoes_by_controller:
+            trans_data.append(
+                [
+                    row.controller,
+                    fmt_int(row.acoes),
+                    fmt_int(row.ee),
+                    fmt_int(row.ce),
+                    fmt_int(row.se),
+                    fmt_int(row.det_total),
+                    fmt_int(row.pf),
+                ]
+            )
+        trans_data.append(
+            [
+                "Total",
+                fmt_int(sum(r.acoes for r in s.transacoes_by_controller)),
+                fmt_int(sum(r.ee for r in s.transacoes_by_controller)),
+                fmt_int(sum(r.ce for r in s.transacoes_by_controller)),
+                fmt_int(sum(r.se for r in s.transacoes_by_controller)),
+                fmt_int(sum(r.det_total for r in s.transacoes_by_controller)),
+                fmt_int(sum(r.pf for r in s.transacoes_by_controller)),
+            ]
+        )
+        trans_table = Table(trans_data, colWidths=[5.5 * cm] + [1.75 * cm] * 6)
+        trans_table.setStyle(
+            TableStyle(
+                [
+                    ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1e3a8a")),
+                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+                    ("GRID", (0, 0), (-1, -1), 0.5, colors.HexColor("#cbd5e1")),
+                    ("ROWBACKGROUNDS", (0, 1), (-1, -2), [colors.white, colors.HexColor("#f8fafc")]),
+                    ("BACKGROUND", (0, -1), (-1, -1), colors.HexColor("#e2e8f0")),
+                    ("FONTNAME", (0, -1), (-1, -1), "Helvetica-Bold"),
+                    ("FONTSIZE", (0, 0), (-1, -1), 9),
+                    ("ALIGN", (1, 1), (-1, -1), "RIGHT"),
+                ]
+            )
+        )
+        story.append(trans_table)
+        story.append(Spacer(1, 0.35 * cm))
+
+    if s.uso_by_controller:
+        story.append(Paragraph("7. Uso dos endpoints pelos frontends", h2))
+        uso_data = [["Controller", "Endpoints", "Usados", "Nao usados", "Chamadas"]]
+        for row in s.uso_by_controller:
+            uso_data.append(
+                [
+                    row.controller,
+                    fmt_int(row.endpoints),
+                    fmt_int(row.usados),
+                    fmt_int(row.nao_usados),
+                    fmt_int(row.chamadas),
+                ]
+            )
+        uso_data.append(
+            [
+                "Total",
+                fmt_int(sum(r.endpoints for r in s.uso_by_controller)),
+                fmt_int(sum(r.usados for r in s.uso_by_controller)),
+                fmt_int(sum(r.nao_usados for r in s.uso_by_controller)),
+                fmt_int(sum(r.chamadas for r in s.uso_by_controller)),
+            ]
+        )
+        uso_table = Table(uso_data, colWidths=[6.0 * cm] + [2.5 * cm] * 4)
+        uso_table.setStyle(
+            TableStyle(
+                [
+                    ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1e3a8a")),
+                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+                    ("GRID", (0, 0), (-1, -1), 0.5, colors.HexColor("#cbd5e1")),
+                    ("ROWBACKGROUNDS", (0, 1), (-1, -2), [colors.white, colors.HexColor("#f8fafc")]),
+                    ("BACKGROUND", (0, -1), (-1, -1), colors.HexColor("#e2e8f0")),
+                    ("FONTNAME", (0, -1), (-1, -1), "Helvetica-Bold"),
+                    ("FONTSIZE", (0, 0), (-1, -1), 9),
+                    ("ALIGN", (1, 1), (-1, -1), "RIGHT"),
+                ]
+            )
+        )
+        story.append(uso_table)
+        story.append(Spacer(1, 0.35 * cm))
+
     story.append(Paragraph("Conclusao: a recontagem confirma os totais APF do baseline para o codigo migrado atual.", body))
 
     doc.build(story)
 
 
-def main() -> None:
+def serve(host: str, port: int, poll_interval: float) -> int:
+    from apfscan.live import LiveSnapshot, make_server, make_watcher
+
+    start = time.perf_counter()
+    live = LiveSnapshot(ROOT, CS_INDEX)
+    live.save()
+    watcher = make_watcher(ROOT, poll_interval)
+    server = make_server(live, host, port)
+    print(f"Indice carregado em {time.perf_counter() - start:.2f} s ({type(watcher).__name__})")
+    print(f"Servindo em http://{host}:{server.server_address[1]}/ (snapshot, summary, modules, controllers, routes)")
+
+    def on_change(paths: set[str]) -> None:
+        began = time.perf_counter()
+        if live.apply(paths):
+            print(f"Atualizado: {len(paths)} arquivo(s) em {(time.perf_counter() - began) * 1000:.0f} ms", flush=True)
+
+    stop = threading.Event()
+    thread = threading.Thread(target=watcher.run, args=(on_change, stop), daemon=True)
+    thread.start()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.server_close()
+        thread.join()
+        live.save()
+    return 0
+
+
+def pdf_cache_key(t: ApfTotals, s: CodeSnapshot) -> str:
+    """Build-cache key of the PDF: it prints the commit date, never ``generated_at``."""
+    return build_key(
+        renderer_version([Path(__file__)], packages=("reportlab",)),
+        {"totals": t, "snapshot": replace(s, generated_at="")},
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Recontagem APF do codigo migrado.")
+    parser.add_argument("--root", type=Path, help="Raiz do repositorio (padrao: o checkout deste script).")
+    parser.add_argument("--json", action="store_true", help="Imprime baseline e snapshot em JSON, sem gravar arquivos.")
+    parser.add_argument("--no-pdf", action="store_true", help="Gera apenas o Markdown (sem ReportLab).")
+    parser.add_argument("--no-cache", action="store_true", help="Renderiza o PDF de novo mesmo sem mudanca nas entradas.")
+    parser.add_argument(
+        "--serve",
+        type=int,
+        metavar="PORTA",
+        help="Modo continuo: mantem o indice em memoria e responde JSON em http://HOST:PORTA.",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Endereco do modo --serve (padrao: 127.0.0.1).")
+    parser.add_argument(
+        "--poll-interval", type=float, default=1.0, help="Intervalo de varredura sem watchdog, em segundos."
+    )
+    args = parser.parse_args(argv)
+    if args.root is not None:
+        set_root(args.root.resolve())
+    if args.serve is not None:
+        return serve(args.host, args.serve, args.poll_interval)
+
     md_text = DOC_APF.read_text(encoding="utf-8")
     totals = parse_apf_totals(md_text)
-    snapshot = get_code_snapshot()
+    snapshot = get_code_snapshot(ROOT, CS_INDEX)
+
+    if args.json:
+        print(json.dumps({"totals": asdict(totals), "snapshot": asdict(snapshot)}, ensure_ascii=False, indent=2))
+        return 0
 
     report_md = build_markdown(totals, snapshot)
     OUT_MD.write_text(report_md, encoding="utf-8")
-
-    build_pdf(totals, snapshot)
     print(f"Markdown gerado em: {OUT_MD}")
-    print(f"PDF gerado em: {OUT_PDF}")
+
+    if not args.no_pdf:
+        hit = BuildCache(BUILD_CACHE).render(
+            pdf_cache_key(totals, snapshot),
+            OUT_PDF,
+            lambda p: build_pdf(totals, snapshot, p),
+            force=args.no_cache,
+        )
+        print(f"PDF {'copiado do cache' if hit else 'gerado'} em: {OUT_PDF}")
+
+    with SnapshotStore(HISTORY_DB) as store:
+        snapshot_id = store.save(totals, snapshot)
+    print(f"Historico gravado em: {HISTORY_DB} (snapshot {snapshot_id})")
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    raise SystemExit(main())
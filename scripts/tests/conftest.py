@@ -0,0 +1,7 @@
+"""The scripts run from ``scripts/`` and import ``apfscan`` as a top-level package."""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
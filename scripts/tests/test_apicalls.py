@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from apfscan.apicalls import ApiRoute, HttpCall, join_calls, usage_by_controller
+
+
+def test_call_matching_several_routes_counts_once():
+    routes = [
+        ApiRoute("ChapaController", "GetById", "GET", "api/chapa/{id}"),
+        ApiRoute("ChapaController", "GetByCodigo", "GET", "api/chapa/{codigo}"),
+        ApiRoute("ChapaController", "Create", "POST", "api/chapa"),
+    ]
+    calls = [
+        HttpCall("admin", "chapaService", "GET", "/chapa/${id}", 14),  # both GET routes share its key
+        HttpCall("admin", "chapaService", "POST", "/chapa", 20),
+    ]
+    usage = join_calls(routes, calls)
+    assert sum(len(hits) for hits in usage.used.values()) == 3
+    (row,) = usage_by_controller(usage)
+    assert (row.endpoints, row.usados, row.nao_usados, row.chamadas) == (3, 3, 0, 2)
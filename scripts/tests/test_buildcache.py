@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from dataclasses import replace
+
+from apfscan.buildcache import BuildCache, build_key
+from apfscan.snapshot import ApfTotals, CodeSnapshot
+from recount_apf_snapshot import pdf_cache_key
+
+
+def test_stamps_are_part_of_the_key(tmp_path):
+    xlsx = tmp_path / "deltapoint.xlsx"
+    xlsx.write_bytes(b"planilha")
+    inputs = {"xlsx": xlsx, "xlsx_name": xlsx.name, "data": "2026-10-19"}
+    assert build_key("r1", inputs) == build_key("r1", dict(inputs))
+    assert build_key("r1", inputs) != build_key("r1", {**inputs, "data": "2026-10-20"})
+    assert build_key("r1", inputs) != build_key("r2", inputs)
+    before = build_key("r1", inputs)
+    xlsx.write_bytes(b"planilha nova")
+    assert build_key("r1", inputs) != before  # files are keyed by their bytes
+
+
+def test_render_hits_only_for_the_same_key(tmp_path):
+    cache = BuildCache(tmp_path / "cache")
+    dest = tmp_path / "out" / "relatorio.pdf"
+    builds = []
+
+    def build(path):
+        builds.append(path)
+        path.write_text(f"build {len(builds)}")
+
+    assert cache.render("aa11", dest, build) is False
+    assert cache.render("aa11", dest, build) is True
+    assert cache.render("bb22", dest, build) is False
+    assert cache.render("bb22", dest, build, force=True) is False
+    assert len(builds) == 3
+    assert dest.read_text() == "build 3"
+
+
+def test_recount_pdf_key_ignores_the_wall_clock():
+    totals = ApfTotals(*range(14))
+    snapshot = CodeSnapshot("abc1234", "2026-10-19 02:00:00 -0300", *range(12), [], [], committed_at="2026-10-18")
+    nightly = replace(snapshot, generated_at="2026-10-20 02:00:00 -0300")
+    assert pdf_cache_key(totals, snapshot) == pdf_cache_key(totals, nightly)
+    assert pdf_cache_key(totals, snapshot) != pdf_cache_key(totals, replace(snapshot, commit="def5678"))
+    assert pdf_cache_key(totals, snapshot) != pdf_cache_key(totals, replace(snapshot, endpoints=300))
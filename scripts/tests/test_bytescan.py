@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import re
+
+import pytest
+
+from apfscan import bytescan
+
+
+def test_mapped_empty_file(tmp_path):
+    path = tmp_path / "empty.cs"
+    path.write_bytes(b"")
+    with bytescan.mapped(path) as data:
+        assert data == b""
+    assert bytescan.count(path, re.compile(rb"\[Http")) == 0
+
+
+@pytest.mark.parametrize("content", [b"", b"[HttpGet]\n"])
+@pytest.mark.parametrize("error", [OSError, ValueError])
+def test_mapped_propagates_body_errors(tmp_path, content, error):
+    path = tmp_path / "file.cs"
+    path.write_bytes(content)
+    with pytest.raises(error, match="body"):
+        with bytescan.mapped(path):
+            raise error("body")
+
+
+def test_find_groups_decodes_only_spans(tmp_path):
+    path = tmp_path / "c.cs"
+    path.write_bytes('[HttpGet("eleição")]\n[HttpPost]\n'.encode())
+    assert bytescan.find_groups(path, re.compile(rb"\[Http(\w+)"), 1) == ["Get", "Post"]
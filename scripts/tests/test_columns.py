@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import random
+from array import array
+
+import pytest
+
+from apfscan import columns
+from apfscan.columns import CODE_TYPECODE, VALUE_TYPECODE, Categories, column_sum, group_count, group_sum
+
+
+def sample() -> tuple[array, array, Categories]:
+    rng = random.Random(7)
+    cats = Categories()
+    labels = ["EE", "CE", "SE", "ALI", None]
+    codes = array(CODE_TYPECODE)
+    values = array(VALUE_TYPECODE)
+    for _ in range(5000):
+        codes.append(cats.code(rng.choice(labels)))
+        values.append(rng.choice((0.0, 3.0, 4.5, 7.0)))
+    cats.code("AIE")  # declared, never used: must not appear
+    codes.append(cats.code("NULO"))
+    values.append(0.0)  # present with a zero total: must appear
+    return codes, values, cats
+
+
+def aggregate(codes: array, values: array, cats: Categories) -> tuple:
+    return group_count(codes, cats), group_sum(codes, values, cats), column_sum(values)
+
+
+def test_numpy_matches_fallback(monkeypatch):
+    pytest.importorskip("numpy")
+    data = sample()
+    monkeypatch.setattr(columns, "_numpy", None)
+    assert columns.numpy() is not None
+    fast_count, fast_sum, fast_total = aggregate(*data)
+    monkeypatch.setattr(columns, "_numpy", False)  # as if NumPy were not installed
+    assert columns.numpy() is None
+    slow_count, slow_sum, slow_total = aggregate(*data)
+
+    assert fast_count == slow_count
+    assert fast_sum.keys() == slow_sum.keys() == {"EE", "CE", "SE", "ALI", "NULO"}
+    assert fast_sum == pytest.approx(slow_sum)
+    assert fast_total == pytest.approx(slow_total)
+    assert fast_sum["NULO"] == slow_sum["NULO"] == 0.0
+
+
+def test_fallback_without_numpy(monkeypatch):
+    monkeypatch.setattr(columns, "_numpy", False)
+    cats = Categories()
+    codes = array(CODE_TYPECODE, [cats.code("EE"), cats.code("CE"), cats.code("EE")])
+    values = array(VALUE_TYPECODE, [3.0, 4.0, 6.0])
+    assert group_sum(codes, values, cats) == {"EE": 9.0, "CE": 4.0}
+    assert group_count(codes, cats) == {"EE": 2, "CE": 1}
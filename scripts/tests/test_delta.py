@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from apfscan.csharp import CsIndex
+from apfscan.delta import CONTROLLERS_DIR, ENTITIES_DIR, count_delta, diff_name_status
+from apfscan.efmodel import SNAPSHOT_PATH
+
+CONTROLLER = CONTROLLERS_DIR + "DocumentosController.cs"
+ENTITY = ENTITIES_DIR + "Documentos/Documento.cs"
+
+CONTROLLER_SOURCE = """\
+using Microsoft.AspNetCore.Mvc;
+
+namespace CAU.Eleitoral.Api.Controllers;
+
+[ApiController]
+[Route("api/[controller]")]
+public class DocumentosController : ControllerBase
+{{
+    [HttpPost("{route}")]
+    public async Task<ActionResult<string>> SolicitarDocumentos([FromBody] SolicitarDocumentosDto dto)
+    {{
+        return Ok(await _service.SolicitarAsync(dto.Protocolo, dto.Motivo));
+    }}
+
+    [HttpGet("{{id}}")]
+    public async Task<ActionResult<string>> Obter(int id)
+    {{
+        return Ok(await _service.ObterAsync(id));
+    }}
+
+    [HttpGet("{{id}}/anexos/{{nome}}")]
+    public async Task<ActionResult<string>> Obter(int id, string nome)
+    {{
+        return Ok(await _service.ObterAnexoAsync(id, nome));
+    }}
+{extra}}}
+"""
+
+ENTITY_SOURCE = """\
+namespace CAU.Eleitoral.Domain.Entities.Documentos;
+
+public class Documento : BaseEntity
+{{
+{properties}}}
+"""
+
+SNAPSHOT_SOURCE = """\
+namespace CAU.Eleitoral.Infrastructure.Migrations
+{{
+    partial class AppDbContextModelSnapshot : ModelSnapshot
+    {{
+        protected override void BuildModel(ModelBuilder modelBuilder)
+        {{
+            modelBuilder.Entity("CAU.Eleitoral.Domain.Entities.Documentos.Documento", b =>
+                {{
+                    b.Property<Guid>("Id")
+                        .HasColumnType("uuid");
+{columns}
+                    b.HasKey("Id");
+
+                    b.ToTable("Documentos");
+                }});
+        }}
+    }}
+}}
+"""
+
+
+def git(root: Path, *args: str) -> str:
+    return subprocess.run(["git", *args], cwd=root, check=True, capture_output=True, text=True).stdout.strip()
+
+
+def write(root: Path, rel: str, text: str) -> None:
+    path = root / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+def commit(root: Path, message: str) -> str:
+    git(root, "add", "-A")
+    git(root, "commit", "-q", "-m", message)
+    return git(root, "rev-parse", "HEAD")
+
+
+def controller(route: str = "solicitar-documentos", extra: str = "") -> str:
+    return CONTROLLER_SOURCE.format(route=route, extra=extra)
+
+
+def entity(*names: str) -> str:
+    return ENTITY_SOURCE.format(properties="".join(f"    public string {n} {{ get; set; }}\n" for n in names))
+
+
+def snapshot(*names: str) -> str:
+    columns = "".join(f'\n                    b.Property<string>("{n}")\n                        .HasColumnType("text");\n' for n in names)
+    return SNAPSHOT_SOURCE.format(columns=columns)
+
+
+@pytest.fixture()
+def repo(tmp_path: Path) -> Path:
+    git(tmp_path, "init", "-q")
+    git(tmp_path, "config", "user.email", "apf@example.com")
+    git(tmp_path, "config", "user.name", "apf")
+    write(tmp_path, CONTROLLER, controller())
+    write(tmp_path, ENTITY, entity("Titulo"))
+    write(tmp_path, SNAPSHOT_PATH.as_posix(), snapshot("Titulo"))
+    commit(tmp_path, "base")
+    return tmp_path
+
+
+def delta_of(root: Path, base: str):
+    return count_delta(root, base, "HEAD", index=CsIndex.load(root), entity_names={"Documento"})
+
+
+def operations(delta) -> list[tuple[str, str]]:
+    return sorted((f.nome, f.operacao) for f in delta.functions)
+
+
+def test_route_rename_is_one_change(repo: Path) -> None:
+    base = git(repo, "rev-parse", "HEAD")
+    write(repo, CONTROLLER, controller(route="solicitar-documentos-v2"))
+    commit(repo, "rota v2")
+
+    delta = delta_of(repo, base)
+    assert operations(delta) == [("DocumentosController.SolicitarDocumentos", "Alteracao")]
+    assert delta.total("Inclusao") == delta.total("Exclusao") == 0
+
+
+def test_overloads_pair_by_template(repo: Path) -> None:
+    base = git(repo, "rev-parse", "HEAD")
+    source = controller().replace('"{id}/anexos/{nome}"', '"{id}/arquivos/{nome}"')
+    write(repo, CONTROLLER, source)
+    commit(repo, "rota do anexo")
+
+    assert operations(delta_of(repo, base)) == [("DocumentosController.Obter", "Alteracao")]
+
+
+def test_added_and_removed_actions(repo: Path) -> None:
+    extra = """
+    [HttpDelete("{id}")]
+    public async Task<IActionResult> Excluir(int id)
+    {
+        await _service.ExcluirAsync(id);
+        return NoContent();
+    }
+"""
+    base = git(repo, "rev-parse", "HEAD")
+    write(repo, CONTROLLER, controller(extra=extra))
+    added = commit(repo, "excluir")
+    assert operations(delta_of(repo, base)) == [("DocumentosController.Excluir", "Inclusao")]
+
+    write(repo, CONTROLLER, controller())
+    commit(repo, "sem excluir")
+    assert operations(delta_of(repo, added)) == [("DocumentosController.Excluir", "Exclusao")]
+
+
+def test_unchanged_source_is_not_counted(repo: Path) -> None:
+    base = git(repo, "rev-parse", "HEAD")
+    write(repo, CONTROLLER, controller() + "\n")
+    commit(repo, "espaco")
+    assert delta_of(repo, base).functions == []
+
+
+def test_ali_rated_from_ef_model(repo: Path) -> None:
+    base = git(repo, "rev-parse", "HEAD")
+    write(repo, ENTITY, entity("Titulo", "Resumo", "Orgao"))
+    # The snapshot lags behind the class: the model is what the baseline counts.
+    write(repo, SNAPSHOT_PATH.as_posix(), snapshot("Titulo", "Resumo"))
+    commit(repo, "novos campos")
+
+    (ali,) = [f for f in delta_of(repo, base).functions if f.tipo == "ALI"]
+    assert (ali.nome, ali.operacao, ali.det, ali.ret_ftr) == ("Documento", "Alteracao", 2, 1)
+
+
+def test_ali_falls_back_to_properties_without_snapshot(repo: Path) -> None:
+    (repo / SNAPSHOT_PATH).unlink()
+    base = commit(repo, "sem snapshot")
+    write(repo, ENTITY, entity("Titulo", "Resumo", "Orgao"))
+    commit(repo, "novos campos")
+
+    (ali,) = [f for f in delta_of(repo, base).functions if f.tipo == "ALI"]
+    assert (ali.det, ali.ret_ftr) == (3, 1)
+
+
+def test_diff_name_status_closed_early(repo: Path) -> None:
+    base = git(repo, "rev-parse", "HEAD")
+    write(repo, CONTROLLER, controller(route="v2"))
+    write(repo, ENTITY, entity("Titulo", "Resumo"))
+    commit(repo, "dois arquivos")
+
+    listing = diff_name_status(repo, base, "HEAD")
+    next(listing)
+    listing.close()  # must not raise from GeneratorExit
+
+    with pytest.raises(RuntimeError, match="git diff falhou"):
+        list(diff_name_status(repo, base, "nao-existe"))
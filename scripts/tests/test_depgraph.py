@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from apfscan.csharp import CsIndex, parse_cs
+from apfscan.depgraph import action_reach
+from apfscan.efmodel import EfEntity, EfModel
+
+CONTROLLERS = "apps/api/CAU.Eleitoral.Api/Controllers/"
+SERVICES = "apps/api/CAU.Eleitoral.Application/Services/"
+
+SOURCES = {
+    CONTROLLERS + "ApuracaoController.cs": """
+namespace CAU.Eleitoral.Api.Controllers;
+
+public class ApuracaoController : ControllerBase
+{
+    private readonly IApuracaoService _service;
+    private readonly ILogger<ApuracaoController> _logger;
+
+    public ApuracaoController(IApuracaoService service, ILogger<ApuracaoController> logger)
+    {
+        _service = service;
+        _logger = logger;
+    }
+
+    [HttpGet("{id}")]
+    public async Task<IActionResult> GetResultado(Guid id)
+    {
+        _logger.LogInformation("resultado");
+        return Ok(await _service.GetResultadoAsync(id));
+    }
+
+    [HttpPost("{id}/votos")]
+    public async Task<IActionResult> ApurarVotos(Guid id)
+    {
+        return Ok(await _service.ApurarAsync(id));
+    }
+}
+""",
+    SERVICES + "ApuracaoService.cs": """
+namespace CAU.Eleitoral.Application.Services;
+
+public interface IApuracaoService
+{
+    Task<object> GetResultadoAsync(Guid id);
+    Task<object> ApurarAsync(Guid id);
+}
+
+public class ApuracaoService : IApuracaoService
+{
+    private readonly AppDbContext _context;
+
+    public ApuracaoService(AppDbContext context)
+    {
+        _context = context;
+    }
+
+    public async Task<object> GetResultadoAsync(Guid id)
+    {
+        return await _context.Resultados.FirstAsync(r => r.EleicaoId == id);
+    }
+
+    public async Task<object> ApurarAsync(Guid id)
+    {
+        var votos = await _context.Votos.Where(v => v.EleicaoId == id).ToListAsync();
+        return await SalvarAsync(id, votos);
+    }
+
+    private async Task<object> SalvarAsync(Guid id, object votos)
+    {
+        return await _context.Eleicoes.FindAsync(id);
+    }
+}
+""",
+}
+
+
+def test_reach_is_per_action() -> None:
+    index = CsIndex(Path("."))
+    index.files = {rel: parse_cs(text, rel) for rel, text in SOURCES.items()}
+    model = EfModel()
+    for name, table in (("Resultado", "Resultados"), ("Voto", "Votos"), ("Eleicao", "Eleicoes")):
+        model.entities[name] = EfEntity(name=f"CAU.Eleitoral.Domain.Entities.{name}", table=table, db_set=table)
+
+    reach = {r.action: r.entities for r in action_reach(index, model)}
+    assert reach == {
+        "GetResultado": ("Resultado",),
+        # ``ApurarAsync`` and the private ``SalvarAsync`` it calls.
+        "ApurarVotos": ("Eleicao", "Voto"),
+    }
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from apfscan.dtos import APPLICATION, load_dto_index
+
+DTOS = APPLICATION / "DTOs" / "Documentos"
+
+PARENT = """\
+namespace CAU.Eleitoral.Application.DTOs.Documentos;
+
+public class ParentDto
+{
+    public Guid Id { get; set; }
+    public ChildDto Child { get; set; }
+}
+"""
+
+CHILD = """\
+namespace CAU.Eleitoral.Application.DTOs.Documentos;
+
+public record ChildDto(string Titulo, string Resumo, string Orgao);
+"""
+
+
+def write(root: Path, name: str, text: str) -> None:
+    path = root / DTOS / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+def det(root: Path, cache: Path | None) -> int:
+    return load_dto_index(root, (), cache).info("ParentDto").det
+
+
+def test_declaring_a_missing_type_dirties_its_parent(tmp_path):
+    cache = tmp_path / "cache" / "csharp-index.json"
+    write(tmp_path, "ParentDto.cs", PARENT)
+    assert det(tmp_path, cache) == 2  # ChildDto is still unresolved: one field
+
+    write(tmp_path, "ChildDto.cs", CHILD)
+    assert det(tmp_path, cache) == det(tmp_path, None) == 4
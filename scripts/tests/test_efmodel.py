@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from apfscan.efmodel import parse_model_snapshot
+
+SNAPSHOT = """\
+modelBuilder.Entity("E.Chapa", b =>
+    {
+        b.Property<Guid>("Id");
+        b.Property<string>("Nome");
+        b.HasKey("Id");
+        b.ToTable("Chapas");
+        b.OwnsOne("E.Endereco", "Endereco", b1 =>
+            {
+                b1.Property<Guid>("ChapaId");
+                b1.Property<string>("Cidade");
+                b1.HasKey("ChapaId");
+            });
+    });
+
+modelBuilder.Entity("E.MembroChapa", b =>
+    {
+        b.Property<Guid>("Id");
+        b.Property<Guid>("ChapaId");
+        b.ToTable("MembrosChapa");
+    });
+
+modelBuilder.Entity("E.Documento", b =>
+    {
+        b.Property<Guid>("Id");
+        b.Property<Guid?>("ChapaId");
+        b.ToTable("Documentos");
+    });
+
+modelBuilder.Entity("E.MembroChapa", b =>
+    {
+        b.HasOne("E.Chapa", "Chapa")
+            .WithMany("Membros")
+            .HasForeignKey("ChapaId")
+            .OnDelete(DeleteBehavior.Cascade)
+            .IsRequired();
+    });
+
+modelBuilder.Entity("E.Documento", b =>
+    {
+        b.HasOne("E.Chapa", "Chapa")
+            .WithMany()
+            .HasForeignKey("ChapaId")
+            .OnDelete(DeleteBehavior.SetNull);
+    });
+"""
+
+
+def test_ret_counts_owned_types_and_cascade_children():
+    model = parse_model_snapshot(SNAPSHOT.splitlines())
+    chapa = model.entities["E.Chapa"]
+    # Base record + owned Endereco + MembroChapa (deleted with the chapa);
+    # Documento survives the chapa (SetNull), so it is not a subgroup.
+    assert model.dependents(chapa) == {"E.MembroChapa"}
+    assert model.ret(chapa) == 3
+    assert model.ret(model.entities["E.MembroChapa"]) == 1
+    assert model.det(chapa) == 2  # Nome + Endereco.Cidade
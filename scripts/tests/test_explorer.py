@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import pytest
+
+from apfscan.explorer import ExplorerTable, write_explorer
+
+
+def tables(rows: int) -> list[ExplorerTable]:
+    return [ExplorerTable("rotas", "Rotas", ("Acao", "PF"), ([f"a{i}", 4] for i in range(rows)), frozenset({"PF"}))]
+
+
+def test_rerun_replaces_its_own_data(tmp_path):
+    write_explorer(tmp_path, tables(5), title="t", chunk_rows=2)
+    manifest = write_explorer(tmp_path, tables(1), title="t", chunk_rows=2)
+    assert manifest["tables"][0]["chunks"] == 1
+    assert sorted(p.name for p in (tmp_path / "data").iterdir()) == ["manifest.js", "rotas-0.js"]
+
+
+def test_foreign_data_dir_is_not_deleted(tmp_path):
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data" / "planilha.xlsx").write_bytes(b"x")
+    with pytest.raises(FileExistsError):
+        write_explorer(tmp_path, tables(1), title="t")
+    assert (tmp_path / "data" / "planilha.xlsx").exists()
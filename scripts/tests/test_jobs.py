@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from apfscan.jobs import Budget, Checkpoint, run_job
+
+KEYS = ["a", "b", "c", "d"]
+
+
+def run(checkpoint: Checkpoint, keys=KEYS, budget: Budget = Budget(), identity=None):
+    calls: list[str] = []
+
+    def work(key: str) -> str:
+        calls.append(key)
+        return key.upper()
+
+    results, status = run_job(checkpoint, keys, work, budget=budget, progress_interval=3600, identity=identity)
+    return results, status, calls
+
+
+def file_path(key: str) -> str:
+    return key.rsplit(":", 2)[0]
+
+
+def lines(path: Path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_item_budget_then_resume(tmp_path):
+    checkpoint = Checkpoint(tmp_path / "job.jsonl", "f1")
+    results, status, calls = run(checkpoint, budget=Budget(items=2))
+    assert (calls, status.complete, status.stopped) == (["a", "b"], False, "itens")
+    assert results == {"a": "A", "b": "B"}
+
+    results, status, calls = run(checkpoint)
+    assert (calls, status.resumed, status.complete) == (["c", "d"], 2, True)
+    assert results == {"a": "A", "b": "B", "c": "C", "d": "D"}
+
+
+def test_time_budget_stops_before_work(tmp_path):
+    _, status, calls = run(Checkpoint(tmp_path / "job.jsonl", "f1"), budget=Budget(seconds=0))
+    assert (calls, status.complete, status.stopped) == ([], False, "tempo")
+
+
+def test_torn_tail_is_dropped_and_rewritten(tmp_path):
+    path = tmp_path / "job.jsonl"
+    checkpoint = Checkpoint(path, "f1")
+    run(checkpoint, budget=Budget(items=2))
+    with path.open("a", encoding="utf-8") as fh:
+        fh.write('{"key": "c", "resu')  # killed in the middle of a write
+
+    assert checkpoint.load() == {"a": "A", "b": "B"}
+    _, status, calls = run(checkpoint)
+    assert (calls, status.complete) == (["c", "d"], True)
+    # Without the rewrite, "c" would follow the torn line and be lost on the next load.
+    assert checkpoint.load() == {"a": "A", "b": "B", "c": "C", "d": "D"}
+    assert run(checkpoint)[2] == []
+
+
+def test_superseded_keys_are_compacted(tmp_path):
+    path = tmp_path / "job.jsonl"
+    checkpoint = Checkpoint(path, "f1")
+    run(checkpoint, keys=["a.cs:10:1", "b.cs:20:1", "c.cs:30:1"], identity=file_path)
+
+    # b.cs changed on disk: its new key supersedes the old one.
+    _, _, calls = run(checkpoint, keys=["a.cs:10:1", "b.cs:21:2", "c.cs:30:1"], identity=file_path)
+    assert calls == ["b.cs:21:2"]
+    assert sorted(item.get("key") or "" for item in lines(path)) == ["", "a.cs:10:1", "b.cs:21:2", "c.cs:30:1"]
+
+
+def test_other_segments_are_kept(tmp_path):
+    checkpoint = Checkpoint(tmp_path / "job.jsonl", "f1")
+    run(checkpoint, keys=["a", "b"])
+
+    results, _, calls = run(checkpoint, keys=["c"])
+    assert (results, calls) == ({"c": "C"}, ["c"])
+    assert checkpoint.load() == {"a": "A", "b": "B", "c": "C"}
+    assert run(checkpoint, keys=["a", "b"])[2] == []
+
+
+def test_other_fingerprint_starts_over(tmp_path):
+    path = tmp_path / "job.jsonl"
+    run(Checkpoint(path, "f1"))
+
+    _, status, calls = run(Checkpoint(path, "f2"), keys=["a", "b"])
+    assert (calls, status.resumed) == (["a", "b"], 0)
+    assert lines(path)[0] == {"job": "f2"}
+    assert len(lines(path)) == 3
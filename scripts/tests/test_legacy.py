@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from apfscan.legacy import parse_entity
+
+CHAPA = '''\
+<?php
+/**
+ * @ORM\\Entity
+ * @ORM\\Table(schema="eleitoral", name="TB_CHAPA_ELEICAO")
+ */
+class ChapaEleicao
+{
+    /**
+     * @ORM\\Id
+     * @ORM\\Column(name="ID_CHAPA_ELEICAO", type="integer")
+     */
+    private $id;
+
+    /**
+     * @ORM\\Column(name="DS_NOME", type="string")
+     */
+    private $nome;
+
+    /**
+     * @ORM\\ManyToOne(targetEntity="App\\Entities\\Eleicao")
+     * @ORM\\JoinColumn(name="ID_ELEICAO", referencedColumnName="ID_ELEICAO")
+     */
+    private $eleicao;
+
+    /**
+     * @ORM\\OneToMany(targetEntity="App\\Entities\\MembroChapa", mappedBy="chapaEleicao", cascade={"remove"}, fetch="EXTRA_LAZY")
+     */
+    private $membros;
+
+    /**
+     * @ORM\\OneToMany(targetEntity="App\\Entities\\RespostaDeclaracao", mappedBy="chapaEleicao", cascade={"persist"}, orphanRemoval=true)
+     */
+    private $respostas;
+
+    /**
+     * @ORM\\OneToMany(targetEntity="App\\Entities\\Denuncia", mappedBy="chapaEleicao", cascade={"persist"})
+     */
+    private $denuncias;
+}
+'''
+
+
+def test_ret_counts_dependent_collections():
+    entity = parse_entity(CHAPA.splitlines(keepends=True), "ChapaEleicao.php")
+    assert entity is not None
+    assert (entity.table, entity.det) == ("TB_CHAPA_ELEICAO", 2)  # DS_NOME + ID_ELEICAO
+    assert {a.property: a.dependent for a in entity.associations} == {
+        "eleicao": False,
+        "membros": True,  # cascade remove
+        "respostas": True,  # orphanRemoval
+        "denuncias": False,  # persist only: denuncias outlive the chapa
+    }
+    assert entity.ret == 3
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import sqlite3
+from types import SimpleNamespace
+
+from apfscan.store import SnapshotStore
+
+
+def snapshot(generated_at: str, endpoints: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        commit="abc1234",
+        generated_at=generated_at,
+        endpoints=endpoints,
+        entity_by_module=[("Chapas", 12), ("Denuncias", 9)],
+    )
+
+
+def totals(total: int) -> SimpleNamespace:
+    return SimpleNamespace(total_nao_ajustado=total)
+
+
+def counts(store: SnapshotStore) -> tuple[int, int]:
+    snapshots = store.conn.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+    modules = store.conn.execute("SELECT COUNT(*) FROM entity_modules").fetchone()[0]
+    return snapshots, modules
+
+
+def test_reimport_replaces_row(tmp_path):
+    with SnapshotStore(tmp_path / "h.sqlite") as store:
+        store.save(totals(100), snapshot("2026-02-19", 300), source="markdown:a.md")
+        latest = store.save(totals(110), snapshot("2026-02-19", 310), source="markdown:a.md")
+        assert counts(store) == (1, 2)
+        (row,) = store.snapshots()
+        assert (row["id"], row["endpoints"], row["total_nao_ajustado"]) == (latest, 310, 110)
+        assert len(store.trend(["endpoints"])) == 1
+
+
+def test_recounts_accumulate(tmp_path):
+    with SnapshotStore(tmp_path / "h.sqlite") as store:
+        store.save(totals(100), snapshot("2026-02-19T10:00:00", 300))
+        store.save(totals(100), snapshot("2026-02-19T11:00:00", 300))
+        store.save(totals(90), snapshot("2026-02-19", 290), source="markdown:a.md")
+        assert counts(store) == (3, 6)
+        assert [r["source"] for r in store.snapshots(2)] == ["recount", "recount"]
+
+
+def test_v1_database_is_deduplicated(tmp_path):
+    path = tmp_path / "h.sqlite"
+    with SnapshotStore(path) as store:
+        store.conn.execute("DROP INDEX ux_snapshots_import")
+        store.conn.execute("PRAGMA user_version = 1")
+        for endpoints in (300, 310):
+            store.conn.execute(
+                "INSERT INTO snapshots (commit_sha, generated_at, snapshot_date, recorded_at, source, endpoints) "
+                "VALUES ('abc', '2026-02-19', '2026-02-19', '2026-02-19', 'markdown:a.md', ?)",
+                (endpoints,),
+            )
+        store.conn.commit()
+
+    with SnapshotStore(path) as store:
+        assert [r["endpoints"] for r in store.snapshots()] == [310]
+        assert store.conn.execute("PRAGMA user_version").fetchone()[0] == 2
+    assert sqlite3.connect(path).execute("SELECT COUNT(*) FROM snapshots").fetchone()[0] == 1
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from apfscan.csharp import CsIndex, parse_cs
+from apfscan.validators import VALIDATORS_DIR, scan_validators
+
+SOURCE = """\
+namespace CAU.Eleitoral.Application.Validators;
+
+public class CreateChapaDtoValidator : AbstractValidator<CreateChapaDto>
+{
+    public CreateChapaDtoValidator()
+    {
+        RuleFor(x => x.Nome).NotEmpty();
+        RuleForEach(x => x.Membros).SetValidator(new MembroDtoValidator());
+    }
+}
+
+public class CreateChapaDtoRegrasValidator : AbstractValidator<CreateChapaDto>
+{
+    public CreateChapaDtoRegrasValidator()
+    {
+        RuleFor(x => x.Slogan).MaximumLength(200);
+    }
+}
+
+public class MembroDtoValidator : AbstractValidator<MembroDto>
+{
+    public MembroDtoValidator()
+    {
+        RuleFor(x => x.Cpf).NotEmpty();
+        RuleFor(x => x.Indicado).SetValidator(new IndicadoDtoValidator());
+    }
+}
+
+public class IndicadoDtoValidator : AbstractValidator<IndicadoDto>
+{
+    public IndicadoDtoValidator()
+    {
+        RuleFor(x => x.Nome).NotEmpty();
+        RuleFor(x => x.Membro).SetValidator(new MembroDtoValidator());
+    }
+}
+"""
+
+
+def validators():
+    rel = (VALIDATORS_DIR / "ChapaValidators.cs").as_posix()
+    index = CsIndex(Path("."))
+    index.files = {rel: parse_cs(SOURCE, rel)}
+    return scan_validators(index)
+
+
+def test_every_validator_of_a_dto_is_kept():
+    names = [v.name for v in validators()["CreateChapaDto"]]
+    assert names == ["CreateChapaDtoRegrasValidator", "CreateChapaDtoValidator"]
+
+
+def test_fields_cut_by_a_cycle_are_not_cached():
+    found = validators()
+    # Membro -> Indicado -> Membro: each root expands the other one level deep.
+    assert found["MembroDto"][0].fields == ("Cpf", "Indicado.Nome", "Indicado.Membro")
+    assert found["IndicadoDto"][0].fields == ("Nome", "Membro.Cpf", "Membro.Indicado")
+    (chapa,) = [v for v in found["CreateChapaDto"] if v.name == "CreateChapaDtoValidator"]
+    assert chapa.fields == ("Nome", "Membros.Cpf", "Membros.Indicado.Nome", "Membros.Indicado.Membro")